@@ -0,0 +1,272 @@
+# IMPORT PACKAGES
+# ---------------
+import os
+import sys
+import copy
+import glob
+import json
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'src', 'compiler'))
+import vta_compiler.main_vta_compiler as VC
+import vta_compiler.profiling.profiling as PF
+from vta_compiler.utils.json_parser import parse_json_to_dict
+
+
+###############################################
+
+
+# Hardware configurations (the default one and examples/matrix_operations/alternative_config/*.json)
+EXAMPLES_DIR = os.path.join(PROJECT_DIR, 'examples', 'matrix_operations')
+CONFIGS = {"default": os.path.join(PROJECT_DIR, 'config', 'vta_config.json')}
+for config_file in sorted(glob.glob(os.path.join(EXAMPLES_DIR, 'alternative_config', '*.json'))):
+    CONFIGS[os.path.splitext(os.path.basename(config_file))[0]] = config_file
+
+# Default history of the results
+HISTORY_FILE = os.path.join(BENCHMARK_DIR, 'history.json')
+
+# Measures compared with the previous run (a greater value is a regression)
+SIZE_KEYS = ("nb_insn", "nb_uop", "nb_steps", "dram_bytes", "binary_bytes")
+
+
+# GEMM LAYER
+# ----------
+def gemm_layer(nb_rows, nb_cols, nb_out, alu=[["RELU"]]):
+    """
+    Define a GeMM layer (INPUT: nb_rows x nb_cols, WEIGHT: nb_cols x nb_out) followed by ALU operations.
+    """
+    return {
+        "MATRICES": [{"INPUT": [nb_rows, nb_cols], "WEIGHT": [nb_cols, nb_out]}],
+        "GEMM": ["INPUT", "WEIGHT"],
+        "ALU": alu,
+        "BASE_ADDRESS": "0000"
+    }
+
+# ---------------------------------------------
+
+# POOLING LAYER
+# -------------
+def pooling_layer(height, width, channels, operation="MAX"):
+    """
+    Define a 2x2 pooling (stride 2) on a flattened height x width x channels tensor (one row per pixel).
+    The result of each window is written on its top-left pixel.
+    """
+    alu = []
+    for row in range(0, height - 1, 2):
+        top_left = row * width
+        for src_idx in (top_left + 1, top_left + width, top_left + width + 1):
+            alu.append([operation, [[top_left, 2], [src_idx, 2], width // 2]])
+    return {
+        "MATRICES": [{"ACCUMULATOR": [height * width, channels]}],
+        "ALU": alu,
+        "BASE_ADDRESS": "0000"
+    }
+
+# ---------------------------------------------
+
+# BENCHMARK CASES
+# ---------------
+def benchmark_cases():
+    """
+    Define the benchmark cases: (name, operations_dict, config name, isSlow).
+    """
+    cases = []
+    # Square GeMM
+    for n in (64, 256, 512):
+        for config_name in ("default", "config_for_overfitting"):
+            cases.append((f"gemm_square_{n}", gemm_layer(n, n, n), config_name, False))
+    # Tall-skinny GeMM and pooling (LeNet-5 layers)
+    for layer_file in sorted(glob.glob(os.path.join(EXAMPLES_DIR, 'lenet5', 'lenet5_layer*.json'))):
+        name = os.path.splitext(os.path.basename(layer_file))[0]
+        cases.append((name, parse_json_to_dict(layer_file), "default", False))
+    cases.append(("gemm_tall_16384x27", gemm_layer(16384, 27, 32), "default", False))
+    # YOLO-NAS sized layers
+    for layer_file in sorted(glob.glob(os.path.join(EXAMPLES_DIR, 'yolonas', 'yolonas_conv*.json'))):
+        name = os.path.splitext(os.path.basename(layer_file))[0]
+        cases.append((name, parse_json_to_dict(layer_file), "default", True))
+    # ALU-heavy pooling
+    cases.append(("maxpool_56x56x64", pooling_layer(56, 56, 64), "default", False))
+    for config_name in ("default", "config_pool_overfitting", "config_pool_big_overfitting"):
+        cases.append(("matrix_maxpool", parse_json_to_dict(os.path.join(EXAMPLES_DIR, 'matrix_maxpool.json')), config_name, False))
+    return cases
+
+
+###############################################
+
+
+# RUN CASE
+# --------
+def run_case(operations_dict, vta_config_dict, repeat=1, doMemory=False):
+    """
+    Compile a layer and write its binaries, the fastest of the repeated compilations is kept.
+    Outputs:
+        - result (dict): The time of each stage (s), the total time, and the number of instructions, UOPs,
+                         strategy steps, allocated DRAM bytes and binary bytes
+    """
+    hw_config = VC.hardware_configuration(vta_config_dict)
+    result = None
+    for _ in range(0, repeat):
+        # Same operands for each run
+        np.random.seed(0)
+        profile = PF.profile_definition(doMemory=doMemory)
+        layer = VC.compile_layer(copy.deepcopy(operations_dict), hw_config, profile=profile, debug=False)
+        with tempfile.TemporaryDirectory() as output_dir:
+            with PF.stage(profile, "binarization"):
+                VC.write_layer_binaries(layer, output_dir)
+            binary_bytes = sum(os.path.getsize(path) for path in glob.glob(os.path.join(output_dir, '*')))
+
+        total_time = sum(measures["wall_time"] for measures in profile["stages"].values())
+        if (result is None or total_time < result["total_time"]):
+            result = {
+                "stages": {stage_name: measures["wall_time"] for stage_name, measures in profile["stages"].items()},
+                "total_time": total_time,
+                "nb_insn": len(layer["insn_buffer"]),
+                "nb_uop": len(layer["uop_buffer"]),
+                "nb_steps": len(layer["strategy"]),
+                "dram_bytes": sum(obj_addr["size"] for obj_addr in layer["base_addresses_list"]),
+                "binary_bytes": binary_bytes
+            }
+            if (doMemory):
+                result["peak_memory"] = max(measures["peak_memory"] for measures in profile["stages"].values())
+    return result
+
+# ---------------------------------------------
+
+# COMPARE RUNS
+# ------------
+def compare_runs(results, history, tolerance=0.2, min_time=0.05):
+    """
+    Compare the results with the last run of each case in the history.
+    A case regresses if its total time exceeds the previous one by more than the tolerance (and min_time seconds),
+    or if its program is larger (see SIZE_KEYS).
+    Outputs:
+        - regressions (list): The description of each regression
+    """
+    regressions = []
+    for case_name, result in results.items():
+        previous = next((run["results"][case_name] for run in reversed(history) if case_name in run["results"]), None)
+        if (previous is None):
+            continue
+        delta = result["total_time"] - previous["total_time"]
+        if (delta > tolerance * previous["total_time"] and delta > min_time):
+            regressions.append(f"{case_name}: {previous['total_time']*1000:.1f} ms -> {result['total_time']*1000:.1f} ms")
+        for key in SIZE_KEYS:
+            if (result[key] > previous.get(key, result[key])):
+                regressions.append(f"{case_name}: {key} {previous[key]} -> {result[key]}")
+    return regressions
+
+# ---------------------------------------------
+
+# GIT COMMIT
+# ----------
+def git_commit():
+    """
+    Get the current commit of the repository (None outside of a git repository).
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+###############################################
+
+
+# MAIN FUNCTION
+# -------------
+def main(doSlow=False, case_filter='', repeat=1, tolerance=0.2, doMemory=False, doSave=True, history_file=HISTORY_FILE):
+    # READ THE HISTORY
+    history = []
+    if os.path.isfile(history_file):
+        with open(history_file) as f:
+            history = json.load(f)
+
+
+    # ---------------------------------------------
+    # RUN THE CASES
+    results = {}
+    print(f"{'CASE':<48}{'TIME (ms)':>12}{'INSN':>10}{'UOP':>10}{'STEPS':>8}{'DRAM (B)':>14}")
+    for name, operations_dict, config_name, isSlow in benchmark_cases():
+        case_name = f"{name}@{config_name}"
+        if (isSlow and not doSlow) or (case_filter not in case_name):
+            continue
+        result = run_case(operations_dict, parse_json_to_dict(CONFIGS[config_name]), repeat=repeat, doMemory=doMemory)
+        results[case_name] = result
+        print(f"{case_name:<48}{result['total_time']*1000:>12.1f}{result['nb_insn']:>10}{result['nb_uop']:>10}"
+              f"{result['nb_steps']:>8}{result['dram_bytes']:>14}")
+
+
+    # ---------------------------------------------
+    # COMPARE WITH THE HISTORY
+    regressions = compare_runs(results, history, tolerance=tolerance)
+    if (regressions):
+        print(f"\nREGRESSIONS ({len(regressions)}):")
+        for regression in regressions:
+            print(f"\t{regression}")
+    elif (history):
+        print("\nNo regression.")
+
+
+    # ---------------------------------------------
+    # SAVE THE RUN
+    if (doSave):
+        history.append({
+            "date": datetime.now().isoformat(timespec='seconds'),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "results": results
+        })
+        with open(history_file, 'w') as f:
+            json.dump(history, f, indent=2)
+        print(f"\nResults appended to: {history_file}")
+
+
+    # ---------------------------------------------
+    # RETURN (1 if there is a regression)
+
+    return 1 if (regressions) else 0
+
+
+###############################################
+
+
+# EXECUTE MAIN FUNCTION
+# ---------------------
+if __name__ == "__main__":
+    """
+    To execute:
+        > python benchmark.py [--all] [--filter=<substring>] [--repeat=N] [--tolerance=<ratio>] [--memory] [--no-save] [--history=<file>.json]
+
+    --all also runs the slow cases (YOLO-NAS layers), --filter only runs the cases whose name contains the substring.
+    The exit code is 1 if a case regresses with respect to its last run in the history.
+    """
+    options = {}
+    for arg in sys.argv[1:]:
+        if (arg == "--all"):
+            options["doSlow"] = True
+        elif arg.startswith("--filter="):
+            options["case_filter"] = arg.split("=", 1)[1]
+        elif arg.startswith("--repeat="):
+            options["repeat"] = int(arg.split("=", 1)[1])
+        elif arg.startswith("--tolerance="):
+            options["tolerance"] = float(arg.split("=", 1)[1])
+        elif (arg == "--memory"):
+            options["doMemory"] = True
+        elif (arg == "--no-save"):
+            options["doSave"] = False
+        elif arg.startswith("--history="):
+            options["history_file"] = arg.split("=", 1)[1]
+        else:
+            print("python benchmark.py [--all] [--filter=<substring>] [--repeat=N] [--tolerance=<ratio>] [--memory] [--no-save] [--history=<file>.json]")
+            sys.exit(1)
+
+    sys.exit(main(**options))
@@ -1,20 +1,27 @@
+import sys
 import json
 import random
 import os
 
-def generate_json_matrix_definition(file_name="add_two_matrices.json"):
+def generate_json_matrix_definition(file_name="add_two_matrices.json", seed=None):
     """
     Create a JSON file with random matrix size.
     Args:
     file_name (str): Name of the JSON file to create.
+    seed (int): Seed of the sizes and of the matrix values (written as "SEED"), drawn at random if None.
     """
+    # Seed (printed, so that a failing test can be reproduced without saving its data)
+    if seed is None:
+        seed = random.randrange(2**32)
+    rng = random.Random(seed)
+
     # Manage the path
     script_dir = os.path.dirname(os.path.abspath(__file__))
     output_dir = os.path.join(script_dir, file_name)
 
     # Generate random values for dimension, keeping the consistency
-    Ah = random.randint(1, 2048) # 8192
-    Bw = random.randint(1, 2048) # 8192
+    Ah = rng.randint(1, 2048) # 8192
+    Bw = rng.randint(1, 2048) # 8192
 
     # Create a python dictionnary
     matrix_definition = {
@@ -27,7 +34,8 @@ def generate_json_matrix_definition(file_name="add_two_matrices.json"):
         "ALU": [
             ["ADD_ACC", ["ACCUMULATOR", "ADD_ACCUMULATOR"]]
         ],
-        "BASE_ADDRESS": "0000"
+        "BASE_ADDRESS": "0000",
+        "SEED": seed
     }
 
     # Write dict in a JSON
@@ -36,7 +44,8 @@ def generate_json_matrix_definition(file_name="add_two_matrices.json"):
 
     print(f"File '{file_name}' is successfully generated! \
             \n\t A = {Ah}x{Bw} \
-            \n\t Total added elements = {(Ah * Bw)*2} \n")
+            \n\t Total added elements = {(Ah * Bw)*2} \
+            \n\t Seed = {seed} (reproduce with: python test_add.py {seed}) \n")
 
 # Appel de la fonction pour créer le fichier
-generate_json_matrix_definition()
\ No newline at end of file
+generate_json_matrix_definition(seed=int(sys.argv[1]) if (len(sys.argv) > 1) else None)
\ No newline at end of file
@@ -1,21 +1,28 @@
+import sys
 import json
 import random
 import os
 
-def generate_json_matrix_definition(file_name="matmul_relu.json"):
+def generate_json_matrix_definition(file_name="matmul_relu.json", seed=None):
     """
     Create a JSON file with random matrix size.
     Args:
     file_name (str): Name of the JSON file to create.
+    seed (int): Seed of the sizes and of the matrix values (written as "SEED"), drawn at random if None.
     """
+    # Seed (printed, so that a failing test can be reproduced without saving its data)
+    if seed is None:
+        seed = random.randrange(2**32)
+    rng = random.Random(seed)
+
     # Manage the path
     script_dir = os.path.dirname(os.path.abspath(__file__))
     output_dir = os.path.join(script_dir, file_name)
 
     # Generate random values for dimension, keeping the consistency for C = X + A*B
-    Ah = random.randint(1, 2048) # 8192
-    Aw_Bh = random.randint(1, 2048) # 8192
-    Bw = random.randint(1, 2048) # 8192
+    Ah = rng.randint(1, 2048) # 8192
+    Aw_Bh = rng.randint(1, 2048) # 8192
+    Bw = rng.randint(1, 2048) # 8192
 
     # Create a python dictionnary
     matrix_definition = {
@@ -30,7 +37,8 @@ def generate_json_matrix_definition(file_name="matmul_relu.json"):
         "ALU": [
             ["RELU"]
         ],
-        "BASE_ADDRESS": "0000"
+        "BASE_ADDRESS": "0000",
+        "SEED": seed
     }
 
     # Write dict in a JSON
@@ -40,7 +48,8 @@ def generate_json_matrix_definition(file_name="matmul_relu.json"):
     print(f"File '{file_name}' is successfully generated! \
             \n\t A = {Ah}x{Aw_Bh} \
             \n\t B = {Aw_Bh}x{Bw} \
-            \n\t Total multiplied elements = {Ah * Aw_Bh + Aw_Bh * Bw} \n")
+            \n\t Total multiplied elements = {Ah * Aw_Bh + Aw_Bh * Bw} \
+            \n\t Seed = {seed} (reproduce with: python test_matmul_relu.py {seed}) \n")
 
 # Appel de la fonction pour créer le fichier
-generate_json_matrix_definition()
\ No newline at end of file
+generate_json_matrix_definition(seed=int(sys.argv[1]) if (len(sys.argv) > 1) else None)
\ No newline at end of file
@@ -1,23 +1,30 @@
+import sys
 import json
 import random
 import os
 
-def generate_json_matrix_definition(file_name="maxpool.json"):
+def generate_json_matrix_definition(file_name="maxpool.json", seed=None):
     """
     Create a JSON file with random matrix size.
     Args:
     file_name (str): Name of the JSON file to create.
+    seed (int): Seed of the sizes and of the matrix values (written as "SEED"), drawn at random if None.
     """
+    # Seed (printed, so that a failing test can be reproduced without saving its data)
+    if seed is None:
+        seed = random.randrange(2**32)
+    rng = random.Random(seed)
+
     # Manage the path
     script_dir = os.path.dirname(os.path.abspath(__file__))
     output_dir = os.path.join(script_dir, file_name)
 
     # Generate random values for dimension
-    Xh = random.randint(8, 2048) # 8192
-    Xw = random.randint(1, 2048) # 8192
+    Xh = rng.randint(8, 2048) # 8192
+    Xw = rng.randint(1, 2048) # 8192
 
     # Define the number of ALU
-    nb_alu = random.randint(1, Xh//4)
+    nb_alu = rng.randint(1, Xh//4)
     kernel_size = Xh // nb_alu
 
     # Create the ALU operations
@@ -38,7 +45,8 @@ def generate_json_matrix_definition(file_name="maxpool.json"):
             }
         ],
         "ALU": operations_alu,
-        "BASE_ADDRESS": "0000"
+        "BASE_ADDRESS": "0000",
+        "SEED": seed
     }
 
     # Write dict in a JSON
@@ -47,7 +55,8 @@ def generate_json_matrix_definition(file_name="maxpool.json"):
 
     print(f"File '{file_name}' is successfully generated!\
             \n\t X = {Xh}x{Xw} \
-            \n\t Total elements = {Xh * Xw} \n")
+            \n\t Total elements = {Xh * Xw} \
+            \n\t Seed = {seed} (reproduce with: python test_maxpool.py {seed}) \n")
 
 # Appel de la fonction pour créer le fichier
-generate_json_matrix_definition()
\ No newline at end of file
+generate_json_matrix_definition(seed=int(sys.argv[1]) if (len(sys.argv) > 1) else None)
\ No newline at end of file
@@ -0,0 +1,45 @@
+# VTA COMPILER
+# ------------
+"""
+The standalone VTA compiler.
+The compiler API is loaded on first use, therefore importing the package (or one of its submodules) is cheap:
+    > import vta_compiler
+    > compiled = vta_compiler.compile(operations_dict, vta_config_dict)
+"""
+
+# Public name -> module which defines it
+_LAZY_ATTRIBUTES = {
+    "compile": "vta_compiler.main_vta_compiler",
+    "compile_program": "vta_compiler.main_vta_compiler",
+    "compile_layer": "vta_compiler.main_vta_compiler",
+    "hardware_configuration": "vta_compiler.main_vta_compiler",
+    "program_buffers": "vta_compiler.main_vta_compiler",
+    "write_layer_binaries": "vta_compiler.main_vta_compiler",
+    "network_definition": "vta_compiler.main_network_compiler",
+    "network_compiler": "vta_compiler.main_network_compiler",
+    "write_network_binaries": "vta_compiler.main_network_compiler",
+    "batch_compiler": "vta_compiler.main_batch_compiler",
+    "check_layer": "vta_compiler.main_simulator",
+    "check_network": "vta_compiler.main_simulator",
+    "parse_json_to_dict": "vta_compiler.utils.json_parser"
+}
+
+# Public name -> name in its module (compile does not shadow the builtin in main_vta_compiler)
+_ALIASES = {
+    "compile": "compile_program"
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), _ALIASES.get(name, name))
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module 'vta_compiler' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
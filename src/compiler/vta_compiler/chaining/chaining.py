@@ -0,0 +1,224 @@
+# IMPORT PACKAGES
+# ---------------
+import copy
+
+import numpy as np
+
+import vta_compiler.data_definition.matrix_generator as MG
+import vta_compiler.data_definition.data_definition as DF
+import vta_compiler.data_definition.matrix_multiplication as MM
+
+
+###############################################
+
+
+# CHAIN LAYER
+# -----------
+def chain_layer(operations_dict, previous_layer, hw_config, random_bound=4):
+    """
+    Make the INPUT of a layer read the OUT region of the previous layer.
+        - "CHAIN": "DIRECT" -> the INPUT is the previous output (same blocks, the INP region is the OUT region)
+        - "CHAIN": {"MODE": "IM2ROW", "TENSOR": [H, W], "KERNEL": [KH, KW], "STRIDE": S, "POOL": P}
+            -> the rows of the previous output are the pixels of a H x W tensor (the columns are the channels),
+               only one pixel every P pixels is read (pooling done in place by the previous layer),
+               the INPUT is the im2row of this tensor loaded with strided LOADs (no host reshaping).
+    Inputs:
+        - operations_dict (dict): The layer to chain (modified in place)
+        - previous_layer (dict): The compiled previous layer (see compile_layer)
+        - hw_config (dict): The hardware configuration
+    Outputs:
+        - inp_address (int): The physical address of the INP region (the previous OUT region)
+        - inp_gather (list): For each INP block, the LOAD segments (None if the blocks are loaded as usual)
+    """
+    block_size = hw_config["block_size"]
+    chain = operations_dict["CHAIN"]
+
+    # Check the layers
+    if not ("GEMM" in operations_dict):
+        raise Exception(f"ERROR: Only a GEMM INPUT can be chained ({operations_dict['NAME']})! \n\n")
+
+    # Get the previous OUT region
+    out_addr = next(addr for addr in previous_layer["base_addresses_list"] if addr["type"] == "OUT")
+    out_address = int(out_addr["physical_base_address"], 16)
+
+    # Rebuild the (padded) matrix computed by the previous layer
+    ALU_blocks = previous_layer["ALU_blocks"]
+    X_blocks_col = previous_layer["X_blocks_col"]
+    out_shape = (len(ALU_blocks) // X_blocks_col * block_size, X_blocks_col * block_size)
+    out_matrix = MM.reconstruct_matrix(ALU_blocks, out_shape, block_size)
+
+    # Chain the layer
+    operations_dict["MATRICES"] = copy.deepcopy(operations_dict["MATRICES"])
+    matrices = operations_dict["MATRICES"][0]
+    input_name = operations_dict["GEMM"][0]
+
+    if (chain == "DIRECT"):
+        if (previous_layer["idx_to_store"]):
+            raise Exception(f"ERROR: The OUT of {previous_layer['name']} is not stored as full blocks, it cannot be chained directly! \n\n")
+        matrices[input_name+"_VALUES"] = out_matrix
+        inp_gather = None
+
+    elif isinstance(chain, dict) and chain.get("MODE") == "IM2ROW":
+        inp_matrix, inp_gather = im2row_chaining(operations_dict, chain, previous_layer, out_matrix, out_addr,
+                                                 hw_config, random_bound)
+        matrices[input_name+"_VALUES"] = inp_matrix
+
+    else:
+        raise Exception(f"ERROR: Unknown chaining ({chain}) for the layer {operations_dict['NAME']}! \n\n")
+
+    return out_address, inp_gather
+
+# ---------------------------------------------
+
+# IM2ROW CHAINING
+# ---------------
+def im2row_chaining(operations_dict, chain, previous_layer, out_matrix, out_addr, hw_config, random_bound=4):
+    """
+    Express the im2row of the previous output as strided LOADs.
+    The INPUT columns are ordered (KH, KW, C) with C padded to block_size, therefore each INP vector is
+    block_size channels of a single pixel (i.e., a vector of the previous OUT region).
+    The WEIGHT rows, given in im2row order (C, KH, KW), are reordered accordingly.
+    Inputs:
+        - operations_dict (dict): The layer to chain (its INPUT and WEIGHT are updated)
+        - chain (dict): The chaining definition
+        - previous_layer (dict): The compiled previous layer
+        - out_matrix (np.array): The padded matrix computed by the previous layer
+        - out_addr (dict): The address of the previous OUT region
+    Outputs:
+        - inp_matrix (np.array): The padded INPUT matrix, as loaded in SRAM
+        - inp_gather (list): For each INP block, the LOAD segments (see gather_segments)
+    """
+    block_size = hw_config["block_size"]
+    matrices = operations_dict["MATRICES"][0]
+    input_name = operations_dict["GEMM"][0]
+    weight_name = operations_dict["GEMM"][1]
+    if (hw_config["batch"] > 1):
+        raise Exception(f"ERROR: The IM2ROW chaining gathers single pixels, it is not supported with LOG_BATCH > 0! \n\n")
+
+    # Get the chaining parameters
+    tensor_h, tensor_w = chain["TENSOR"]
+    kernel_h, kernel_w = chain["KERNEL"]
+    stride = chain.get("STRIDE", 1)
+    pool = chain.get("POOL", 1)
+
+    # Dimensions of the input tensor (after pooling) and of the output
+    in_h = (tensor_h - 1) // pool + 1
+    in_w = (tensor_w - 1) // pool + 1
+    out_h = (in_h - kernel_h) // stride + 1
+    out_w = (in_w - kernel_w) // stride + 1
+    nb_kernel = kernel_h * kernel_w
+
+    # Check the INPUT dimensions (im2row of the tensor)
+    A_row, A_col = matrices[input_name]
+    if (A_row != out_h * out_w or A_col % nb_kernel != 0):
+        raise Exception(f"ERROR: INPUT {[A_row, A_col]} is not the im2row of the chained tensor ({out_h * out_w} rows, {nb_kernel}*C columns)! \n\n")
+    channels = A_col // nb_kernel
+    channel_blocks = (channels - 1) // block_size + 1
+    if (channel_blocks > previous_layer["X_blocks_col"]):
+        raise Exception(f"ERROR: The chained tensor has {channels} channels while the previous output only has {previous_layer['X_blocks_col']*block_size} columns! \n\n")
+    padded_channels = channel_blocks * block_size
+
+    # WEIGHT: (C, KH, KW) rows -> (KH, KW, padded C) rows
+    B_row, B_col = matrices[weight_name]
+    if (B_row != A_col):
+        raise Exception(f"ERROR: Matrices not consistent: A_col={A_col} != B_row={B_row}! \n\n")
+    if not (weight_name+"_VALUES") in matrices:
+        B_matrix, _ = DF.random_matrix(operations_dict.get("SEED", None), "WGT", B_row, B_col, block_size=block_size,
+                                       random_bound=random_bound, dtype=hw_config["wgt_dtype"])
+    else:
+        B_matrix = MG.create_matrix_from_binary(file=matrices[weight_name+"_VALUES"], h=B_row, w=B_col, dtype=hw_config["wgt_dtype"])
+    B_chained = np.zeros((nb_kernel, padded_channels, B_col), dtype=B_matrix.dtype)
+    B_chained[:, :channels, :] = B_matrix.reshape(channels, nb_kernel, B_col).transpose(1, 0, 2)
+    matrices[weight_name] = [nb_kernel * padded_channels, B_col]
+    matrices[weight_name+"_VALUES"] = B_chained.reshape(nb_kernel * padded_channels, B_col)
+
+    # INPUT: row of the previous output read by each (output pixel, kernel position)
+    oy, ox, ky, kx = np.meshgrid(np.arange(out_h), np.arange(out_w), np.arange(kernel_h), np.arange(kernel_w), indexing='ij')
+    src_rows = ((oy * stride + ky) * pool) * tensor_w + (ox * stride + kx) * pool
+    src_rows = src_rows.reshape(out_h * out_w, nb_kernel)
+    if (src_rows.max() >= out_matrix.shape[0]):
+        raise Exception(f"ERROR: The chained tensor {[tensor_h, tensor_w]} is larger than the previous output ({out_matrix.shape[0]} rows)! \n\n")
+    matrices[input_name] = [A_row, nb_kernel * padded_channels]
+
+    # Padded INPUT matrix (as loaded in SRAM)
+    nb_row = ((A_row - 1) // block_size + 1) * block_size
+    inp_matrix = np.zeros((nb_row, nb_kernel * padded_channels), dtype=out_matrix.dtype)
+    inp_matrix[:A_row] = out_matrix[src_rows, :padded_channels].reshape(A_row, nb_kernel * padded_channels)
+
+    # DRAM address (logical) of each vector of the previous OUT region
+    out_logical_base = int(out_addr["logical_base_address"], 16)
+    X_blocks_col = previous_layer["X_blocks_col"]
+    idx_to_store = previous_layer["idx_to_store"]
+    vector_position = {vector: i for i, vector in enumerate(idx_to_store)}
+
+    def vector_address(row, col_block):
+        vector = ((row // block_size) * X_blocks_col + col_block, row % block_size)
+        if not (idx_to_store):
+            return out_logical_base + vector[0] * block_size + vector[1]
+        if not (vector in vector_position):
+            raise Exception(f"ERROR: The row {row} is not stored by {previous_layer['name']}, it cannot be chained! \n\n")
+        return out_logical_base + vector_position[vector]
+
+    # LOAD segments of each INP block (same order as the INPUT blocks)
+    inp_gather = []
+    for block_row in range(0, nb_row // block_size):
+        rows = range(block_row * block_size, (block_row + 1) * block_size)
+        for kernel_idx in range(0, nb_kernel):
+            for col_block in range(0, channel_blocks):
+                addresses = [vector_address(src_rows[r, kernel_idx], col_block) if (r < A_row) else None for r in rows]
+                inp_gather.append(gather_segments(addresses))
+
+    return inp_matrix, inp_gather
+
+# ---------------------------------------------
+
+# GATHER SEGMENTS
+# ---------------
+def gather_segments(addresses, max_pad=15):
+    """
+    Group the vectors of a block in strided LOADs.
+    Inputs:
+        - addresses (list): The DRAM (logical) address of each vector of the block, None for a vector set to 0
+        - max_pad (int): The maximum value of y_pad_top and y_pad_bottom
+    Outputs:
+        - segments (list): The LOADs (sram_offset, dram_base, y_size, x_stride, y_pad_top, y_pad_bottom),
+                           where sram_offset is the first vector (padding included) within the block
+    """
+    # Zero vectors before the first loaded vector
+    nb_vector = len(addresses)
+    first = 0
+    while (first < nb_vector and addresses[first] is None):
+        first += 1
+    if (first == nb_vector):
+        raise Exception(f"ERROR: A block without any vector to load cannot be chained! \n\n")
+    if (first > max_pad):
+        raise Exception(f"ERROR: Too many zero vectors ({first}) to pad! \n\n")
+
+    segments = []
+    i = first
+    pad_top = first
+    sram_offset = 0
+    while (i < nb_vector):
+        # Extend the segment while the gap is constant
+        dram_base = addresses[i]
+        y_size = 1
+        x_stride = 1
+        if (i + 1 < nb_vector and addresses[i+1] is not None and addresses[i+1] > dram_base):
+            x_stride = addresses[i+1] - dram_base
+            while (i + y_size < nb_vector and addresses[i+y_size] == dram_base + y_size * x_stride):
+                y_size += 1
+        i += y_size
+
+        # Zero vectors after the segment
+        pad_bottom = 0
+        while (i < nb_vector and addresses[i] is None):
+            pad_bottom += 1
+            i += 1
+        if (pad_bottom > max_pad):
+            raise Exception(f"ERROR: Too many zero vectors ({pad_bottom}) to pad! \n\n")
+
+        segments.append((sram_offset, dram_base, y_size, x_stride, pad_top, pad_bottom))
+        sram_offset += pad_top + y_size + pad_bottom
+        pad_top = 0
+
+    return segments
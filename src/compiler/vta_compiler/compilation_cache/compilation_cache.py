@@ -0,0 +1,160 @@
+# IMPORT PACKAGES
+# ---------------
+import os
+import json
+import pickle
+import hashlib
+
+import numpy as np
+
+
+###############################################
+
+
+# Default size of the cache (bytes)
+CACHE_MAX_SIZE = 2**30
+
+# Hash of the compiler sources (computed once)
+_compiler_version = None
+
+
+# COMPILER VERSION
+# ----------------
+def compiler_version():
+    """
+    The compiler version is the hash of its Python sources, therefore any change of the compiler invalidates the cache.
+    """
+    global _compiler_version
+    if (_compiler_version is None):
+        compiler_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        sha = hashlib.sha256()
+        for root, dirs, files in os.walk(compiler_dir):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            for filename in sorted(files):
+                if filename.endswith(".py"):
+                    path = os.path.join(root, filename)
+                    sha.update(os.path.relpath(path, compiler_dir).encode())
+                    with open(path, 'rb') as f:
+                        sha.update(f.read())
+        _compiler_version = sha.hexdigest()
+    return _compiler_version
+
+# ---------------------------------------------
+
+# NORMALIZE
+# ---------
+def normalize(value):
+    """
+    Replace the operand values (files or arrays) by the hash of their content, and the tuples by lists.
+    Inputs:
+        - value: An element of the operations dictionnary
+    Outputs:
+        - normalized: The JSON serializable element
+    """
+    if isinstance(value, dict):
+        return {str(key): normalize(item) for key, item in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    elif isinstance(value, np.ndarray):
+        return {"ARRAY": [str(value.dtype), list(value.shape), hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()]}
+    elif isinstance(value, str) and os.path.isfile(value):
+        with open(value, 'rb') as f:
+            return {"FILE": hashlib.sha256(f.read()).hexdigest()}
+    elif isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    elif isinstance(value, type): # Data type
+        return np.dtype(value).name
+    else:
+        return value
+
+# ---------------------------------------------
+
+# CACHE KEY
+# ---------
+def cache_key(operations_dict, hw_config, parameters={}, withValues=True):
+    """
+    Compute the key of a compiled layer.
+    The NAME only suffixes the binaries, it is not part of the key.
+    Without the values, the key identifies the program (strategy, instructions, UOPs and DRAM layout),
+    which only depends on the shapes and on the operations (the *_VALUES and the SEED only define the operands).
+    Inputs:
+        - operations_dict (dict): The operations to compile (before the data definition)
+        - hw_config (dict): The hardware configuration
+        - parameters (dict): The other parameters of the compilation (e.g., base address)
+        - withValues (bool): Whether the *_VALUES and the SEED are part of the key (layer) or not (program)
+    Outputs:
+        - key (str): The hexadecimal hash
+    """
+    operations = {key: value for key, value in operations_dict.items() if key != "NAME"}
+    if not (withValues):
+        operations.pop("SEED", None)
+    if not (withValues) and "MATRICES" in operations:
+        operations["MATRICES"] = [{name: value for name, value in matrices.items() if not name.endswith("_VALUES")}
+                                  for matrices in operations["MATRICES"]]
+    content = {
+        "entry": "layer" if (withValues) else "program",
+        "version": compiler_version(),
+        "operations": normalize(operations),
+        "hw_config": normalize(hw_config),
+        "parameters": normalize(parameters)
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+# ---------------------------------------------
+
+# CACHE LOAD
+# ----------
+def cache_load(cache_dir, key):
+    """
+    Get a compiled layer (or program) from the cache (the entry becomes the most recently used).
+    Outputs:
+        - entry (dict): The compiled layer (or program), None if it is not in the cache
+    """
+    path = os.path.join(cache_dir, key+'.pkl')
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except Exception: # Corrupted entry
+        os.remove(path)
+        return None
+    os.utime(path)
+    return entry
+
+# ---------------------------------------------
+
+# CACHE STORE
+# -----------
+def cache_store(cache_dir, key, entry, max_size=CACHE_MAX_SIZE):
+    """
+    Store a compiled layer (or program) in the cache, then evict the least recently used entries above max_size (bytes).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key+'.pkl')
+    tmp_path = path + f".{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    cache_eviction(cache_dir, max_size)
+
+# ---------------------------------------------
+
+# CACHE EVICTION
+# --------------
+def cache_eviction(cache_dir, max_size=CACHE_MAX_SIZE):
+    """
+    Remove the least recently used entries until the cache fits max_size (the most recent entry is kept).
+    """
+    entries = []
+    for filename in os.listdir(cache_dir):
+        if filename.endswith('.pkl'):
+            stat = os.stat(os.path.join(cache_dir, filename))
+            entries.append((stat.st_mtime, stat.st_size, filename))
+    entries.sort()
+
+    total_size = sum(size for _, size, _ in entries)
+    while (total_size > max_size and len(entries) > 1):
+        _, size, filename = entries.pop(0)
+        os.remove(os.path.join(cache_dir, filename))
+        total_size -= size
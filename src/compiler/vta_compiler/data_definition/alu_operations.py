@@ -2,6 +2,8 @@
 # ---------------
 import numpy as np
 
+import vta_compiler.data_definition.truncation as TR
+
 
 # ALU OPERATIONS
 # --------------
@@ -28,7 +30,13 @@ def alu_operations(matrix, alu_operations=[], block_size=16):
     # Execute the operations: ["OPS", [DST, SRC]] or ["OPS", [DST, SRC, NB_ITERATION]]
     for alu_ops in alu_operations:
         # Check if the operation is unique or iterative
-        if (len(alu_ops[1]) == 3): # Iterative: ["OPS", [[first DST idx, step], [first SRC idx, step], NB_ITERATION]]
+        if (len(alu_ops[1]) == 3 and alu_ops[1][0][1] > 0 and (alu_ops[0].endswith("_IMM") or alu_ops[0] == "RELU")):
+            # Iterative vector-scalar on distinct rows: all the rows at once
+            first_dst, step = alu_ops[1][0]
+            rows = slice(first_dst, first_dst + step * alu_ops[1][2], step)
+            matrix = perform_alu_operations(matrix, alu_operation=alu_ops[0], dst_idx=rows, elem2=alu_ops[1][1], isIMM=True)
+
+        elif (len(alu_ops[1]) == 3): # Iterative: ["OPS", [[first DST idx, step], [first SRC idx, step], NB_ITERATION]]
             for nb in range(0, alu_ops[1][2]):
                 # Get the current indexes
                 elem_dst = alu_ops[1][0][0] + alu_ops[1][0][1] * nb # 1st idx + step * nb
@@ -54,6 +62,150 @@ def alu_operations(matrix, alu_operations=[], block_size=16):
 
 # ---------------------------------------------
 
+# POST OPERATIONS
+# ---------------
+def post_operations(alu_operations, dtype=np.int8):
+    """
+    Expand the post-operations into ALU operations:
+        ["MAXPOOL2D", {"TENSOR": [N, H, W] or [H, W], "KERNEL": K or [KH, KW], "STRIDE": S or [SH, SW]}]
+        ["AVGPOOL2D", {...}] (sum of the window then SHR_IMM, the window size must be a power of 2)
+        ["REQUANT", {"SHIFT": S, "ROUNDING": true, "MIN": m, "MAX": M}] (see requant_operations)
+    For the poolings, the rows of the matrix are the pixels of the tensor (the columns are the channels).
+    The other operations are kept.
+    Inputs:
+        - alu_operations (list): The ALU operations of the operations JSON (not modified)
+        - dtype (np.dtype): The output type, its range is the default clamp of REQUANT
+    Outputs:
+        - alu_operations (list): The ALU operations without post-operations
+    """
+    expanded = []
+    for alu_ops in alu_operations:
+        if (alu_ops[0] == "MAXPOOL2D" or alu_ops[0] == "AVGPOOL2D"):
+            expanded.extend(pooling_operations(alu_ops[0], **pooling_parameters(alu_ops)))
+        elif (alu_ops[0] == "REQUANT"):
+            parameters = alu_ops[1] if (len(alu_ops) > 1) else {}
+            expanded.extend(requant_operations(shift=parameters.get("SHIFT", 0), rounding=parameters.get("ROUNDING", True),
+                                               min_value=parameters.get("MIN", int(np.iinfo(dtype).min)),
+                                               max_value=parameters.get("MAX", int(np.iinfo(dtype).max))))
+        else:
+            expanded.append(alu_ops)
+    return expanded
+
+# ---------------------------------------------
+
+# REQUANT OPERATIONS
+# ------------------
+def requant_operations(shift=0, rounding=True, min_value=-128, max_value=127):
+    """
+    Define a requantization as vector-scalar operations on all the rows (see truncation.requantize):
+        ["ADD_IMM", 1 << (shift-1)] (if rounding), ["SHR_IMM", shift], ["MIN_IMM", max_value], ["MAX_IMM", min_value]
+    Inputs:
+        - shift (int): The right shift (the scale is 2**-shift)
+        - rounding (bool): Round to the nearest (ties up) instead of flooring
+        - min_value, max_value (int): The saturation bounds
+    Outputs:
+        - alu_operations (list): The ALU operations
+    """
+    if (shift < 0 or shift > 31):
+        raise Exception(f"ERROR: REQUANT shift must be in [0, 31] (got {shift})! \n\n")
+    for value in (1 << (shift - 1) if (rounding and shift > 0) else 0, min_value, max_value):
+        if (value < -(1 << 15) or value >= (1 << 15)):
+            raise Exception(f"ERROR: REQUANT immediate {value} does not fit the 16-bit ALU immediate! \n\n")
+    if (min_value > max_value):
+        raise Exception(f"ERROR: REQUANT bounds are inconsistent (MIN {min_value} > MAX {max_value})! \n\n")
+
+    alu_operations = []
+    if (shift > 0):
+        if (rounding):
+            alu_operations.append(["ADD_IMM", 1 << (shift - 1)])
+        alu_operations.append(["SHR_IMM", shift])
+    alu_operations.append(["MIN_IMM", max_value])
+    alu_operations.append(["MAX_IMM", min_value])
+    return alu_operations
+
+# ---------------------------------------------
+
+# CHECK REQUANT
+# -------------
+def check_requant(acc_matrix, alu_matrix, alu_ops, dtype=np.int8):
+    """
+    Check the ALU operations of a REQUANT against its reference (see truncation.requantize).
+    Inputs:
+        - acc_matrix (np.ndarray): The accumulators before the ALU operations
+        - alu_matrix (np.ndarray): The accumulators after the ALU operations (see requant_operations)
+        - alu_ops (list): The REQUANT post-operation (["REQUANT", {...}])
+        - dtype (np.dtype): The output type, its range is the default clamp of REQUANT
+    """
+    parameters = alu_ops[1] if (len(alu_ops) > 1) else {}
+    reference = TR.requantize(acc_matrix, shift=parameters.get("SHIFT", 0), rounding=parameters.get("ROUNDING", True),
+                              out_dtype=dtype, min_value=parameters.get("MIN"), max_value=parameters.get("MAX"))
+    mismatches = int(np.count_nonzero(TR.truncate(alu_matrix, dtype) != reference))
+    if (mismatches > 0):
+        raise Exception(f"ERROR: The ALU operations of REQUANT differ from truncation.requantize ({mismatches} values)! \n\n")
+
+# ---------------------------------------------
+
+# POOLING PARAMETERS
+# ------------------
+def pooling_parameters(alu_ops):
+    """
+    Get the tensor (N, H, W), the kernel (KH, KW) and the stride (SH, SW) of a pooling post-operation.
+    """
+    if (len(alu_ops) < 2 or not isinstance(alu_ops[1], dict) or not ("TENSOR" in alu_ops[1])):
+        raise Exception(f"ERROR: {alu_ops[0]} requires its TENSOR ({alu_ops})! \n\n")
+    parameters = alu_ops[1]
+    tensor = parameters["TENSOR"]
+    kernel = parameters.get("KERNEL", 2)
+    kernel = (kernel, kernel) if isinstance(kernel, int) else tuple(kernel)
+    stride = parameters.get("STRIDE", kernel)
+    stride = (stride, stride) if isinstance(stride, int) else tuple(stride)
+    tensor = (1,) + tuple(tensor) if (len(tensor) == 2) else tuple(tensor)
+    return {"tensor": tensor, "kernel": kernel, "stride": stride}
+
+# ---------------------------------------------
+
+# POOLING OPERATIONS
+# ------------------
+def pooling_operations(pooling="MAXPOOL2D", tensor=(1, 2, 2), kernel=(2, 2), stride=(2, 2)):
+    """
+    Define a pooling as iterative ALU operations, the result of each window is written on its top-left pixel.
+    Each operation reduces one pixel of the windows of an output row: ["OP", [[DST, SW], [DST + offset, SW], OW]].
+    Inputs:
+        - pooling (str): "MAXPOOL2D" (MAX) or "AVGPOOL2D" (ADD, then SHR_IMM by log2(KH*KW))
+        - tensor (tuple): The shape (N, H, W) of the tensor, the pixel (n, y, x) is the row (n*H + y)*W + x
+        - kernel, stride (tuple): The window and the stride (the windows must not overlap)
+    Outputs:
+        - alu_operations (list): The ALU operations
+    """
+    batch, height, width = tensor
+    kernel_h, kernel_w = kernel
+    stride_h, stride_w = stride
+    if (stride_h < kernel_h or stride_w < kernel_w):
+        raise Exception(f"ERROR: {pooling} windows cannot overlap (kernel {list(kernel)}, stride {list(stride)})! \n\n")
+    out_h = (height - kernel_h) // stride_h + 1
+    out_w = (width - kernel_w) // stride_w + 1
+
+    operation = "MAX" if (pooling == "MAXPOOL2D") else "ADD"
+    if (pooling == "AVGPOOL2D"):
+        shift = (kernel_h * kernel_w).bit_length() - 1
+        if (kernel_h * kernel_w != 1 << shift):
+            raise Exception(f"ERROR: AVGPOOL2D divides by a shift, the window size ({kernel_h}x{kernel_w}) must be a power of 2! \n\n")
+
+    # Offset of each pixel of the window (except its top-left pixel)
+    offsets = [dy * width + dx for dy in range(0, kernel_h) for dx in range(0, kernel_w) if (dy, dx) != (0, 0)]
+
+    alu_operations = []
+    for n in range(0, batch):
+        for oy in range(0, out_h):
+            top_left = (n * height + oy * stride_h) * width
+            for offset in offsets:
+                alu_operations.append([operation, [[top_left, stride_w], [top_left + offset, stride_w], out_w]])
+            if (pooling == "AVGPOOL2D" and shift > 0):
+                alu_operations.append(["SHR_IMM", [[top_left, stride_w], shift, out_w]])
+    return alu_operations
+
+# ---------------------------------------------
+
 # CREATE_ALU_OPERATIONS_LIST
 # --------------------------
 def create_alu_operations_list(alu_operations, C_row=1, C_col=1, block_size=16):
@@ -94,6 +246,13 @@ def create_alu_operations_list(alu_operations, C_row=1, C_col=1, block_size=16):
             alu_ops = ["RELU", [[0, 1], 0, nb_iteration]]
             dst_idx = 0
             dst_step = 1
+
+        # Vector-scalar operation on all the rows: ["OP_IMM", imm]
+        elif (alu_ops[0].endswith("_IMM") and isinstance(alu_ops[1], int)):
+            nb_iteration = C_row
+            alu_ops = [alu_ops[0], [[0, 1], alu_ops[1], nb_iteration]]
+            dst_idx = 0
+            dst_step = 1
         
         # Check if the ALU is iterative or not
         elif (len(alu_ops[1]) == 3): # ITERATIVE
@@ -197,6 +356,66 @@ def perform_alu_operations(matrix, alu_operation="MAX_IMM", dst_idx=0, elem2=0,
 
 # ---------------------------------------------
 
+# BATCH ALU OPERATIONS
+# --------------------
+def batch_alu_operations(alu_operations, idx_to_store=[], batch=1):
+    """
+    Express the ALU operations and the vectors to store on the SRAM elements of a batched VTA:
+    an element holds batch consecutive rows, the row r of a block is the row r % batch of its element r // batch.
+    An ALU instruction applies on whole elements, thus each operation must apply on all the rows of its elements
+    (for a vector-vector operation, the row b of the DST element with the row b of the SRC elements).
+    Inputs:
+        - alu_operations (list): The ALU operations (see create_alu_operations_list)
+        - idx_to_store (list): The vectors to store (if empty, store everything)
+        - batch (int): The number of rows per element
+    Outputs:
+        - alu_operations (list): The ALU operations on the elements [(block idx, element idx)]
+        - idx_to_store (list): The elements to store
+    """
+    if (batch == 1):
+        return alu_operations, idx_to_store
+
+    batched_operations = []
+    for alu_ops in alu_operations:
+        if (alu_ops[0] == "ADD_ACC"): # Two matrices: on whole blocks
+            batched_operations.append(alu_ops)
+        elif (alu_ops[0].endswith("_IMM") or alu_ops[0] == "RELU"):
+            batched_operations.append([alu_ops[0], alu_ops[1], batch_vectors(alu_ops[2], batch, alu_ops[0])])
+        else:
+            batched_operations.append(batch_vector_operation(alu_ops, batch))
+
+    if (len(idx_to_store) > 0):
+        idx_to_store = batch_vectors(idx_to_store, batch, "The vectors to store")
+    return batched_operations, idx_to_store
+
+def batch_vectors(vectors, batch, name=""):
+    """
+    Express vectors [(block idx, row)] as elements, each element must hold its batch rows.
+    """
+    rows = {}
+    for block_idx, row in vectors:
+        rows.setdefault((block_idx, row // batch), set()).add(row % batch)
+    if any(len(offsets) != batch for offsets in rows.values()):
+        raise Exception(f"ERROR: {name} does not apply on whole elements of {batch} rows (LOG_BATCH > 0)! \n\n")
+    return list(rows.keys())
+
+def batch_vector_operation(alu_ops, batch):
+    """
+    Express a vector-vector operation on elements: the rows of the DST element must read the same rows of the SRC elements.
+    """
+    entries = {}
+    for dst_vector, src_vectors in alu_ops[2]:
+        offset = dst_vector[1] % batch
+        if any(vector[1] % batch != offset for vector in src_vectors):
+            raise Exception(f"ERROR: {alu_ops[0]} reads another row of the element than it writes (LOG_BATCH > 0)! \n\n")
+        key = ((dst_vector[0], dst_vector[1] // batch), tuple((vector[0], vector[1] // batch) for vector in src_vectors))
+        entries.setdefault(key, set()).add(offset)
+    if any(len(offsets) != batch for offsets in entries.values()):
+        raise Exception(f"ERROR: {alu_ops[0]} does not apply on whole elements of {batch} rows (LOG_BATCH > 0)! \n\n")
+    return [alu_ops[0], alu_ops[1], [(dst_element, list(src_elements)) for dst_element, src_elements in entries]]
+
+# ---------------------------------------------
+
 # DELETE MATRIX ROW
 # -----------------
 def delete_matrix_row(input_blocks, blocks_col=1, block_size=16, idx_to_store=[], matrix_height=1, padding=0):
@@ -0,0 +1,183 @@
+# IMPORT PACKAGES
+# ---------------
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# REFERENCE average pooling
+# -------------
+def pooling_windows(matrix, kernel_size=2, stride=2):
+    """
+    Transform the matrix into a tensor (one square channel per column) and get its pooling windows.
+    The windows are a reshape of the tensor when stride == kernel_size, otherwise strided views (no copy).
+
+    Returns:
+    windows -- the windows, shape (C, pooled_height, pooled_height, kernel_size, kernel_size)
+    channel_size -- the size of a channel (sqrt(H))
+    pooled_height -- the size of a pooled channel
+    """
+    # Get the height (H) and width (W) of the input matrix
+    H, W = matrix.shape
+
+    # Compute the size of the square channel tensor (sqrt(H)) and of the pooled channel
+    channel_size = int(np.sqrt(H))
+    pooled_height = (channel_size - kernel_size) // stride + 1
+
+    # Each column is a (channel_size x channel_size) channel
+    tensor = matrix[:channel_size**2].T.reshape(W, channel_size, channel_size)
+    if (stride == kernel_size):
+        cropped = tensor[:, :pooled_height*kernel_size, :pooled_height*kernel_size]
+        windows = cropped.reshape(W, pooled_height, kernel_size, pooled_height, kernel_size).transpose(0, 1, 3, 2, 4)
+    else:
+        windows = sliding_window_view(tensor, (kernel_size, kernel_size), axis=(1, 2))[:, ::stride, ::stride]
+    return windows, channel_size, pooled_height
+
+
+def reference_average_pooling(matrix, kernel_size=2, stride=2, debug=False):
+    """
+    Transform the matrix into a tensor, apply average pooling on the tensor (channel-wise),
+    then reshape it back into a matrix.
+
+    Arguments:
+    matrix -- the input matrix (ACC in your case), shape (H, C)
+    kernel_size -- the size of the pooling kernel (default is 2x2)
+    stride -- the stride of the pooling operation (default is 2)
+
+    Returns:
+    pooled_matrix -- the pooled matrix after transforming the tensor back to the matrix
+    """
+    windows, channel_size, pooled_height = pooling_windows(matrix, kernel_size, stride)
+
+    # Floor of the mean of each window (exact integer division)
+    pooled_tensor = windows.astype(np.int64).sum(axis=(3, 4)) // (kernel_size**2)
+    if (debug):
+        print(f"\nPOOLED TENSOR:\n{pooled_tensor}\n") # DEBUG
+
+    # Transform the channels back into a matrix
+    pooled_matrix = pooled_tensor.reshape(matrix.shape[1], pooled_height**2).T.astype(np.int32)
+    return pooled_matrix, channel_size, pooled_height
+
+
+def reference_max_pooling(matrix, kernel_size=2, stride=2, debug=False):
+    """
+    Transform the matrix into a tensor, apply max pooling on the tensor (channel-wise),
+    then reshape it back into a matrix (see reference_average_pooling).
+    """
+    windows, channel_size, pooled_height = pooling_windows(matrix, kernel_size, stride)
+
+    pooled_tensor = windows.max(axis=(3, 4))
+    if (debug):
+        print(f"\nPOOLED TENSOR:\n{pooled_tensor}\n") # DEBUG
+
+    # Transform the channels back into a matrix
+    pooled_matrix = pooled_tensor.reshape(matrix.shape[1], pooled_height**2).T.astype(np.int32)
+    return pooled_matrix, channel_size, pooled_height
+
+
+# SRAM average pooling
+# -------------
+def avg_pool_sram(matrix, kernel_size=2, stride=2, debug=False):
+    """
+    Emulate the 2x2 average pooling in SRAM: each row is added to the next one (2 by 2),
+    then the rows of two consecutive lines are added and shifted, the result is on the window's top-left row.
+    """
+    # Get the height (H) and width (W) of the input matrix
+    pooled_matrix = matrix.copy()
+    H, W = pooled_matrix.shape
+
+    # Compute the size of the square channel tensor (sqrt(H))
+    channel_size = int(np.sqrt(H))  # Each column will be reshaped into channel_size x channel_size
+    
+    # Calculate the dimensions of the pooled matrix after the pooling operation
+    pooled_height = (channel_size - kernel_size) // stride + 1
+
+    # Add 2 by 2
+    pooled_matrix[0:H-1:2] = pooled_matrix[0:H-1:2] + pooled_matrix[1::2]
+
+    # Add line + shift right (the sources are read before any window is written)
+    starts = np.arange(0, channel_size - kernel_size + 1, stride)
+    top_left = (starts[:, None]*channel_size + starts[None, :]).ravel()
+    pooled_matrix[top_left] = np.floor( (pooled_matrix[top_left] + pooled_matrix[top_left + channel_size])/(kernel_size**2) )
+
+    return pooled_matrix, channel_size, pooled_height
+
+
+# SRAM max pooling
+# -------------
+def max_pool_sram(matrix, kernel_size=2, stride=2, debug=False):
+    """
+    Emulate the max pooling in SRAM (see alu_operations.pooling_operations):
+    the maximum of each window is written on its top-left row, the other rows are unchanged.
+    """
+    pooled_matrix = matrix.copy()
+    windows, channel_size, pooled_height = pooling_windows(matrix, kernel_size, stride)
+
+    # Rows of the top-left pixels
+    starts = np.arange(0, pooled_height) * stride
+    top_left = (starts[:, None]*channel_size + starts[None, :]).ravel()
+    pooled_matrix[top_left] = windows.max(axis=(3, 4)).reshape(matrix.shape[1], pooled_height**2).T
+
+    return pooled_matrix, channel_size, pooled_height
+
+# Index computation
+# -------------
+def average_pooling_indexes(in_tensor_size=4, out_tensor_size=2, kernel_size=2, stride=2):
+    # Initialise the addresses to 0
+    indexes = []
+
+    # Loop to get the final index
+    i = 0
+    for outer_loop in range(0, out_tensor_size):
+        for inner_loop in range(0, out_tensor_size):
+            # Compute the final indexes
+            sram = 0x0000 + stride*inner_loop + (in_tensor_size*stride)*outer_loop
+            dram = 0x00000000 + inner_loop + out_tensor_size*outer_loop
+
+            # Compute the internal indexes
+            computation = []
+            for line in range(0, kernel_size):
+                for col in range(0, kernel_size):
+                    computation.append(
+                        hex(sram + col + line*in_tensor_size)
+                    )
+
+            # Write the data
+            indexes.append({
+                'I': i,
+                'SRAM HEX': hex(sram),
+                'SRAM DEC': sram,
+                'DRAM HEX': hex(dram),
+                'DRAM DEC': dram,
+                'Computation': computation
+            })
+            i = i + 1
+    return indexes
+
+
+# Test average pooling function
+# -------------
+if __name__ == '__main__':
+    kernel = 2
+    stride = 2
+
+    # INIT MATRIX
+    test_matrix = np.random.randint(-128, 127, size=(16, 2), dtype=np.int32)
+    print(f"The matrix: \n{test_matrix} \n")
+
+    # REFERENCE
+    pooled_matrix, in_tensor, out_tensor = reference_average_pooling(test_matrix, kernel, stride, debug=True)
+    print(f"The pooled matrix: \n{pooled_matrix} \n")
+
+    # SRAM RESULT
+    sram_matrix, _, _ = avg_pool_sram(test_matrix, kernel, stride, debug=True)
+    print(f"The SRAM matrix: \n{sram_matrix} \n")
+
+    # MAX POOLING
+    max_matrix, _, _ = reference_max_pooling(test_matrix, kernel, stride)
+    print(f"The max pooled matrix: \n{max_matrix} \n")
+
+    # INDEXES COMPUTATION
+    indexes = average_pooling_indexes(in_tensor, out_tensor, kernel, stride)
+    print("The indexes:")
+    for index in indexes:
+        print(index)
@@ -0,0 +1,168 @@
+# IMPORT PACKAGES
+# ---------------
+import copy
+
+import numpy as np
+
+import vta_compiler.data_definition.data_definition as DF
+import vta_compiler.data_definition.matrix_generator as MG
+import vta_compiler.data_definition.matrix_split as MS
+import vta_compiler.data_definition.tensor_conversion as TC
+import vta_compiler.chaining.chaining as CH
+
+
+###############################################
+
+
+# CONV2D LOWERING
+# ---------------
+def conv2d_lowering(operations_dict, hw_config, random_bound=4):
+    """
+    Lower a convolution into the GeMM of its im2row, the im2row is not stored in DRAM but loaded with strided LOADs.
+        - "MATRICES": [{"INPUT": [N, C, H, W], "WEIGHT": [OC, C, KH, KW]}] (optional "ACCUMULATOR": [N*OH*OW, OC])
+        - "CONV2D": {"INPUT": "INPUT", "WEIGHT": "WEIGHT", "STRIDE": S or [SH, SW], "PADDING": P or [PH, PW]}
+            (optional "ACCUMULATOR": "ACCUMULATOR")
+    The TENSOR of the pooling post-operations (see alu_operations.post_operations) defaults to the output (N, OH, OW).
+    The *_VALUES binaries are the NCHW input tensor and the (OC, C, KH, KW) kernels.
+    The INPUT columns are ordered (KH, KW, C) with C padded to block_size, therefore each INP vector is
+    block_size channels of a single pixel, read from the tensor (one row per pixel, NHWC) stored in the INP region.
+    The zero vectors (spatial padding) are the y_pad of the LOADs, or vectors of a zero block appended to the tensor.
+    Inputs:
+        - operations_dict (dict): The parsed operations JSON with a "CONV2D" operation (not modified)
+        - hw_config (dict): The hardware configuration
+    Outputs:
+        - gemm_dict (dict): The operations of the equivalent GeMM (the INPUT is the padded im2row, as loaded in SRAM)
+        - inp_blocks (list): The blocks of the tensor, i.e. the content of the INP region
+        - inp_gather (list): For each INP block, the LOAD segments (see chaining.gather_segments),
+                             their DRAM addresses are relative to the INP region
+    """
+    block_size = hw_config["block_size"]
+    inp_dtype = hw_config["inp_dtype"]
+    wgt_dtype = hw_config["wgt_dtype"]
+    seed = operations_dict.get("SEED", None)
+
+    # Get the convolution
+    conv = operations_dict["CONV2D"]
+    if ("GEMM" in operations_dict):
+        raise Exception(f"ERROR: CONV2D and GEMM cannot be defined in the same operations! \n\n")
+    matrices = operations_dict["MATRICES"][0]
+    input_name = conv.get("INPUT", "INPUT")
+    weight_name = conv.get("WEIGHT", "WEIGHT")
+    acc_name = conv.get("ACCUMULATOR", None)
+    stride = conv.get("STRIDE", 1)
+    padding = conv.get("PADDING", 0)
+    stride_h, stride_w = (stride, stride) if isinstance(stride, int) else stride
+    pad_h, pad_w = (padding, padding) if isinstance(padding, int) else padding
+
+    # Check the shapes
+    batch, channels, in_h, in_w = matrices[input_name]
+    out_channels, kernel_c, kernel_h, kernel_w = matrices[weight_name]
+    if (kernel_c != channels):
+        raise Exception(f"ERROR: Tensors not consistent: the INPUT has {channels} channels while the WEIGHT has {kernel_c}! \n\n")
+    out_h = (in_h + 2*pad_h - kernel_h) // stride_h + 1
+    out_w = (in_w + 2*pad_w - kernel_w) // stride_w + 1
+    if (out_h <= 0 or out_w <= 0):
+        raise Exception(f"ERROR: The kernel {[kernel_h, kernel_w]} is larger than the padded INPUT {[in_h + 2*pad_h, in_w + 2*pad_w]}! \n\n")
+    nb_kernel = kernel_h * kernel_w
+    channel_blocks = (channels - 1) // block_size + 1
+    padded_channels = channel_blocks * block_size
+
+    # Define the tensors (NCHW input, OIHW kernels)
+    if not (input_name+"_VALUES") in matrices:
+        X_matrix, _ = DF.random_matrix(seed, "INP", batch * channels * in_h, in_w, block_size=block_size,
+                                       random_bound=random_bound, dtype=inp_dtype)
+    else:
+        X_matrix = MG.create_matrix_from_binary(file=matrices[input_name+"_VALUES"], h=batch * channels * in_h, w=in_w, dtype=inp_dtype)
+    X_tensor = X_matrix.reshape(batch, channels, in_h, in_w)
+    if not (weight_name+"_VALUES") in matrices:
+        K_matrix, _ = DF.random_matrix(seed, "WGT", out_channels, channels * nb_kernel, block_size=block_size,
+                                       random_bound=random_bound, dtype=wgt_dtype)
+    else:
+        K_matrix = MG.create_matrix_from_binary(file=matrices[weight_name+"_VALUES"], h=out_channels, w=channels * nb_kernel, dtype=wgt_dtype)
+    K_tensor = K_matrix.reshape(out_channels, channels, kernel_h, kernel_w)
+
+
+    # ---------------------------------------------
+    # EQUIVALENT GEMM
+
+    A_row = batch * out_h * out_w
+    A_col = nb_kernel * padded_channels
+    nb_row = ((A_row - 1) // block_size + 1) * block_size
+
+    # Padded INPUT matrix (as loaded in SRAM, only used for the golden outputs)
+    inp_matrix = np.zeros((nb_row, A_col), dtype=inp_dtype)
+    inp_matrix[:A_row] = TC.im2row_channels_last(X_tensor, kernel_size=(kernel_h, kernel_w), stride=(stride_h, stride_w),
+                                                 padding=(pad_h, pad_w), block_size=block_size, dtype=inp_dtype)
+
+    gemm_dict = {key: value for key, value in operations_dict.items() if key != "CONV2D"}
+    gemm_dict["MATRICES"] = copy.deepcopy(operations_dict["MATRICES"])
+    gemm_matrices = gemm_dict["MATRICES"][0]
+    gemm_matrices[input_name] = [A_row, A_col]
+    gemm_matrices[input_name+"_VALUES"] = inp_matrix
+    gemm_matrices[weight_name] = [A_col, out_channels]
+    gemm_matrices[weight_name+"_VALUES"] = TC.ker2col_channels_last(K_tensor, block_size=block_size, dtype=wgt_dtype)
+    gemm_dict["GEMM"] = [input_name, weight_name] + ([acc_name] if (acc_name is not None) else [])
+    # The pooling post-operations apply on the output tensor by default
+    if ("ALU" in operations_dict):
+        gemm_dict["ALU"] = [[alu_ops[0], dict({"TENSOR": [batch, out_h, out_w]}, **(alu_ops[1] if (len(alu_ops) > 1) else {}))]
+                            if (alu_ops[0] in ("MAXPOOL2D", "AVGPOOL2D")) else alu_ops
+                            for alu_ops in operations_dict["ALU"]]
+
+
+    # ---------------------------------------------
+    # INP REGION (tensor, one row per pixel, followed by a block of zero pixels)
+
+    nb_pixel = batch * in_h * in_w
+    zero_pixel = ((nb_pixel - 1) // block_size + 1) * block_size
+    tensor_matrix = np.zeros((zero_pixel + block_size, padded_channels), dtype=inp_dtype)
+    tensor_matrix[:nb_pixel, :channels] = X_tensor.transpose(0, 2, 3, 1).reshape(nb_pixel, channels)
+    inp_blocks, _ = MS.matrix_splitting(matrix=tensor_matrix, block_size=block_size, isWeight=False, isSquare=True)
+
+    # Pixel read by each (INPUT row, kernel position), -1 for a zero vector
+    rows = np.arange(0, nb_row)
+    n, pixel = np.divmod(np.minimum(rows, A_row - 1), out_h * out_w)
+    oy, ox = np.divmod(pixel, out_w)
+    ky, kx = np.divmod(np.arange(0, nb_kernel), kernel_w)
+    iy = oy[:, None] * stride_h + ky[None, :] - pad_h
+    ix = ox[:, None] * stride_w + kx[None, :] - pad_w
+    isValid = (rows[:, None] < A_row) & (iy >= 0) & (iy < in_h) & (ix >= 0) & (ix < in_w)
+    src_pixels = np.where(isValid, (n[:, None] * in_h + iy) * in_w + ix, -1)
+
+    # LOAD segments of each INP block (same order as the INPUT blocks)
+    inp_gather = []
+    for block_row in range(0, nb_row // block_size):
+        block_pixels = src_pixels[block_row * block_size:(block_row + 1) * block_size]
+        for kernel_idx in range(0, nb_kernel):
+            pixels = zero_runs(block_pixels[:, kernel_idx].tolist(), zero_pixel)
+            for col_block in range(0, channel_blocks):
+                addresses = [None if (p < 0) else ((p // block_size) * channel_blocks + col_block) * block_size + p % block_size
+                             for p in pixels]
+                inp_gather.append(CH.gather_segments(addresses))
+
+    return gemm_dict, inp_blocks, inp_gather
+
+# ---------------------------------------------
+
+# ZERO RUNS
+# ---------
+def zero_runs(pixels, zero_pixel, max_pad=15):
+    """
+    Read the zero vectors which cannot be padded (a run longer than max_pad, or a whole block) from the zero block.
+    Inputs:
+        - pixels (list): The pixel of each vector of a block, -1 for a zero vector
+        - zero_pixel (int): The first pixel of the zero block
+    Outputs:
+        - pixels (list): The pixels, the remaining -1 are padded by the LOADs
+    """
+    nb_vector = len(pixels)
+    i = 0
+    while (i < nb_vector):
+        if (pixels[i] >= 0):
+            i += 1
+            continue
+        start = i
+        while (i < nb_vector and pixels[i] < 0):
+            i += 1
+        if (i - start > max_pad or i - start == nb_vector):
+            pixels[start:i] = [zero_pixel + j for j in range(start, i)]
+    return pixels
@@ -5,24 +5,45 @@ import sys
 
 import numpy as np
 
-import data_definition.matrix_generator as MG
-import data_definition.matrix_split as MS
-import data_definition.matrix_multiplication as MM
-import data_definition.alu_operations as ALU
-import data_definition.truncation as TR
+import vta_compiler.data_definition.matrix_generator as MG
+import vta_compiler.data_definition.matrix_split as MS
+import vta_compiler.data_definition.matrix_multiplication as MM
+import vta_compiler.data_definition.alu_operations as ALU
+import vta_compiler.data_definition.truncation as TR
 
 ###############################################
 
+# RANDOM MATRIX
+# -------------
+def random_matrix(seed, stream, n_row, n_col, block_size=16, random_bound=1, dtype=np.int8):
+    """
+    Draw a random matrix: with np.random if seed is None, else with the seeded generators (see matrix_generator),
+    in which case the matrix is directly drawn in its padded layout.
+    Outputs:
+        - matrix (np.array): The n_row x n_col matrix
+        - padded (np.array): The padded matrix (None without seed)
+    """
+    if (seed is None):
+        return MG.matrix_creation(n_row=n_row, n_col=n_col, isInitRandom=True, random_bound=random_bound, dtype=dtype), None
+    padded = MG.seeded_matrix_creation(seed, MG.STREAMS[stream], n_row=n_row, n_col=n_col, block_size=block_size,
+                                       random_bound=random_bound, dtype=dtype)
+    return padded[:n_row, :n_col], padded
+
+# ---------------------------------------------
+
 # MAIN FUNCTION
 # -------------
 def data_definition(operations_dict, inp_dtype=np.int8, wgt_dtype=np.int8, acc_dtype=np.int32,
-                    block_size=16, random_bound=1, debug=True):
+                    block_size=16, random_bound=1, doGolden=True, debug=True):
     # Check if operations_dict defines matrix operations
     if not "MATRICES" in operations_dict:
         raise Exception(f"ERROR: the operation is not a matrix operations!\n\n")
 
     # Get the matrices
     matrices = operations_dict["MATRICES"][0]
+
+    # Seed of the random matrices (None: np.random)
+    seed = operations_dict.get("SEED", None)
     
 
     # INIT
@@ -68,8 +89,8 @@ def data_definition(operations_dict, inp_dtype=np.int8, wgt_dtype=np.int8, acc_d
     # Check if there is ALU operations to perform
     alu_operations = []
     if "ALU" in operations_dict:
-        # Get the operation and the number of operations
-        alu_operations = operations_dict["ALU"]
+        # Get the operation and the number of operations (the post-operations are expanded)
+        alu_operations = ALU.post_operations(operations_dict["ALU"], dtype=inp_dtype)
         nb_alu = len(alu_operations)
 
         # Check if it is an ADD between two matrices
@@ -101,12 +122,18 @@ def data_definition(operations_dict, inp_dtype=np.int8, wgt_dtype=np.int8, acc_d
 
     # DEFINE THE MATRICES
     # ---
+    # Matrices drawn in their padded layout (seeded random matrices)
+    A_seeded, B_seeded, X_seeded, Y_seeded = None, None, None, None
     if (doGemm == True):
         # Input matrix
         A_row, A_col = matrices[input_name]
         # Define the values of the elements within the matrices
+        A_chained = None
         if not (input_name+"_VALUES") in matrices:
-            A_matrix = MG.matrix_creation(n_row=A_row, n_col=A_col, isInitRandom=True, random_bound=random_bound, dtype=inp_dtype)
+            A_matrix, A_seeded = random_matrix(seed, "INP", A_row, A_col, block_size=block_size, random_bound=random_bound, dtype=inp_dtype)
+        elif isinstance(matrices[input_name+"_VALUES"], np.ndarray): # Padded output of a previous layer (network compilation)
+            A_chained = matrices[input_name+"_VALUES"].astype(inp_dtype)
+            A_matrix = A_chained[:A_row, :A_col]
         else: # Read the INPUT_VALUES
             inp_file = matrices[input_name+"_VALUES"] # NOTE: the file path given in JSON must be an absolute path
             A_matrix = MG.create_matrix_from_binary(file=inp_file, h=A_row, w=A_col, dtype=inp_dtype) 
@@ -121,7 +148,7 @@ def data_definition(operations_dict, inp_dtype=np.int8, wgt_dtype=np.int8, acc_d
                 raise Exception(f"ERROR: Matrices not consistent: A_col={A_col} != B_row={B_row}! \n\n")
 
             if not (weight_name+"_VALUES") in matrices:
-                B_matrix = MG.matrix_creation(n_row=B_row, n_col=B_col, isInitRandom=True, random_bound=random_bound, dtype=wgt_dtype)
+                B_matrix, B_seeded = random_matrix(seed, "WGT", B_row, B_col, block_size=block_size, random_bound=random_bound, dtype=wgt_dtype)
             else: # Read the WEIGHT_VALUES
                 wgt_file = matrices[weight_name+"_VALUES"] # NOTE: the file path given in JSON must be an absolute path
                 B_matrix = MG.create_matrix_from_binary(file=wgt_file, h=B_row, w=B_col, dtype=wgt_dtype) 
@@ -139,7 +166,7 @@ def data_definition(operations_dict, inp_dtype=np.int8, wgt_dtype=np.int8, acc_d
             raise Exception(f"ERROR: Matrices not consistent: X_col={X_col} != B_col={B_col}! \n\n")
 
         if not (acc_name+"_VALUES") in matrices:
-            X_matrix = MG.matrix_creation(n_row=X_row, n_col=X_col, isInitRandom=True, random_bound=random_bound, dtype=acc_dtype)
+            X_matrix, X_seeded = random_matrix(seed, "ACC", X_row, X_col, block_size=block_size, random_bound=random_bound, dtype=acc_dtype)
         else: # Read the ACC_VALUES
             acc_file = matrices[acc_name+"_VALUES"] # NOTE: the file path given in JSON must be an absolute path
             X_matrix = MG.create_matrix_from_binary(file=acc_file, h=X_row, w=X_col, dtype=acc_dtype) 
@@ -160,7 +187,7 @@ def data_definition(operations_dict, inp_dtype=np.int8, wgt_dtype=np.int8, acc_d
             raise Exception(f"ERROR: Matrices not consistent: Y_col={Y_col} != X_col={X_col}! \n\n")
 
         if not (acc_bis_name+"_VALUES") in matrices:
-            Y_matrix = MG.matrix_creation(n_row=Y_row, n_col=Y_col, isInitRandom=True, random_bound=random_bound, dtype=acc_dtype)
+            Y_matrix, Y_seeded = random_matrix(seed, "ACC_BIS", Y_row, Y_col, block_size=block_size, random_bound=random_bound, dtype=acc_dtype)
         else: # Read the ACC_VALUES
             acc_bis_file = matrices[acc_bis_name+"_VALUES"] # NOTE: the file path given in JSON must be an absolute path
             Y_matrix = MG.create_matrix_from_binary(file=acc_bis_file, h=Y_row, w=Y_col, dtype=acc_dtype) 
@@ -182,11 +209,15 @@ def data_definition(operations_dict, inp_dtype=np.int8, wgt_dtype=np.int8, acc_d
     isSquare = True # TODO: For now, always square
     #isSquare = False if (operations_dict["MATRICES"][0]["INPUT"][0] == 1) else True
 
-    # PADDING
-    A_padded = MG.matrix_padding(matrix=A_matrix, block_size=block_size, isWeight=False, isSquare=isSquare)
-    B_padded = MG.matrix_padding(matrix=B_matrix, block_size=block_size, isWeight=True, isSquare=isSquare)
-    X_padded = MG.matrix_padding(matrix=X_matrix, block_size=block_size, isWeight=False, isSquare=isSquare)
-    Y_padded = MG.matrix_padding(matrix=Y_matrix, block_size=block_size, isWeight=False, isSquare=isSquare)
+    # PADDING (the seeded matrices are already padded)
+    A_padded = MG.matrix_padding(matrix=A_matrix, block_size=block_size, isWeight=False, isSquare=isSquare) if (A_seeded is None) else A_seeded
+    if (doGemm == True and A_chained is not None): # Keep the padding values stored by the previous layer
+        if (A_chained.shape != A_padded.shape):
+            raise Exception(f"ERROR: Chained input shape {A_chained.shape} != padded INPUT shape {A_padded.shape}! \n\n")
+        A_padded = A_chained
+    B_padded = MG.matrix_padding(matrix=B_matrix, block_size=block_size, isWeight=True, isSquare=isSquare) if (B_seeded is None) else B_seeded
+    X_padded = MG.matrix_padding(matrix=X_matrix, block_size=block_size, isWeight=False, isSquare=isSquare) if (X_seeded is None) else X_seeded
+    Y_padded = MG.matrix_padding(matrix=Y_matrix, block_size=block_size, isWeight=False, isSquare=isSquare) if (Y_seeded is None) else Y_seeded
 
     # SPLITTING
     A_blocks, A_blocks_col = MS.matrix_splitting(matrix=A_padded, block_size=block_size, isWeight=False, isSquare=isSquare)
@@ -194,6 +225,24 @@ def data_definition(operations_dict, inp_dtype=np.int8, wgt_dtype=np.int8, acc_d
     X_blocks, X_blocks_col = MS.matrix_splitting(matrix=X_padded, block_size=block_size, isWeight=False, isSquare=isSquare)
     Y_blocks, _ = MS.matrix_splitting(matrix=Y_padded, block_size=block_size, isWeight=False, isSquare=isSquare)
 
+    # Gather the flag in a dictionnary
+    flag_dict = {
+        "doGemm": doGemm,
+        "doMulConstant": doMulConstant,
+        "doAcc": doAcc,
+        "doAddMatrix": doAddMatrix,
+        "doAlu": doAlu
+    }
+
+    # Without the golden outputs (incremental compilation), the ALU operations and the vectors to store are not defined
+    if not (doGolden):
+        if (debug):
+            print("\nDATA DEFINITION: operands only (no golden outputs)\n")
+        return A_blocks, A_blocks_col, B_blocks, B_blocks_col, \
+               X_blocks, Y_blocks, None, None, C_init, X_blocks_col, \
+               [], [], \
+               flag_dict
+
 
 
     # ---------------------------------------------
@@ -229,8 +278,13 @@ def data_definition(operations_dict, inp_dtype=np.int8, wgt_dtype=np.int8, acc_d
     # Perform other ALU operations
     idx_to_store = []
     if (doAlu == True and doAddMatrix == False):
+        ACC_matrix = ALU_matrix.copy()
         ALU_matrix, alu_operations, idx_to_store = ALU.alu_operations(matrix=ALU_matrix, alu_operations=alu_operations, block_size=block_size)
 
+        # A single REQUANT is checked against its reference (see truncation.requantize)
+        if (len(operations_dict["ALU"]) == 1 and operations_dict["ALU"][0][0] == "REQUANT"):
+            ALU.check_requant(ACC_matrix, ALU_matrix, operations_dict["ALU"][0], dtype=inp_dtype)
+
 
 
     # ---------------------------------------------
@@ -335,15 +389,6 @@ def data_definition(operations_dict, inp_dtype=np.int8, wgt_dtype=np.int8, acc_d
     # ---------------------------------------------
     # RETURN 
 
-    # Gather the flag in a dictionnary
-    flag_dict = {
-        "doGemm": doGemm,
-        "doMulConstant": doMulConstant,
-        "doAcc": doAcc,
-        "doAddMatrix": doAddMatrix,
-        "doAlu": doAlu
-    }
-
     return A_blocks, A_blocks_col, B_blocks, B_blocks_col, \
            X_blocks, Y_blocks, ALU_blocks, C_blocks, C_init, X_blocks_col, \
            alu_operations, idx_to_store, \
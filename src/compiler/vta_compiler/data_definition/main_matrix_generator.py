@@ -5,15 +5,18 @@ import sys
 import csv
 import importlib
 import numpy as np
-import matrix_generator as MG
-import matrix_multiplication as MM
-import matrix_split as MS
-import json_generator as JG
-import memory_addresses as MA
-import average_pooling as AP
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from utils.find_project_root import *
+
+# Executed as a script from a checkout (e.g., python main_matrix_generator.py): make the vta_compiler package importable
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import vta_compiler.data_definition.matrix_generator as MG
+import vta_compiler.data_definition.matrix_multiplication as MM
+import vta_compiler.data_definition.matrix_split as MS
+import vta_compiler.data_definition.json_generator as JG
+import vta_compiler.data_definition.memory_addresses as MA
+import vta_compiler.data_definition.average_pooling as AP
+from vta_compiler.utils.find_project_root import *
 
 
 # MAIN FUNCTION
@@ -16,6 +16,63 @@ def matrix_creation(n_row=16, n_col=16, isInitRandom=True, random_bound=0, dtype
     return matrix
 
 
+# SEEDED MATRIX GENERATOR
+# -----------------------
+# The values of a seeded matrix are drawn by counter-based generators (Philox) whose key is (seed, stream),
+# each generator draws a chunk of CHUNK_BLOCKS blocks: any block can be regenerated from (seed, stream, block index)
+CHUNK_BLOCKS = 64
+# Stream of each matrix of a layer
+STREAMS = {"INP": 0, "WGT": 1, "ACC": 2, "ACC_BIS": 3}
+
+
+def derived_seed(seed, index):
+    """Derive the seed of a sub-problem (e.g., the i-th layer of a network) from a seed."""
+    return int(np.random.SeedSequence([seed, index]).generate_state(1, dtype=np.uint64)[0])
+
+
+def random_chunk(seed, stream, chunk_idx, block_size=16, random_bound=0, dtype=np.int8, onlyPositive=False):
+    """Draw the CHUNK_BLOCKS blocks (block_size x block_size) of a chunk, with the same bounds as matrix_creation."""
+    low_bound = 0 if onlyPositive else -random_bound
+    generator = np.random.Generator(np.random.Philox(key=[seed % 2**64, stream], counter=[0, 0, chunk_idx, 0]))
+    return generator.integers(low_bound, random_bound - 1, size=(CHUNK_BLOCKS, block_size, block_size), dtype=dtype)
+
+
+def random_block(seed, stream, block_idx, n_row, n_col, block_size=16, random_bound=0, dtype=np.int8, onlyPositive=False):
+    """Regenerate a block of a seeded matrix (see seeded_matrix_creation) without generating the matrix.
+       The blocks are indexed as in matrix_split.matrix_splitting (row-major), the padding is 0."""
+    block = random_chunk(seed, stream, block_idx // CHUNK_BLOCKS, block_size, random_bound, dtype, onlyPositive)[block_idx % CHUNK_BLOCKS]
+    # Pad with 0
+    blocks_col = (n_col + block_size - 1) // block_size
+    block_row_idx, block_col_idx = divmod(block_idx, blocks_col)
+    block[max(0, n_row - block_row_idx * block_size):, :] = 0
+    block[:, max(0, n_col - block_col_idx * block_size):] = 0
+    # Return the block
+    return block
+
+
+def seeded_matrix_creation(seed, stream, n_row=16, n_col=16, block_size=16, random_bound=0, dtype=np.int8, onlyPositive=False):
+    """Create a seeded random matrix directly padded to a multiple of block_size (rows and columns).
+       The blocks are drawn chunk by chunk, block i is random_block(seed, stream, i, n_row, n_col, ...)."""
+    blocks_row = (n_row + block_size - 1) // block_size
+    blocks_col = (n_col + block_size - 1) // block_size
+    nb_blocks = blocks_row * blocks_col
+    nb_chunks = (nb_blocks + CHUNK_BLOCKS - 1) // CHUNK_BLOCKS
+
+    # Draw the blocks
+    blocks = np.empty((nb_chunks * CHUNK_BLOCKS, block_size, block_size), dtype=dtype)
+    for chunk_idx in range(0, nb_chunks):
+        blocks[chunk_idx * CHUNK_BLOCKS:(chunk_idx + 1) * CHUNK_BLOCKS] = \
+            random_chunk(seed, stream, chunk_idx, block_size, random_bound, dtype, onlyPositive)
+
+    # Blocked layout -> padded matrix, then pad with 0
+    matrix = blocks[:nb_blocks].reshape(blocks_row, blocks_col, block_size, block_size) \
+                               .transpose(0, 2, 1, 3).reshape(blocks_row * block_size, blocks_col * block_size)
+    matrix[n_row:, :] = 0
+    matrix[:, n_col:] = 0
+    # Return the padded matrix
+    return matrix
+
+
 def matrix_diagonal(diag_value=0, block_size=16, dtype=np.int8):
     """Create a diagonal matrix with dtype values (e.g., int8 or int32)."""
     # Check if the diag value is an integer
@@ -29,9 +86,13 @@ def matrix_diagonal(diag_value=0, block_size=16, dtype=np.int8):
 
 
 def create_matrix_from_binary(file="test.bin", h=1, w=1, dtype=np.int8):
-    """Create a matrix from a binary file (the binary file must be arranged as the numpy .tofile function)."""
+    """Create a matrix from a binary file (the binary file must be arranged as the numpy .tofile function).
+       The values can also be given directly as a numpy array (e.g., computed by a previous layer)."""
     # Read the data (1D)
-    flat_array = np.fromfile(file, dtype=dtype)
+    if isinstance(file, np.ndarray):
+        flat_array = file.astype(dtype).flatten()
+    else:
+        flat_array = np.fromfile(file, dtype=dtype)
     
     # Reshaphe the data in 2D (h, w)
     matrix = flat_array.reshape((h, w))
@@ -81,13 +81,8 @@ def reconstruct_matrix(blocks, original_shape, block_size=16):
     rows = (original_shape[0] + block_size - 1) // block_size
     cols = (original_shape[1] + block_size - 1) // block_size
     
-    # Initialize the full matrix with zeros
-    full_matrix = np.zeros((rows * block_size, cols * block_size), dtype=blocks[0].dtype)
-    
-    # Fill in the blocks
-    for i in range(rows):
-        for j in range(cols):
-            block_index = i * cols + j
-            full_matrix[i*block_size:(i+1)*block_size, j*block_size:(j+1)*block_size] = blocks[block_index]
+    # Blocks (row-major) -> (rows, block_size, cols, block_size) -> full matrix
+    full_matrix = np.stack(blocks[:rows * cols]).reshape(rows, cols, block_size, block_size) \
+                    .transpose(0, 2, 1, 3).reshape(rows * block_size, cols * block_size)
     
     return full_matrix[:original_shape[0], :original_shape[1]]  # Trunc to initial dimension
@@ -43,3 +43,13 @@ def matrix_splitting(matrix, block_size=16, isWeight=False, isSquare=True):
 
     # Return the list of blocks
     return blocks, blocks_col
+
+
+def compact_blocks(blocks, blocks_col, n_row, block_size=16):
+    """Get the blocks as stored in DRAM without the rows padding the last row of blocks
+    (the padding rows are synthesized by the LOAD instructions), the blocks are views of the padded blocks."""
+    nb_vector = n_row % block_size
+    if (nb_vector == 0):
+        return blocks
+    nb_blocks = len(blocks)
+    return blocks[:nb_blocks - blocks_col] + [block[:nb_vector] for block in blocks[nb_blocks - blocks_col:]]
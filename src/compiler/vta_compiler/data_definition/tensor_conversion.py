@@ -0,0 +1,174 @@
+# IMPORT PACKAGES
+# ---------------
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# TENSOR -> MATRIX
+# ----------------
+def im2row(X, kernel_size=2, stride=1, dtype=np.int8):
+    """
+    Converts an input tensor X into a matrix (im2row), each row is a flattened patch (C, KH, KW).
+    The patches are strided views of X (sliding_window_view), there is no loop over the patches.
+
+    Arguments:
+    X -- Input tensor of shape (batch_size, input_channels, input_height, input_width)
+    kernel_size -- Filter size (height, width), or an int for a square filter
+    stride -- Convolution stride
+    dtype -- Data type of the matrix (the values are cast as by an assignment)
+
+    Returns:
+    A matrix of shape (batch_size * output_height * output_width, input_channels * kernel_height * kernel_width)
+    """
+    batch_size, input_channels, input_height, input_width = X.shape
+    kernel_height, kernel_width = (kernel_size, kernel_size) if isinstance(kernel_size, int) else kernel_size
+
+    # Patches: (batch, C, output_height, output_width, KH, KW)
+    patches = sliding_window_view(X, (kernel_height, kernel_width), axis=(2, 3))[:, :, ::stride, ::stride]
+    output_height, output_width = patches.shape[2:4]
+
+    # One row per (batch, output pixel), the columns are (C, KH, KW)
+    rows = batch_size * output_height * output_width
+    cols = input_channels * kernel_height * kernel_width
+    return patches.transpose(0, 2, 3, 1, 4, 5).reshape(rows, cols).astype(dtype)
+
+
+def im2row_channels_last(X, kernel_size=2, stride=1, padding=0, block_size=16, dtype=np.int8):
+    """
+    Converts an input tensor X into a matrix (im2row) whose columns are ordered (KH, KW, C),
+    with C padded to a multiple of block_size: each block_size columns are the channels of a single pixel.
+    The spatial padding is made of zero pixels.
+
+    Arguments:
+    X -- Input tensor of shape (batch_size, input_channels, input_height, input_width)
+    kernel_size -- Filter size (height, width), or an int for a square filter
+    stride -- Convolution stride (height, width), or an int
+    padding -- Zero padding on each side (height, width), or an int
+    block_size -- The channels are padded to a multiple of block_size
+
+    Returns:
+    A matrix of shape (batch_size * output_height * output_width, kernel_height * kernel_width * padded_channels)
+    """
+    batch_size, input_channels, input_height, input_width = X.shape
+    kernel_height, kernel_width = (kernel_size, kernel_size) if isinstance(kernel_size, int) else kernel_size
+    stride_height, stride_width = (stride, stride) if isinstance(stride, int) else stride
+    pad_height, pad_width = (padding, padding) if isinstance(padding, int) else padding
+    padded_channels = ((input_channels - 1) // block_size + 1) * block_size
+
+    # Padded tensor (batch, H + 2*pad, W + 2*pad, padded C)
+    X_padded = np.zeros((batch_size, input_height + 2*pad_height, input_width + 2*pad_width, padded_channels), dtype=dtype)
+    X_padded[:, pad_height:pad_height+input_height, pad_width:pad_width+input_width, :input_channels] = X.transpose(0, 2, 3, 1)
+
+    # Patches: (batch, output_height, output_width, padded C, KH, KW)
+    patches = sliding_window_view(X_padded, (kernel_height, kernel_width), axis=(1, 2))[:, ::stride_height, ::stride_width]
+    output_height, output_width = patches.shape[1:3]
+
+    # One row per (batch, output pixel), the columns are (KH, KW, padded C)
+    rows = batch_size * output_height * output_width
+    cols = kernel_height * kernel_width * padded_channels
+    return patches.transpose(0, 1, 2, 4, 5, 3).reshape(rows, cols)
+
+
+def ker2col(K, dtype=np.int8):
+    """
+    Converts convolution weights (kernels) into a matrix (ker2col), each column is a flattened 3D filter (C, KH, KW).
+
+    Arguments:
+    K -- Kernel weights of shape (output_channels, input_channels, kernel_height, kernel_width)
+
+    Returns:
+    A matrix of shape (input_channels * kernel_height * kernel_width, output_channels)
+    """
+    output_channels = K.shape[0]
+    return K.reshape(output_channels, -1).T.astype(dtype)
+
+
+def ker2col_channels_last(K, block_size=16, dtype=np.int8):
+    """
+    Converts convolution weights (kernels) into a matrix whose rows are ordered (KH, KW, C) with C padded
+    to a multiple of block_size, i.e., the weights of im2row_channels_last.
+
+    Arguments:
+    K -- Kernel weights of shape (output_channels, input_channels, kernel_height, kernel_width)
+
+    Returns:
+    A matrix of shape (kernel_height * kernel_width * padded_channels, output_channels)
+    """
+    output_channels, input_channels, kernel_height, kernel_width = K.shape
+    padded_channels = ((input_channels - 1) // block_size + 1) * block_size
+    K_padded = np.zeros((kernel_height, kernel_width, padded_channels, output_channels), dtype=dtype)
+    K_padded[:, :, :input_channels, :] = K.transpose(2, 3, 1, 0)
+    return K_padded.reshape(kernel_height * kernel_width * padded_channels, output_channels)
+
+
+def mat_to_tensor(res, batch_size, output_channels, output_height, output_width):
+    """
+    Converts a result matrix (after matmul) into a 4D tensor by rearranging the channels.
+
+    Arguments:
+    res -- Result matrix after matmul
+    batch_size -- Batch size
+    output_channels -- Number of filters (output channels)
+    output_height -- Height of the output
+    output_width -- Width of the output
+
+    Returns:
+    A tensor of shape (batch_size, output_channels, output_height, output_width)
+    """
+    return res.T.reshape(batch_size, output_channels, output_height, output_width)
+
+
+# BINARY -> BLOCKS -> MATRIX
+# --------------------------
+def to_blocks(vector, block_col, block_size):
+    """
+    Transforms a 1D vector (e.g., a binary file) into a (block_row, block_col, block_size, block_size) array of blocks.
+    The full block rows are a view of the vector, the remaining elements form a last row of block_col
+    (subheight x block_size) blocks, padded with zero rows to block_size.
+
+    Args:
+        vector: Input 1D array (will be converted to numpy array)
+        block_col: Number of blocks per row
+        block_size: Base size for square blocks (width for last row blocks)
+
+    Returns:
+        Numpy array of shape (block_row, block_col, block_size, block_size)
+    """
+    vector = np.asarray(vector)
+    elements_per_full_row = block_col * block_size**2
+    block_row, remaining = divmod(len(vector), elements_per_full_row)
+
+    # Complete rows: (block_row, block_col, block_size, block_size)
+    blocks = vector[:block_row * elements_per_full_row].reshape(block_row, block_col, block_size, block_size)
+    if (remaining == 0):
+        return blocks
+
+    # Last incomplete row: (block_col, subheight, block_size) padded to (1, block_col, block_size, block_size)
+    if (remaining % (block_col * block_size) != 0):
+        raise Exception(f"ERROR: The {remaining} remaining elements do not form {block_col} blocks of {block_size}-element rows! \n\n")
+    subheight = remaining // (block_col * block_size)
+    last_row = np.pad(vector[block_row * elements_per_full_row:].reshape(1, block_col, subheight, block_size),
+                      ((0, 0), (0, 0), (0, block_size - subheight), (0, 0)))
+    return np.concatenate((blocks, last_row), axis=0)
+
+
+def unsplit(blocks, block_size, matrix_height, matrix_width, dtype=np.int8):
+    """
+    Reconstructs a matrix from blocks created by to_blocks(), removing padding.
+
+    Args:
+        blocks: (block_row, block_col, block_size, block_size) array from to_blocks()
+        block_size: Original block size used for splitting
+        matrix_height: Original matrix height (without padding)
+        matrix_width: Original matrix width (without padding)
+
+    Returns:
+        Reconstructed matrix as numpy array
+    """
+    blocks = np.asarray(blocks)
+    block_row, block_col = blocks.shape[:2]
+    if (matrix_height > block_row * block_size or matrix_width > block_col * block_size):
+        raise Exception(f"ERROR: The blocks ({block_row}x{block_col}) cannot hold a {matrix_height}x{matrix_width} matrix! \n\n")
+    matrix = blocks.transpose(0, 2, 1, 3).reshape(block_row * block_size, block_col * block_size)
+    return matrix[:matrix_height, :matrix_width].astype(dtype)
+
@@ -17,4 +17,30 @@ def truncate(x: np.ndarray, out_dtype: np.dtype) -> np.ndarray:
     num_bits = output_dtype.itemsize * 8
     mask = (1 << num_bits) - 1
 
-    return np.bitwise_and(x, mask).astype(output_dtype)
\ No newline at end of file
+    return np.bitwise_and(x, mask).astype(output_dtype)
+
+
+def requantize(x: np.ndarray, shift: int, rounding: bool = True, out_dtype: np.dtype = np.int8,
+               min_value: int = None, max_value: int = None) -> np.ndarray:
+    """
+    Requantize an accumulator array x to a smaller integer type (out_dtype):
+    arithmetic right shift (rounded to the nearest, ties up, if rounding), then saturation to [min_value, max_value].
+    It is the reference of the REQUANT post-operation (see alu_operations.requant_operations).
+
+    Args:
+        x (np.ndarray): The input array (e.g., with dtype int32).
+        shift (int): The right shift.
+        rounding (bool): Add 2**(shift-1) before the shift.
+        out_dtype (np.dtype): The target NumPy integer dtype (e.g., np.int8).
+        min_value, max_value (int): The saturation bounds (default: the out_dtype range).
+
+    Returns:
+        np.ndarray: A new array with the requantized values and the specified out_dtype.
+    """
+    info = np.iinfo(out_dtype)
+    min_value = info.min if (min_value is None) else min_value
+    max_value = info.max if (max_value is None) else max_value
+    x = x.astype(np.int64)
+    if (rounding and shift > 0):
+        x = x + (1 << (shift - 1))
+    return np.clip(x >> shift, min_value, max_value).astype(out_dtype)
@@ -10,7 +10,7 @@ import numpy as np
 # ---------------
 def dram_allocation(object_list, base_addr=0x0000, block_size=16, 
                     inp_dtype=np.int8, wgt_dtype=np.int8, acc_dtype=np.int32,
-                    dram_offset=0x0000, debug=True):
+                    dram_offset=0x0000, batch=1, debug=True):
     # Define the page size (4KiB = 0x1000)
     page_size = 0x1000
 
@@ -22,21 +22,25 @@ def dram_allocation(object_list, base_addr=0x0000, block_size=16,
 
     # Iterate over the object
     for obj_type, *rest in object_list:
-        # Reset forced_size
+        # Reset forced_size and fixed_addr
         forced_size = 0
+        fixed_addr = None
 
-        # Get the object value and the forced size (if it exists)
+        # Get the object value, the forced size and the fixed physical address (if they exist)
         obj_value = rest[0]
-        if (len(rest) == 2):
+        if (len(rest) >= 2):
             forced_size = rest[1]
+        if (len(rest) == 3):
+            fixed_addr = rest[2]
         
         # Check the object type to define the logical divisor for logical address
+        # (an INP, ACC or OUT element holds batch vectors)
         if (obj_type == "INP" or obj_type == "OUT"):
-            logical_divisor = np.dtype(inp_dtype).itemsize * block_size
+            logical_divisor = np.dtype(inp_dtype).itemsize * block_size * batch
         elif (obj_type == "WGT"):
             logical_divisor = np.dtype(wgt_dtype).itemsize * block_size * block_size
         elif (obj_type == "ACC" or obj_type == "ACC_BIS"):
-            logical_divisor = np.dtype(acc_dtype).itemsize * block_size
+            logical_divisor = np.dtype(acc_dtype).itemsize * block_size * batch
         elif (obj_type == "UOP"):
             logical_divisor = 4
         elif (obj_type == "INSN"):
@@ -49,7 +53,12 @@ def dram_allocation(object_list, base_addr=0x0000, block_size=16,
             continue
         
         # Get the object address
-        obj_addr, current_dram_addr = addresses_computation(obj_type, obj_value, page_size, current_dram_addr, dram_offset, logical_divisor, forced_size)
+        if (fixed_addr is None):
+            obj_addr, current_dram_addr = addresses_computation(obj_type, obj_value, page_size, current_dram_addr, dram_offset, logical_divisor, forced_size)
+        else: # The object is placed on an already allocated region (current_dram_addr is not updated)
+            if (fixed_addr % page_size != 0):
+                raise Exception(f"ERROR: The fixed address of {obj_type} ({hex(fixed_addr)}) is not aligned on a page! \n\n")
+            obj_addr, _ = addresses_computation(obj_type, obj_value, page_size, fixed_addr - 1, dram_offset, logical_divisor, forced_size)
 
         # Increment the addresses list
         base_addresses.append(obj_addr)
@@ -74,24 +83,16 @@ def addresses_computation(obj_type, obj_value, page_size, current_dram_addr, dra
     page_idx = (current_dram_addr // page_size)
     current_dram_addr = (page_idx + 1) * page_size
 
-    # Define the address of the blocks
-    blocks_addresses = []
-    local_addr = current_dram_addr
+    # Define the map of the blocks (see blocks_map)
+    blocks = blocks_map([], current_dram_addr, dram_offset, logical_divisor)
     if not (obj_value):
         alloc_size_bytes = logical_divisor
     elif (obj_type == "UOP" or obj_type == "INSN"):
         alloc_size_bytes = len(obj_value) * logical_divisor
     else:
-        for i, matrix in enumerate(obj_value):
-            blocks_addresses.append(
-                (#get_block_name(obj_type, i),
-                 i, # Just write the index of the block
-                 hex( local_addr ), # physical address
-                 hex( (local_addr - dram_offset) // logical_divisor )) # Logical address
-            )
-            local_addr = local_addr + matrix.nbytes
-
-        # Define the size of the allocation 
+        blocks = blocks_map(obj_value, current_dram_addr, dram_offset, logical_divisor)
+
+        # Define the size of the allocation 
         if (forced_size > 0):
             alloc_size_bytes = forced_size
         else:
@@ -103,7 +104,7 @@ def addresses_computation(obj_type, obj_value, page_size, current_dram_addr, dra
         "physical_base_address": hex( current_dram_addr ),
         "logical_base_address": hex( (current_dram_addr - dram_offset) // logical_divisor ),
         "size": alloc_size_bytes,
-        "blocks_addresses": blocks_addresses
+        "blocks_map": blocks
     }
 
     # Update current_dram_addr
@@ -112,6 +113,143 @@ def addresses_computation(obj_type, obj_value, page_size, current_dram_addr, dra
     # Return
     return obj_addr, current_dram_addr
 
+# ---------------------------------------------
+
+# BLOCKS MAP
+# ----------
+def blocks_map(obj_value, base_address, dram_offset, logical_divisor):
+    """
+    Define the addresses of the blocks of a region relative to its base address (no address per block).
+    The blocks are contiguous: they are defined by a stride if they all have the same size, else by their offsets.
+    Inputs:
+        - obj_value (list): The blocks (NumPy arrays) in DRAM order
+        - base_address (int): The physical address of the region
+        - dram_offset (int): The physical address of the logical address 0
+        - logical_divisor (int): The bytes per logical address
+    Outputs:
+        - blocks (dict): The number of blocks, the stride (bytes, None if the sizes differ), the offsets (bytes, uint64 array,
+                         None with a stride), the logical divisor and the remainder of the base (see block_logical_address)
+    """
+    sizes = np.fromiter((matrix.nbytes for matrix in obj_value), dtype=np.uint64, count=len(obj_value))
+    isUniform = (len(sizes) > 0 and bool(np.all(sizes == sizes[0])))
+    return {
+        "count": len(sizes),
+        "stride": int(sizes[0]) if (isUniform) else None,
+        "offsets": None if (isUniform) else np.cumsum(sizes) - sizes,
+        "divisor": logical_divisor,
+        "remainder": (base_address - dram_offset) % logical_divisor
+    }
+
+# ---------------------------------------------
+
+# BLOCK ADDRESSES
+# ---------------
+def block_offset(obj_addr, block_idx):
+    """
+    Get the offset (bytes) of a block from the base address of its region (see blocks_map).
+    """
+    blocks = obj_addr["blocks_map"]
+    if not (0 <= block_idx < blocks["count"]):
+        raise Exception(f"ERROR: The block {block_idx} is not in the {obj_addr['type']} region ({blocks['count']} blocks)! \n\n")
+    if (blocks["stride"] is not None):
+        return block_idx * blocks["stride"]
+    return int(blocks["offsets"][block_idx])
+
+
+def block_physical_address(obj_addr, block_idx):
+    """
+    Get the physical address of a block.
+    """
+    return int(obj_addr["physical_base_address"], 16) + block_offset(obj_addr, block_idx)
+
+
+def block_logical_address(obj_addr, block_idx):
+    """
+    Get the logical address of a block, i.e., (physical address - dram_offset) // logical divisor.
+    """
+    blocks = obj_addr["blocks_map"]
+    return int(obj_addr["logical_base_address"], 16) + (blocks["remainder"] + block_offset(obj_addr, block_idx)) // blocks["divisor"]
+
+
+def blocks_addresses(obj_addr):
+    """
+    Get the physical and the logical addresses of all the blocks of a region (e.g., for a tool reading the map).
+    Outputs:
+        - physical, logical (np.ndarray): The addresses of the blocks (uint64)
+    """
+    blocks = obj_addr["blocks_map"]
+    if (blocks["stride"] is not None):
+        offsets = np.arange(0, blocks["count"], dtype=np.uint64) * np.uint64(blocks["stride"])
+    else:
+        offsets = np.asarray(blocks["offsets"], dtype=np.uint64)
+    physical = np.uint64(int(obj_addr["physical_base_address"], 16)) + offsets
+    logical = np.uint64(int(obj_addr["logical_base_address"], 16)) + \
+              (np.uint64(blocks["remainder"]) + offsets) // np.uint64(blocks["divisor"])
+    return physical, logical
+
+# ---------------------------------------------
+
+# BINARY MEMORY MAP
+# -----------------
+# Record of each region, followed by the uint64 offsets of its blocks if they have no stride (has_offsets = 1)
+MEMORY_MAP_RECORD = np.dtype([("type", "S8"), ("physical", "<u8"), ("logical", "<u8"), ("size", "<u8"),
+                              ("count", "<u8"), ("has_offsets", "<u8"), ("stride", "<u8"), ("divisor", "<u8"),
+                              ("remainder", "<u8")])
+
+
+def write_memory_map(base_addresses_list, file_path):
+    """
+    Write the DRAM map in a binary file: the number of regions (uint64), then the record of each region
+    (see MEMORY_MAP_RECORD, little-endian) followed by the offsets of its blocks if they have no stride.
+    Inputs:
+        - base_addresses_list (list): The address dicts (see dram_allocation)
+        - file_path (str): The path of the binary file
+    """
+    with open(file_path, 'wb') as f:
+        np.array([len(base_addresses_list)], dtype="<u8").tofile(f)
+        for obj_addr in base_addresses_list:
+            blocks = obj_addr["blocks_map"]
+            hasOffsets = (blocks["stride"] is None)
+            record = np.array([(obj_addr["type"].encode(), int(obj_addr["physical_base_address"], 16),
+                                int(obj_addr["logical_base_address"], 16), obj_addr["size"], blocks["count"], int(hasOffsets),
+                                0 if (hasOffsets) else blocks["stride"], blocks["divisor"], blocks["remainder"])],
+                              dtype=MEMORY_MAP_RECORD)
+            record.tofile(f)
+            if (hasOffsets):
+                np.asarray(blocks["offsets"], dtype="<u8").tofile(f)
+
+
+def read_memory_map(file_path):
+    """
+    Read a binary DRAM map (see write_memory_map).
+    Outputs:
+        - base_addresses_list (list): The address dicts (type, addresses, size and blocks_map)
+    """
+    data = np.fromfile(file_path, dtype=np.uint8)
+    nb_regions = int(data[:8].view("<u8")[0])
+    position = 8
+    base_addresses_list = []
+    for _ in range(0, nb_regions):
+        record = data[position:position + MEMORY_MAP_RECORD.itemsize].view(MEMORY_MAP_RECORD)[0]
+        position = position + MEMORY_MAP_RECORD.itemsize
+        count = int(record["count"])
+        hasOffsets = (int(record["has_offsets"]) == 1)
+        offsets = None
+        if (hasOffsets):
+            offsets = data[position:position + 8*count].view("<u8").astype(np.uint64)
+            position = position + 8*count
+        base_addresses_list.append({
+            "type": record["type"].decode(),
+            "physical_base_address": hex(int(record["physical"])),
+            "logical_base_address": hex(int(record["logical"])),
+            "size": int(record["size"]),
+            "blocks_map": {"count": count, "stride": None if (hasOffsets) else int(record["stride"]), "offsets": offsets,
+                           "divisor": int(record["divisor"]), "remainder": int(record["remainder"])}
+        })
+    return base_addresses_list
+
+# ---------------------------------------------
+
 
 # Get block name
 # --------------
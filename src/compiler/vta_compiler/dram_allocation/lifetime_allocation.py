@@ -0,0 +1,278 @@
+# IMPORT PACKAGES
+# ---------------
+import copy
+
+import numpy as np
+
+
+# Opcodes of the memory instructions, and region types addressed by each buffer_id (see VTAMemInsn)
+OPCODE_LOAD = 0
+OPCODE_STORE = 1
+BUFFER_TYPES = {0: "UOP", 1: "WGT", 2: "INP", 3: "ACC", 4: "OUT"}
+
+
+###############################################
+
+
+# LOGICAL DIVISORS
+# ----------------
+def logical_divisors(hw_config):
+    """
+    Get the size (bytes) of a logical address unit of each region type (see dram_allocation).
+    Inputs:
+        - hw_config (dict): The hardware configuration
+    Outputs:
+        - divisors (dict): The bytes per logical address of each region type
+    """
+    block_size = hw_config["block_size"]
+    batch = hw_config["batch"]
+    element_bytes = np.dtype(hw_config["inp_dtype"]).itemsize * block_size * batch
+    return {
+        "INP": element_bytes,
+        "OUT": element_bytes,
+        "WGT": np.dtype(hw_config["wgt_dtype"]).itemsize * block_size * block_size,
+        "ACC": np.dtype(hw_config["acc_dtype"]).itemsize * block_size * batch,
+        "ACC_BIS": np.dtype(hw_config["acc_dtype"]).itemsize * block_size * batch,
+        "UOP": 4,
+        "INSN": 16
+    }
+
+# ---------------------------------------------
+
+# REGION LIFETIMES
+# ----------------
+def region_lifetimes(layers):
+    """
+    Get the regions of the layers of a network and their lifetimes (in layers).
+    The regions written in the DRAM image (INP, WGT, ACC, ACC_BIS, UOP) are live during the whole program,
+    so that it can be executed again without writing the image again.
+    An OUT region is live from its layer to the last layer reading it (a chained INP is placed on the previous OUT),
+    or to the end of the program if no layer reads it (an output of the network).
+    Inputs:
+        - layers (list): The compiled layers, in execution order (see compile_layer)
+    Outputs:
+        - regions (list): For each region, a dict {"physical": address, "size": bytes, "type", "first", "last",
+                          "entries": [(layer index, index in base_addresses_list)]}
+    """
+    last_layer = len(layers) - 1
+    regions = {}
+    for i, layer in enumerate(layers):
+        for j, obj_addr in enumerate(layer["base_addresses_list"]):
+            physical = int(obj_addr["physical_base_address"], 16)
+            if (physical in regions): # Chained INP: read from the OUT of a previous layer
+                regions[physical]["entries"].append((i, j))
+                regions[physical]["last"] = max(regions[physical]["last"], i)
+                continue
+            isProduced = (obj_addr["type"] == "OUT")
+            regions[physical] = {"physical": physical, "size": obj_addr["size"], "type": obj_addr["type"],
+                                 "first": i if (isProduced) else 0, "last": i if (isProduced) else last_layer,
+                                 "entries": [(i, j)]}
+
+    # An OUT region read by no other layer is an output of the network
+    for region in regions.values():
+        if (region["type"] == "OUT" and len(region["entries"]) == 1):
+            region["last"] = last_layer
+
+    return sorted(regions.values(), key=lambda region: region["physical"])
+
+# ---------------------------------------------
+
+# LIFETIME ALLOCATION
+# -------------------
+def lifetime_allocation(regions, base_address, page_size=0x1000):
+    """
+    Place the regions so that two regions share DRAM only if their lifetimes are disjoint (interval coloring).
+    The regions live during the whole program are placed first in their original order, then the other regions
+    are placed by decreasing size at the lowest page where they do not overlap a live region (first fit).
+    Inputs:
+        - regions (list): The regions and their lifetimes (see region_lifetimes)
+        - base_address (int): The physical address of the first page of the allocation
+    Outputs:
+        - placements (dict): The new physical address of each region (indexed by its original physical address)
+    """
+    def page_size_of(region):
+        return -(-region["size"] // page_size) * page_size
+
+    # Whole program first (they overlap every other region), then by decreasing size
+    last = max(region["last"] for region in regions)
+    order = [region for region in regions if (region["first"] == 0 and region["last"] == last)]
+    order = order + sorted([region for region in regions if not (region["first"] == 0 and region["last"] == last)],
+                           key=lambda region: (-page_size_of(region), region["physical"]))
+
+    placements = {}
+    placed = []
+    for region in order:
+        # Occupied address ranges of the placed regions live at the same time
+        occupied = sorted((start, start + page_size_of(other)) for other, start in placed
+                          if not (other["last"] < region["first"] or region["last"] < other["first"]))
+        address = base_address
+        for start, end in occupied:
+            if (address + page_size_of(region) <= start):
+                break
+            address = max(address, end)
+        placements[region["physical"]] = address
+        placed.append((region, address))
+
+    return placements
+
+# ---------------------------------------------
+
+# RELOCATE INSTRUCTIONS
+# ---------------------
+def relocate_instructions(insn_buffer, regions, placements, hw_config, dram_offset=0x0000):
+    """
+    Re-base the DRAM address of the LOADs and the STOREs on the new address of the region they access.
+    Inputs:
+        - insn_buffer (list): The instructions (not modified)
+        - regions (list): The regions (see region_lifetimes)
+        - placements (dict): The new address of each region (see lifetime_allocation)
+        - hw_config (dict): The hardware configuration
+        - dram_offset (int): The physical address of the logical address 0
+    Outputs:
+        - insn_buffer (list): The relocated instructions
+    """
+    divisors = logical_divisors(hw_config)
+    starts = [region["physical"] for region in regions]
+
+    relocated = []
+    for insn in insn_buffer:
+        # Not a transfer (the empty LOADs only synchronize the modules)
+        if not (insn.opcode == OPCODE_LOAD or insn.opcode == OPCODE_STORE) or (insn.y_size == 0 or insn.x_size == 0):
+            relocated.append(insn)
+            continue
+        if not (insn.buffer_id in BUFFER_TYPES):
+            raise Exception(f"ERROR: The memory instruction (buffer_id={insn.buffer_id}) cannot be relocated! \n\n")
+        divisor = divisors[BUFFER_TYPES[insn.buffer_id]]
+
+        # Region holding the first address of the transfer
+        physical = insn.dram_base * divisor + dram_offset
+        idx = int(np.searchsorted(starts, physical, side='right')) - 1
+        if (idx < 0 or physical >= regions[idx]["physical"] + max(regions[idx]["size"], divisor)):
+            raise Exception(f"ERROR: The memory instruction at {hex(physical)} is not within a region! \n\n")
+        delta = placements[regions[idx]["physical"]] - regions[idx]["physical"]
+        if (delta % divisor != 0):
+            raise Exception(f"ERROR: The region at {hex(regions[idx]['physical'])} cannot be moved by {hex(delta)}! \n\n")
+
+        insn = type(insn).from_buffer_copy(bytes(insn))
+        insn.dram_base = insn.dram_base + delta // divisor
+        relocated.append(insn)
+
+    return relocated
+
+# ---------------------------------------------
+
+# RELOCATE ADDRESS
+# ----------------
+def relocate_address(obj_addr, delta, divisor):
+    """
+    Move an address dict (see dram_allocation) by delta bytes, its blocks are relative to its base (see blocks_map).
+    Inputs:
+        - obj_addr (dict): The address dict (not modified)
+        - delta (int): The displacement (bytes, a multiple of the logical divisor)
+        - divisor (int): The bytes per logical address of the region
+    Outputs:
+        - obj_addr (dict): The moved address dict
+    """
+    obj_addr = copy.copy(obj_addr)
+    obj_addr["physical_base_address"] = hex(int(obj_addr["physical_base_address"], 16) + delta)
+    obj_addr["logical_base_address"] = hex(int(obj_addr["logical_base_address"], 16) + delta // divisor)
+    return obj_addr
+
+# ---------------------------------------------
+
+# DRAM REUSE
+# ----------
+def dram_reuse(layers, insn_buffer, hw_config, dram_offset=0x0000, page_size=0x1000, debug=True):
+    """
+    Re-allocate the regions of the compiled layers of a network with their lifetimes, and relocate the instructions.
+    The OUT regions whose lifetimes are disjoint (e.g., the intermediate activations) share the same DRAM.
+    An OUT region overwritten by a later region is marked with "isOutOverwritten" (it cannot be checked at the end).
+    Inputs:
+        - layers (list): The compiled layers, in execution order (not modified)
+        - insn_buffer (list): The instructions of the network (not modified)
+        - hw_config (dict): The hardware configuration
+        - dram_offset (int): The physical address of the logical address 0
+    Outputs:
+        - layers (list): The layers with their new addresses
+        - insn_buffer (list): The relocated instructions
+        - current_dram_addr (int): The last physical address of the allocation
+        - report (dict): The DRAM footprint with and without reuse (see reuse_report)
+    """
+    regions = region_lifetimes(layers)
+    base_address = min(region["physical"] for region in regions) // page_size * page_size
+    placements = lifetime_allocation(regions, base_address, page_size=page_size)
+    insn_buffer = relocate_instructions(insn_buffer, regions, placements, hw_config, dram_offset=dram_offset)
+
+    # Move the address dicts of the layers
+    divisors = logical_divisors(hw_config)
+    layers = [dict(layer, base_addresses_list=list(layer["base_addresses_list"])) for layer in layers]
+    for region in regions:
+        delta = placements[region["physical"]] - region["physical"]
+        for i, j in region["entries"]:
+            obj_addr = layers[i]["base_addresses_list"][j]
+            layers[i]["base_addresses_list"][j] = relocate_address(obj_addr, delta, divisors[obj_addr["type"]])
+
+    # OUT regions overwritten by a region allocated after their last reader
+    for region in regions:
+        if (region["type"] != "OUT"):
+            continue
+        start = placements[region["physical"]]
+        end = start + region["size"]
+        isOverwritten = any(other["first"] > region["last"] and
+                            placements[other["physical"]] < end and start < placements[other["physical"]] + other["size"]
+                            for other in regions)
+        layers[region["entries"][0][0]]["isOutOverwritten"] = isOverwritten
+
+    report = reuse_report(regions, placements)
+    current_dram_addr = max(placements[region["physical"]] + region["size"] for region in regions) - 1
+
+    if (debug):
+        print_reuse_report(report)
+
+    return layers, insn_buffer, current_dram_addr, report
+
+# ---------------------------------------------
+
+# REUSE REPORT
+# ------------
+def reuse_report(regions, placements):
+    """
+    Measure the DRAM footprint of an allocation.
+    Inputs:
+        - regions (list): The regions (see region_lifetimes)
+        - placements (dict): The new address of each region (see lifetime_allocation)
+    Outputs:
+        - report (dict): The number of regions, the footprint of the bump allocation (original addresses),
+                         the footprint with reuse, the peak of the live bytes, and the bytes saved by the reuse
+                         (both footprints span from the first to the last byte of the regions)
+    """
+    def footprint(addresses):
+        start = min(addresses[region["physical"]] for region in regions)
+        end = max(addresses[region["physical"]] + region["size"] for region in regions)
+        return end - start
+
+    last = max(region["last"] for region in regions)
+    live_bytes = [sum(region["size"] for region in regions if (region["first"] <= t <= region["last"])) for t in range(0, last + 1)]
+    bump_footprint = footprint({region["physical"]: region["physical"] for region in regions})
+    reuse_footprint = footprint(placements)
+    return {
+        "nb_regions": len(regions),
+        "bump_footprint": bump_footprint,
+        "footprint": reuse_footprint,
+        "peak_live_bytes": max(live_bytes),
+        "reused_bytes": max(bump_footprint - reuse_footprint, 0)
+    }
+
+# ---------------------------------------------
+
+# PRINT REUSE REPORT
+# ------------------
+def print_reuse_report(report):
+    """
+    Print the DRAM footprint with and without reuse (see reuse_report).
+    """
+    print(f"\n\nDRAM REUSE ({report['nb_regions']} regions):")
+    print(f"\t Footprint without reuse: {report['bump_footprint']} bytes")
+    print(f"\t Footprint with reuse:    {report['footprint']} bytes")
+    print(f"\t Peak of live bytes:      {report['peak_live_bytes']} bytes")
+    print(f"\t Saved bytes:             {report['reused_bytes']} bytes\n")
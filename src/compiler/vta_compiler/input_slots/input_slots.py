@@ -0,0 +1,151 @@
+# IMPORT PACKAGES
+# ---------------
+import csv
+
+import numpy as np
+
+import vta_compiler.dram_allocation.dram_allocation as DA
+from vta_compiler.utils.find_project_root import *
+
+
+# Opcodes and buffer identifiers of the memory instructions (see VTAMemInsn)
+OPCODE_LOAD = 0
+OPCODE_STORE = 1
+MEM_ID_INP = 2
+
+
+###############################################
+
+
+# INPUT SLOTS ALLOCATION
+# ----------------------
+def slots_allocation(first_layer, last_layer, nb_inputs, hw_config, base_address, dram_offset=0x0000, debug=True):
+    """
+    Allocate the DRAM slots of a batch of inputs: the program is compiled once and executed on each slot.
+    The slot 0 is the INP region of the first layer and the OUT region of the last layer, as compiled.
+    The other slots are INP/OUT regions of the same sizes allocated after base_address.
+    The intermediate regions (WGT, ACC, intermediate OUT, ...) are shared, the inputs are executed one after the other.
+    Inputs:
+        - first_layer (dict): The compiled layer reading the input (see compile_layer)
+        - last_layer (dict): The compiled layer writing the output
+        - nb_inputs (int): The number of inputs (slots)
+        - hw_config (dict): The hardware configuration
+        - base_address (int): The physical address after which the slots are allocated
+        - dram_offset (int): The physical address of the logical address 0
+    Outputs:
+        - slots (list): For each slot, the INP and OUT address dicts (see dram_allocation)
+        - current_dram_addr (int): The last physical address of the slots
+    """
+    if (nb_inputs < 1):
+        raise Exception(f"ERROR: The number of inputs must be positive ({nb_inputs})! \n\n")
+    if first_layer.get("isChained", False):
+        raise Exception(f"ERROR: The INP region of the first layer is produced by another layer! \n\n")
+    inp_addr = next(obj_addr for obj_addr in first_layer["base_addresses_list"] if obj_addr["type"] == "INP")
+    out_addr = next(obj_addr for obj_addr in last_layer["base_addresses_list"] if obj_addr["type"] == "OUT")
+
+    # Slot 0 (as compiled)
+    slots = [{"INP": inp_addr, "OUT": out_addr}]
+
+    # Other slots (same sizes, after the program)
+    current_dram_addr = base_address
+    for _ in range(1, nb_inputs):
+        slot_addr, current_dram_addr = \
+            DA.dram_allocation([("INP", [np.zeros(inp_addr["size"], dtype=np.uint8)]),
+                                ("OUT", [np.zeros(out_addr["size"], dtype=np.uint8)])],
+                               base_addr=current_dram_addr, block_size=hw_config["block_size"],
+                               inp_dtype=hw_config["inp_dtype"], wgt_dtype=hw_config["wgt_dtype"], acc_dtype=hw_config["acc_dtype"],
+                               dram_offset=dram_offset, batch=hw_config["batch"], debug=debug)
+        slots.append({"INP": slot_addr[0], "OUT": slot_addr[1]})
+
+    return slots, current_dram_addr
+
+# ---------------------------------------------
+
+# PATCH TABLE
+# -----------
+def patch_table(insn_buffer, slots, hw_config, out_first_insn=0):
+    """
+    Find the instructions whose DRAM address depends on the slot:
+    the INP LOADs reading the INP region and the STOREs writing the OUT region of the slot 0.
+    Inputs:
+        - insn_buffer (list): The instructions (VTAMemInsn, VTAGemInsn and VTAAluInsn)
+        - slots (list): The slots (see slots_allocation)
+        - hw_config (dict): The hardware configuration
+        - out_first_insn (int): The index of the first instruction of the last layer, the STOREs of the previous layers
+                                are not patched (their OUT regions may share the DRAM of the last OUT, see lifetime_allocation)
+    Outputs:
+        - table (list): The (instruction index, INP or OUT) of each instruction to patch
+    """
+    # Logical range (in elements) of the regions of the slot 0
+    element_bytes = np.dtype(hw_config["inp_dtype"]).itemsize * hw_config["block_size"] * hw_config["batch"]
+    ranges = {}
+    for obj_type in ("INP", "OUT"):
+        start = int(slots[0][obj_type]["logical_base_address"], 16)
+        ranges[obj_type] = (start, start + (slots[0][obj_type]["size"] - 1) // element_bytes + 1)
+
+    table = []
+    for i, insn in enumerate(insn_buffer):
+        if (insn.opcode == OPCODE_LOAD and insn.buffer_id == MEM_ID_INP):
+            obj_type = "INP"
+        elif (insn.opcode == OPCODE_STORE and i >= out_first_insn):
+            obj_type = "OUT"
+        else:
+            continue
+        start, end = ranges[obj_type]
+        if (start <= insn.dram_base < end):
+            table.append((i, obj_type))
+
+    return table
+
+# ---------------------------------------------
+
+# SLOT INSTRUCTIONS
+# -----------------
+def slot_instructions(insn_buffer, slots, table, slot):
+    """
+    Get the instructions executing the program on a slot, i.e., the instructions of the patch table re-based
+    on the INP/OUT regions of the slot (the other instructions are unchanged).
+    Inputs:
+        - insn_buffer (list): The instructions of the program (compiled for the slot 0, not modified)
+        - slots (list): The slots (see slots_allocation)
+        - table (list): The patch table (see patch_table)
+        - slot (int): The slot index
+    Outputs:
+        - insn_buffer (list): The instructions of the slot
+    """
+    deltas = {obj_type: int(slots[slot][obj_type]["logical_base_address"], 16) - int(slots[0][obj_type]["logical_base_address"], 16)
+              for obj_type in ("INP", "OUT")}
+    insn_buffer = list(insn_buffer)
+    for i, obj_type in table:
+        insn = type(insn_buffer[i]).from_buffer_copy(bytes(insn_buffer[i]))
+        insn.dram_base = insn.dram_base + deltas[obj_type]
+        insn_buffer[i] = insn
+    return insn_buffer
+
+# ---------------------------------------------
+
+# WRITE INPUT SLOTS
+# -----------------
+def write_input_slots(slots, table, output_dir, prefix='', name=''):
+    """
+    Write the slots and the patch table.
+        - <prefix>input_slots<name>.csv: slot, type (INP or OUT), physical and logical addresses, size (bytes)
+        - <prefix>patch_table<name>.csv: instruction index, type (INP or OUT)
+    To execute the slot k, the host adds (logical address of the slot k - logical address of the slot 0) of the type
+    to the dram_base of each instruction of the patch table (see slot_instructions).
+    Inputs:
+        - slots (list): The slots (see slots_allocation)
+        - table (list): The patch table (see patch_table)
+        - output_dir (str): The directory where the files are written
+    """
+    with open(filepath_definition(output_dir, prefix+'input_slots'+name+'.csv'), 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        for slot, slot_addr in enumerate(slots):
+            for obj_type in ("INP", "OUT"):
+                obj_addr = slot_addr[obj_type]
+                writer.writerow([slot, obj_type, obj_addr["physical_base_address"], obj_addr["logical_base_address"], obj_addr["size"]])
+
+    with open(filepath_definition(output_dir, prefix+'patch_table'+name+'.csv'), 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        for i, obj_type in table:
+            writer.writerow([i, obj_type])
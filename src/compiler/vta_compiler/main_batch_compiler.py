@@ -0,0 +1,310 @@
+# IMPORT PACKAGES
+# ---------------
+import os
+import sys
+import glob
+import fnmatch
+import json
+import time
+import contextlib
+import traceback
+
+# Executed as a script from a checkout (e.g., python main_batch_compiler.py): make the vta_compiler package importable
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vta_compiler.utils.find_project_root import *
+from vta_compiler.utils.json_parser import *
+
+
+###############################################
+
+
+# Summary of the batch (written in the output directory)
+SUMMARY_FILE = "batch_summary.json"
+# Standard output of each job (written in its subdirectory)
+LOG_FILE = "compiler.log"
+
+
+# BATCH FILES
+# -----------
+def batch_files(paths, excludes=[]):
+    """
+    Get the operation files to compile from files, directories (searched recursively) and glob patterns.
+    Inputs:
+        - paths (list): The files, directories or glob patterns
+        - excludes (list): The patterns of the files to skip (fnmatch on the absolute path, e.g., "*/yolonas/*")
+    Outputs:
+        - operations_files (list): The sorted paths of the operation files (JSON with "MATRICES")
+        - skipped_files (list): The other JSON files (e.g., network graphs or VTA configurations) and the excluded files
+    """
+    json_files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            json_files.update(glob.glob(os.path.join(path, '**', '*.json'), recursive=True))
+        elif os.path.isfile(path):
+            json_files.add(path)
+        else:
+            matches = glob.glob(path, recursive=True)
+            if not (matches):
+                raise Exception(f"ERROR: No operation file matches '{path}'! \n\n")
+            json_files.update(match for match in matches if os.path.isfile(match))
+
+    operations_files = []
+    skipped_files = []
+    for json_file in sorted(os.path.abspath(path) for path in json_files):
+        if any(fnmatch.fnmatch(json_file, pattern) for pattern in excludes):
+            skipped_files.append(json_file)
+            continue
+        try:
+            content = parse_json_to_dict(json_file)
+        except ValueError:
+            content = None
+        if isinstance(content, dict) and ("MATRICES" in content):
+            operations_files.append(json_file)
+        else:
+            skipped_files.append(json_file)
+    return operations_files, skipped_files
+
+# ---------------------------------------------
+
+# JOB DEFINITION
+# --------------
+def job_definition(operations_files, output_dir):
+    """
+    Define a job per operation file, its binaries are written in a subdirectory of output_dir
+    named after the path of the file relative to the common directory of the batch (e.g., lenet5/lenet5_layer1/).
+    Outputs:
+        - jobs (list): The (operations_file, job_dir) of each job
+    """
+    if not (operations_files):
+        return []
+    common_dir = os.path.commonpath([os.path.dirname(path) for path in operations_files])
+    jobs = []
+    for operations_file in operations_files:
+        job_name = os.path.splitext(os.path.relpath(operations_file, common_dir))[0]
+        jobs.append((operations_file, os.path.join(output_dir, job_name)))
+    return jobs
+
+# ---------------------------------------------
+
+# COMPILE JOB
+# -----------
+def compile_job(operations_file, job_dir, vta_config_dict, options):
+    """
+    Compile an operation file in its subdirectory (executed by a worker of the batch).
+    The standard output of the compiler is written in <job_dir>/compiler.log.
+    Inputs:
+        - operations_file (str): The operation file
+        - job_dir (str): The directory of the binaries
+        - vta_config_dict (dict): The parsed VTA configuration
+        - options (dict): The options of main_vta_compiler.main (see compiler_options)
+    Outputs:
+        - result (dict): The file, the directory, the status ("ok" or "failed"), the wall time (s),
+                         the number of instructions and the binary bytes (or the error)
+    """
+    # Imported in the worker: the compiler is loaded once per worker
+    import vta_compiler.main_vta_compiler as VC
+
+    result = {"file": operations_file, "output_dir": job_dir}
+    create_directory(job_dir)
+    options = dict(options)
+    if (options.get("doProfile", False)):
+        options["profile_file"] = filepath_definition(job_dir, 'profile.json')
+
+    start = time.perf_counter()
+    try:
+        with open(filepath_definition(job_dir, LOG_FILE), 'w') as log, contextlib.redirect_stdout(log):
+            VC.main(parse_json_to_dict(operations_file), vta_config_dict, output_dir=job_dir, debug=False, **options)
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {str(e).strip()}"
+        with open(filepath_definition(job_dir, LOG_FILE), 'a') as log:
+            traceback.print_exc(file=log)
+    result["time"] = time.perf_counter() - start
+
+    if (result["status"] == "ok"):
+        binaries = glob.glob(os.path.join(job_dir, '*.bin'))
+        result["nb_insn"] = sum(os.path.getsize(path) // 16 for path in binaries if os.path.basename(path).startswith('instructions'))
+        result["binary_bytes"] = sum(os.path.getsize(path) for path in binaries)
+    return result
+
+
+###############################################
+
+
+# BATCH COMPILER
+# --------------
+def batch_compiler(operations_files, vta_config_dict, output_dir, nb_workers=1, options={}, debug=True):
+    """
+    Compile several operation files, each job is executed by a worker process (one interpreter per worker,
+    so Python and NumPy are only loaded once per worker).
+    Inputs:
+        - operations_files (list): The operation files (see batch_files)
+        - vta_config_dict (dict): The parsed VTA configuration
+        - output_dir (str): The directory of the batch (a subdirectory per job, see job_definition)
+        - nb_workers (int): The number of worker processes (1: the jobs are compiled in this process)
+        - options (dict): The options of each compilation (see main_vta_compiler.compiler_options)
+    Outputs:
+        - summary (dict): The number of jobs and failures, the wall time and the result of each job (see compile_job)
+    """
+    jobs = job_definition(operations_files, output_dir)
+    start = time.perf_counter()
+
+    results = []
+    if (nb_workers > 1 and len(jobs) > 1):
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=min(nb_workers, len(jobs))) as executor:
+            futures = {executor.submit(compile_job, operations_file, job_dir, vta_config_dict, options): i
+                       for i, (operations_file, job_dir) in enumerate(jobs)}
+            results = [None] * len(jobs)
+            # The results are printed as they come, and kept in the order of the jobs
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if (debug):
+                    print_result(results[futures[future]])
+    else:
+        for operations_file, job_dir in jobs:
+            results.append(compile_job(operations_file, job_dir, vta_config_dict, options))
+            if (debug):
+                print_result(results[-1])
+
+    summary = {
+        "nb_jobs": len(results),
+        "nb_failures": sum(1 for result in results if (result["status"] != "ok")),
+        "nb_workers": nb_workers,
+        "wall_time": time.perf_counter() - start,
+        "compile_time": sum(result["time"] for result in results),
+        "jobs": results
+    }
+    return summary
+
+# ---------------------------------------------
+
+# PRINT RESULT
+# ------------
+def print_result(result):
+    """
+    Print the result of a job (see compile_job).
+    """
+    if (result["status"] == "ok"):
+        print(f"[ OK ] {result['file']} ({result['time']*1000:.1f} ms, {result['nb_insn']} instructions)")
+    else:
+        print(f"[FAIL] {result['file']} ({result['time']*1000:.1f} ms): {result['error']}")
+
+# ---------------------------------------------
+
+# PRINT SUMMARY
+# -------------
+def print_summary(summary, output_dir):
+    """
+    Print the timings and the failures of a batch (see batch_compiler).
+    """
+    print(f"\nBATCH SUMMARY: {summary['nb_jobs']} jobs, {summary['nb_failures']} failed, "
+          f"{summary['wall_time']:.2f} s wall time ({summary['compile_time']:.2f} s of compilation, {summary['nb_workers']} workers)")
+    slowest = sorted(summary["jobs"], key=lambda result: result["time"], reverse=True)[:5]
+    if (slowest):
+        print("\tSlowest jobs: " + ", ".join(f"{os.path.basename(result['output_dir'])} ({result['time']:.2f} s)" for result in slowest))
+    for result in summary["jobs"]:
+        if (result["status"] != "ok"):
+            print(f"\tFAILED: {result['file']}: {result['error']} (see {filepath_definition(result['output_dir'], LOG_FILE)})")
+    print(f"\nSummary written at: {filepath_definition(output_dir, SUMMARY_FILE)}\n")
+
+
+###############################################
+
+
+# MAIN FUNCTION
+# -------------
+def main(paths, vta_config_dict, nb_workers=None, output_dir=None, excludes=[], debug=True, **options):
+    # Default: one worker per core
+    nb_workers = nb_workers or os.cpu_count() or 1
+
+    # Setup the output folder (default: standalone-vta/compiler_output/)
+    output_dir = compiler_output_setup(output_dir=output_dir)
+
+
+    # ---------------------------------------------
+    # FIND THE OPERATION FILES
+    operations_files, skipped_files = batch_files(paths, excludes=excludes)
+    if (debug and skipped_files):
+        print(f"Skipped {len(skipped_files)} JSON files excluded or without MATRICES (e.g., {skipped_files[0]})\n")
+
+
+    # ---------------------------------------------
+    # COMPILE THE BATCH
+    summary = batch_compiler(operations_files, vta_config_dict, output_dir, nb_workers=nb_workers, options=options, debug=debug)
+    summary["skipped"] = skipped_files
+    with open(filepath_definition(output_dir, SUMMARY_FILE), 'w') as f:
+        json.dump(summary, f, indent=2)
+    if (debug):
+        print_summary(summary, output_dir)
+
+
+    # ---------------------------------------------
+    # RETURN (1 if a job failed)
+
+    return 1 if (summary["nb_failures"] > 0) else 0
+
+
+###############################################
+
+
+# COMMAND LINE INTERFACE
+# ----------------------
+def cli():
+    """
+    To execute:
+        > python main_batch_compiler.py <operations>... [--config=<vta_config>.json] [--jobs=N] [--exclude=<pattern>] [--output-dir=<dir>] [options]
+
+    Each argument is an operation file, a directory (searched recursively for JSON files) or a glob pattern
+    (e.g., "examples/matrix_operations/**/*.json"). The JSON files which are not operation files are skipped.
+    --config gives the hardware configuration (default: config/vta_config.json).
+    --jobs=N compiles N files in parallel (default: one worker per core), each file is compiled sequentially.
+    --exclude=<pattern> skips the files whose absolute path matches the pattern (fnmatch, e.g., "*/yolonas/*"), it can be repeated.
+    The binaries of each file are written in a subdirectory of the output directory,
+    the timings and the failures are summarised in <output_dir>/batch_summary.json.
+    The options --cache[=<dir>], --no-golden, --estimate, --strategy-report, --profile, --seed=N, --inputs=N and --memory-map are the ones of main_vta_compiler.
+    The exit code is 1 if a file fails to compile.
+    """
+    from vta_compiler.main_vta_compiler import compiler_options
+
+    # Get the options (--jobs is the number of workers of the batch)
+    args = []
+    vta_config_file = filepath_definition(default_root(), os.path.join('config', 'vta_config.json'))
+    nb_workers = None
+    excludes = []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--config="):
+            vta_config_file = arg.split("=", 1)[1]
+        elif arg.startswith("--jobs="):
+            nb_workers = int(arg.split("=")[1])
+        elif arg.startswith("--exclude="):
+            excludes.append(arg.split("=", 1)[1])
+        else:
+            args.append(arg)
+    paths, options = compiler_options(args)
+    options.pop("nb_workers")
+    options.pop("profile_file")
+    if (options.pop("doDramReuse")): # Each file is compiled as a single layer (see main_vta_compiler)
+        print("ERROR: --dram-reuse only applies to a network (see main_network_compiler.py)!")
+        sys.exit(1)
+    unknown = [path for path in paths if path.startswith("--")]
+
+    if (len(paths) == 0 or unknown):
+        print("python main_batch_compiler.py <operations>... [--config=<vta_config>.json] [--jobs=N] [--exclude=<pattern>] [--output-dir=<dir>] [--cache[=<dir>]] [--no-golden] [--estimate] [--strategy-report] [--profile] [--seed=N] [--inputs=N] [--memory-map]")
+        sys.exit(1)
+
+    # Parse the VTA configuration
+    vta_config_dict = parse_json_to_dict(vta_config_file)
+
+    # Execute the main function
+    return main(paths, vta_config_dict, nb_workers=nb_workers, excludes=excludes, **options)
+
+# ---------------------------------------------
+
+# EXECUTE MAIN FUNCTION
+# ---------------------
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -0,0 +1,445 @@
+# IMPORT PACKAGES
+# ---------------
+import os
+import sys
+import copy
+import json
+
+import numpy as np
+import csv
+
+# Executed as a script from a checkout (e.g., python main_network_compiler.py): make the vta_compiler package importable
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vta_compiler.dram_allocation.dram_allocation as DA
+import vta_compiler.dram_allocation.lifetime_allocation as LA
+import vta_compiler.chaining.chaining as CH
+import vta_compiler.input_slots.input_slots as IS
+import vta_compiler.data_definition.matrix_generator as MG
+import vta_compiler.profiling.profiling as PF
+from vta_compiler.main_vta_compiler import hardware_configuration, compile_layer, compiler_options, strategy_comparison
+from vta_compiler.utils.find_project_root import *
+from vta_compiler.utils.json_parser import *
+
+
+###############################################
+
+
+# NETWORK DEFINITION
+# ------------------
+def network_definition(network_files, seed=None):
+    """
+    Get the list of layers to compile from a list of layer JSONs or from a single graph JSON.
+    A graph JSON contains a "LAYERS" list, each layer is either a path (relative to the graph JSON),
+    an inline layer definition, or a dictionnary {"FILE": path, ...} whose other keys override the layer JSON.
+    Inputs:
+        - network_files (list): The paths of the JSON files
+        - seed (int): If not None, the seed of the random matrices (default: the "SEED" of the graph),
+                      each layer without "SEED" gets its own seed derived from it
+    Outputs:
+        - network_dict (dict): The network name, the base address, the DRAM offset and the list of layers (dict)
+    """
+    # Single graph JSON
+    graph_dict = parse_json_to_dict(network_files[0]) if (len(network_files) == 1) else None
+    if (graph_dict is not None and "LAYERS" in graph_dict):
+        graph_dir = os.path.dirname(os.path.abspath(network_files[0]))
+        layers_list = graph_dict["LAYERS"]
+    else: # List of layer JSONs
+        graph_dict = {}
+        graph_dir = os.getcwd()
+        layers_list = network_files
+
+    # Parse each layer
+    layers = []
+    for i, layer_def in enumerate(layers_list):
+        if isinstance(layer_def, str):
+            layer_def = {"FILE": layer_def}
+        if "FILE" in layer_def:
+            layer_file = os.path.join(graph_dir, layer_def["FILE"])
+            layer_dict = parse_json_to_dict(layer_file)
+            if (layer_dict is None):
+                raise Exception(f"ERROR: The layer {i} ({layer_file}) cannot be parsed! \n\n")
+            layer_dict.update({key: value for key, value in layer_def.items() if key != "FILE"})
+        else:
+            layer_dict = copy.deepcopy(layer_def)
+        # Give a name to each layer (the binaries are suffixed by the name)
+        if not "NAME" in layer_dict:
+            layer_dict["NAME"] = f"_L{i+1}"
+        layers.append(layer_dict)
+
+    if not layers:
+        raise Exception(f"ERROR: The network does not contain any layer! \n\n")
+
+    # Seed of each layer
+    seed = graph_dict.get("SEED", None) if (seed is None) else seed
+    if (seed is not None):
+        for i, layer_dict in enumerate(layers):
+            layer_dict.setdefault("SEED", MG.derived_seed(seed, i))
+
+    # The first layer defines the network addresses if the graph does not
+    network_dict = {
+        "name": graph_dict.get("NAME", ''),
+        "base_address": int(graph_dict.get("BASE_ADDRESS", layers[0].get("BASE_ADDRESS", "0000")), base=16),
+        "dram_offset": int(graph_dict.get("DRAM_OFFSET", layers[0].get("DRAM_OFFSET", "0000")), base=16),
+        "layers": layers
+    }
+
+    return network_dict
+
+# ---------------------------------------------
+
+# NETWORK COMPILER
+# ----------------
+def network_compiler(network_dict, vta_config_dict, random_bound=4, nb_workers=1, cache_dir=None, doGolden=True,
+                     nb_inputs=1, doDramReuse=False, profile=None, debug=True):
+    """
+    Compile all the layers of a network in a single DRAM image and a single instruction stream.
+    Inputs:
+        - network_dict (dict): The network definition (see network_definition)
+        - vta_config_dict (dict): The parsed VTA configuration
+        - nb_workers (int): The number of worker processes used to compile each layer (1: sequential)
+        - cache_dir (str): If not None, the directory of the compilation cache (each layer is cached)
+        - doGolden (bool): Compute the golden outputs (always computed for a layer followed by a chained layer)
+        - nb_inputs (int): The number of input slots (see input_slots), the program is compiled once for all the inputs
+        - doDramReuse (bool): Re-allocate the regions with their lifetimes, the OUT regions of disjoint lifetimes
+                              share the same DRAM (see lifetime_allocation)
+        - profile (dict): If not None, the measures of each stage are accumulated over the layers (see profiling)
+    Outputs:
+        - network (dict): The compiled layers, the instructions, the INSN address, the input slots, the patch table
+                          and the DRAM reuse report (None without doDramReuse)
+    """
+    # GET CONFIGURATION (shared by all the layers)
+    hw_config = hardware_configuration(vta_config_dict)
+    block_size = hw_config["block_size"]
+
+    # COMPILE EACH LAYER
+    compiled_layers = []
+    insn_buffer = []
+    current_dram_addr = network_dict["base_address"]
+    for i, operations_dict in enumerate(network_dict["layers"]):
+        operations_dict["DRAM_OFFSET"] = hex(network_dict["dram_offset"])
+
+        # Chain the INPUT on the previous OUT
+        inp_address = None
+        inp_gather = None
+        if "CHAIN" in operations_dict:
+            if (i == 0):
+                raise Exception(f"ERROR: The first layer cannot be chained! \n\n")
+            inp_address, inp_gather = CH.chain_layer(operations_dict, compiled_layers[-1], hw_config, random_bound)
+
+        # A chained layer is defined from the golden output of the previous layer
+        isNextChained = (i < len(network_dict["layers"]) - 1) and ("CHAIN" in network_dict["layers"][i+1])
+
+        # Each layer is allocated after the previous one
+        layer = compile_layer(operations_dict, hw_config, base_address=current_dram_addr,
+                              inp_address=inp_address, inp_gather=inp_gather,
+                              doInsnAllocation=False, random_bound=random_bound, nb_workers=nb_workers,
+                              cache_dir=cache_dir, doGolden=(doGolden or isNextChained), profile=profile, debug=debug)
+        layer["isChained"] = inp_address is not None
+        current_dram_addr = layer["current_dram_addr"]
+        compiled_layers.append(layer)
+
+        # Concatenate the instructions (the FINISH is only kept for the last layer)
+        layer_insn = layer["insn_buffer"]
+        if (i < len(network_dict["layers"]) - 1):
+            if (layer_insn[-1].opcode != 3):
+                raise Exception(f"ERROR: The last instruction of {layer['name']} is not a FINISH! \n\n")
+            layer_insn = layer_insn[:-1]
+        last_layer_insn = len(insn_buffer)
+        insn_buffer = insn_buffer + layer_insn
+
+    # DRAM REUSE (the layers are allocated one after the other, then re-allocated with the lifetimes of their regions)
+    reuse_report = None
+    if (doDramReuse):
+        with PF.stage(profile, "dram_allocation"):
+            compiled_layers, insn_buffer, current_dram_addr, reuse_report = \
+                LA.dram_reuse(compiled_layers, insn_buffer, hw_config, dram_offset=network_dict["dram_offset"], debug=debug)
+
+    # INPUT SLOTS (the slot 0 is the INP of the first layer and the OUT of the last layer)
+    with PF.stage(profile, "dram_allocation"):
+        input_slots, current_dram_addr = \
+            IS.slots_allocation(compiled_layers[0], compiled_layers[-1], nb_inputs, hw_config, current_dram_addr,
+                                dram_offset=network_dict["dram_offset"], debug=debug)
+    patch_table = IS.patch_table(insn_buffer, input_slots, hw_config, out_first_insn=last_layer_insn) if (nb_inputs > 1) else []
+
+    # INSN ALLOCATION
+    with PF.stage(profile, "dram_allocation"):
+        insn_addr, current_dram_addr = \
+            DA.dram_allocation([("INSN", insn_buffer)], base_addr=current_dram_addr, block_size=block_size,
+                               inp_dtype=hw_config["inp_dtype"], wgt_dtype=hw_config["wgt_dtype"], acc_dtype=hw_config["acc_dtype"],
+                               dram_offset=network_dict["dram_offset"], debug=debug)
+
+    network = {
+        "name": network_dict["name"],
+        "layers": compiled_layers,
+        "insn_buffer": insn_buffer,
+        "insn_address": insn_addr[0],
+        "input_slots": input_slots,
+        "patch_table": patch_table,
+        "reuse_report": reuse_report,
+        "current_dram_addr": current_dram_addr
+    }
+
+    return network
+
+# ---------------------------------------------
+
+# REGION CONTENT
+# --------------
+def region_content(layer, obj_type):
+    """
+    Get the binary content of a region of a compiled layer.
+    The OUT region is empty (written by the program), as well as a chained INP (produced by the previous layer).
+    Inputs:
+        - layer (dict): The compiled layer (see compile_layer)
+        - obj_type (str): The type of the region (INP, WGT, ACC, ACC_BIS, OUT, UOP or INSN)
+    Outputs:
+        - content (bytes): The content of the region
+    """
+    if (obj_type == "INP" and not layer.get("isChained", False)):
+        return b''.join(block.tobytes() for block in layer["INP_blocks"])
+    elif (obj_type == "WGT"):
+        return b''.join(block.transpose().tobytes() for block in layer["B_blocks"])
+    elif (obj_type == "ACC"):
+        return b''.join(block.tobytes() for block in layer["X_blocks"])
+    elif (obj_type == "ACC_BIS"):
+        return b''.join(block.tobytes() for block in layer["Y_blocks"])
+    elif (obj_type == "UOP"):
+        return b''.join(bytes(uop) for uop in layer["uop_buffer"])
+    elif (obj_type == "INSN"):
+        return b''.join(bytes(insn) for insn in layer["insn_buffer"])
+    else: # OUT or chained INP
+        return b''
+
+# ---------------------------------------------
+
+# DRAM IMAGE
+# ----------
+def dram_image(network):
+    """
+    Lay out all the regions of the network in a single DRAM image.
+    The OUT regions are left to 0, and a chained INP is not written (it is produced by the previous layer).
+    The regions of the input slots 1..N-1 are left to 0 (written by the host before the execution on the slot).
+    Inputs:
+        - network (dict): The compiled network (see network_compiler)
+    Outputs:
+        - image_base (int): The physical address of the first byte of the image
+        - image (bytearray): The DRAM content
+        - regions (list): The (layer name, address dict) of each region of the image
+    """
+    # Get the content of each region
+    regions = []
+    contents = []
+    for layer in network["layers"]:
+        for obj_addr in layer["base_addresses_list"]:
+            regions.append((layer["name"], obj_addr))
+            contents.append(region_content(layer, obj_addr["type"]))
+    for slot, slot_addr in enumerate(network.get("input_slots", [])[1:], start=1):
+        for obj_type in ("INP", "OUT"):
+            regions.append(("SLOT"+str(slot), slot_addr[obj_type]))
+            contents.append(b'')
+    regions.append(("NETWORK", network["insn_address"]))
+    contents.append(b''.join(bytes(insn) for insn in network["insn_buffer"]))
+
+    # Write the regions within the image
+    image_base = min(int(obj_addr["physical_base_address"], 16) for _, obj_addr in regions)
+    image_end = max(int(obj_addr["physical_base_address"], 16) + obj_addr["size"] for _, obj_addr in regions)
+    image = bytearray(image_end - image_base)
+    for (_, obj_addr), content in zip(regions, contents):
+        offset = int(obj_addr["physical_base_address"], 16) - image_base
+        image[offset:offset+len(content)] = content
+
+    return image_base, image, regions
+
+# ---------------------------------------------
+
+# WRITE NETWORK BINARIES
+# ----------------------
+def write_network_binaries(network, output_dir, doGolden=True, doMemoryMap=False):
+    """
+    Write the DRAM image, its address map, the instructions, the input slots (if any) and the expected output of each layer.
+    Inputs:
+        - network (dict): The compiled network (see network_compiler)
+        - output_dir (str): The directory where the files are written
+        - doGolden (bool): Write the expected output of each layer
+        - doMemoryMap (bool): Also write the DRAM map in a binary file (same regions as the CSV map, see dram_allocation)
+    """
+    name = network["name"]
+    image_base, image, regions = dram_image(network)
+
+    # DRAM IMAGE (starts at the first physical address of the map)
+    with open(filepath_definition(output_dir, 'network_dram'+name+'.bin'), 'wb') as f:
+        f.write(image)
+
+    # DRAM MAP
+    with open(filepath_definition(output_dir, 'network_memory_addresses'+name+'.csv'), 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["IMAGE", "DRAM", hex(image_base), len(image)])
+        for layer_name, obj_addr in regions:
+            writer.writerow([layer_name, obj_addr['type'], obj_addr['physical_base_address'], obj_addr['logical_base_address']])
+    if (doMemoryMap):
+        DA.write_memory_map([obj_addr for _, obj_addr in regions], filepath_definition(output_dir, 'network_memory_map'+name+'.bin'))
+
+    # INSTRUCTIONS
+    with open(filepath_definition(output_dir, 'network_instructions'+name+'.bin'), 'wb') as f:
+        for insn in network["insn_buffer"]:
+            f.write(insn)
+
+    # INPUT SLOTS AND PATCH TABLE (see input_slots)
+    if (len(network.get("input_slots", [])) > 1):
+        IS.write_input_slots(network["input_slots"], network["patch_table"], output_dir, prefix='network_', name=name)
+
+    # EXPECTED OUTPUT OF EACH LAYER
+    if not (doGolden):
+        return
+    for layer in network["layers"]:
+        if (layer.get("isOutOverwritten", False)): # The OUT region is reused by a later layer (see lifetime_allocation)
+            continue
+        with open(filepath_definition(output_dir, 'expected_out'+layer["name"]+'.bin'), 'wb') as f:
+            for block in layer["C_blocks"]:
+                block.tofile(f)
+
+
+###############################################
+
+
+# MAIN FUNCTION
+# -------------
+def main(network_files, vta_config_dict, nb_workers=1, cache_dir=None, doGolden=True, doEstimate=False,
+         doStrategyReport=False, doProfile=False, profile_file=None, output_dir=None, seed=None, nb_inputs=1,
+         doDramReuse=False, doMemoryMap=False, debug=True):
+    # NETWORK DEFINITION
+    network_dict = network_definition(network_files, seed=seed)
+
+    # Others configuration
+    random_bound = 4
+    profile = PF.profile_definition() if (doProfile) else None
+
+
+    # ---------------------------------------------
+    # COMPILE THE NETWORK
+    network = network_compiler(network_dict, vta_config_dict, random_bound=random_bound, nb_workers=nb_workers,
+                               cache_dir=cache_dir, doGolden=doGolden, nb_inputs=nb_inputs,
+                               doDramReuse=doDramReuse, profile=profile, debug=debug)
+
+
+    # ---------------------------------------------
+    # DATA BINARISATION
+
+    # Setup the output folder (default: standalone-vta/compiler_output/)
+    output_dir = compiler_output_setup(output_dir=output_dir)
+
+    # Write the binaries
+    with PF.stage(profile, "binarization"):
+        write_network_binaries(network, output_dir, doGolden=doGolden, doMemoryMap=doMemoryMap)
+
+
+    # DRAM reuse report
+    if (network["reuse_report"] is not None):
+        with open(filepath_definition(output_dir, 'network_dram_reuse'+network["name"]+'.json'), 'w') as f:
+            json.dump(network["reuse_report"], f, indent=2)
+
+
+    # ---------------------------------------------
+    # PERFORMANCE ESTIMATION
+
+    if (doEstimate):
+        import vta_compiler.performance_model.performance_model as PM
+        uop_buffer = [uop for layer in network["layers"] for uop in layer["uop_buffer"]]
+        report = PM.performance_estimation(network["insn_buffer"], uop_buffer, vta_config_dict)
+        with open(filepath_definition(output_dir, 'network_performance'+network["name"]+'.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+        if (debug):
+            PM.print_report(report, network["name"])
+
+
+    # ---------------------------------------------
+    # STRATEGY REPORT
+
+    if (doStrategyReport):
+        import vta_compiler.matrix_partitioning.strategy_report as SR
+        hw_config = hardware_configuration(vta_config_dict)
+        reports = {}
+        for operations_dict in network_dict["layers"]:
+            reports[operations_dict["NAME"]] = strategy_comparison(operations_dict, hw_config, random_bound=random_bound)
+            if (debug):
+                SR.print_strategy_comparison(reports[operations_dict["NAME"]], selected=operations_dict.get("STRATEGY", 1),
+                                             name=operations_dict["NAME"])
+        with open(filepath_definition(output_dir, 'network_strategy_report'+network["name"]+'.json'), 'w') as f:
+            json.dump(reports, f, indent=2)
+
+
+    # ---------------------------------------------
+    # PROFILE
+
+    if (doProfile):
+        PF.count(profile, "nb_layers", len(network["layers"]))
+        PF.count(profile, "nb_insn", len(network["insn_buffer"]))
+        PF.count(profile, "nb_uop", sum(len(layer["uop_buffer"]) for layer in network["layers"]))
+        PF.count(profile, "nb_steps", sum(len(layer["strategy"]) for layer in network["layers"]))
+        PF.print_profile(profile, network["name"])
+        if (profile_file is not None):
+            with open(profile_file, 'w') as f:
+                json.dump(profile, f, indent=2)
+
+
+    # ---------------------------------------------
+    # DEBUG
+
+    if (debug):
+        # Write output_dir
+        print(f"\n\nNetwork ({len(network['layers'])} layers) successfully written at: {output_dir}\n")
+
+    # ---------------------------------------------
+    # RETURN 0
+
+    return 0
+
+
+###############################################
+
+
+# COMMAND LINE INTERFACE
+# ----------------------
+def cli():
+    """
+    To execute:
+        > python main_network_compiler.py <graph>.json <vta_config>.json
+        > python main_network_compiler.py <layer_1>.json ... <layer_n>.json <vta_config>.json
+
+    The first arguments define the layers (a graph JSON with "LAYERS" or the list of layer JSONs).
+    The last JSON defines the hardware configuration, it can be followed by False to disable the debug.
+    The options --jobs=N, --cache[=<dir>], --no-golden, --estimate, --strategy-report, --profile[=<file>.json],
+    --output-dir=<dir>, --seed=N, --inputs=N, --dram-reuse and --memory-map are described in main_vta_compiler.compiler_options
+    (with --seed, each layer draws its random matrices with a seed derived from N).
+    """
+    debug = True
+
+    # Get the options (default: sequential compilation without cache)
+    args, options = compiler_options(sys.argv[1:])
+
+    # Get the debug flag
+    if args and (args[-1] == "False" or args[-1] == "True"):
+        debug = False if (args[-1] == "False") else True
+        args = args[:-1]
+
+    # There must be at least one layer and the configuration
+    if len(args) < 2:
+        print("python main_network_compiler.py <graph>.json|<layer_1>.json ... <layer_n>.json <vta_config>.json [False] [--jobs=N] [--cache[=<dir>]] [--no-golden] [--estimate] [--strategy-report] [--profile[=<file>.json]] [--output-dir=<dir>] [--seed=N] [--inputs=N] [--dram-reuse] [--memory-map]")
+        sys.exit(1)
+    network_files = args[:-1]
+    vta_config_file = args[-1]
+
+    # Parse the configuration
+    vta_config_dict = parse_json_to_dict(vta_config_file)
+
+    # Execute the main function
+    return main(network_files, vta_config_dict, debug=debug, **options)
+
+# ---------------------------------------------
+
+# EXECUTE MAIN FUNCTION
+# ---------------------
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -0,0 +1,400 @@
+# IMPORT PACKAGES
+# ---------------
+import os
+import sys
+import time
+
+import numpy as np
+import csv
+
+# Executed as a script from a checkout (e.g., python main_simulator.py): make the vta_compiler package importable
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vta_compiler.simulator.simulator as SIM
+import vta_compiler.input_slots.input_slots as IS
+from vta_compiler.operations_definition.structures import VTAMemInsn
+from vta_compiler.main_vta_compiler import hardware_configuration
+from vta_compiler.main_network_compiler import region_content, dram_image
+from vta_compiler.utils.find_project_root import *
+from vta_compiler.utils.json_parser import *
+
+
+###############################################
+
+
+# Binary file of each region (see main_vta_compiler.write_layer_binaries)
+REGION_FILES = {
+    "INP": "input",
+    "WGT": "weight",
+    "ACC": "accumulator",
+    "ACC_BIS": "add_accumulator",
+    "UOP": "uop",
+    "INSN": "instructions"
+}
+
+
+# DRAM OFFSET
+# -----------
+def dram_offset_definition(physical_address, logical_address):
+    """
+    Get the DRAM offset from the addresses of the UOP region (a UOP is 4 bytes).
+    """
+    return int(physical_address, 16) - int(logical_address, 16) * 4
+
+# ---------------------------------------------
+
+# SIMULATE
+# --------
+def simulate(image_base, image, insn_buffer, dram_offset, hw_config, debug=True):
+    """
+    Execute a program on its DRAM image.
+    Inputs:
+        - image_base (int): The physical address of the first byte of the image
+        - image (bytes): The DRAM image
+        - insn_buffer (list): The instructions (structures or raw bytes)
+        - dram_offset (int): The physical address of the logical address 0
+        - hw_config (dict): The hardware configuration (see main_vta_compiler.hardware_configuration)
+    Outputs:
+        - dram (dict): The DRAM after the execution (see simulator.dram_definition)
+        - profile (dict): The execution counters (see simulator.run_program)
+    """
+    start = time.perf_counter()
+    sram = SIM.sram_definition(hw_config)
+    dram = SIM.dram_definition(image_base, image, dram_offset=dram_offset)
+    profile = SIM.run_program(insn_buffer, sram, dram)
+    profile["time"] = time.perf_counter() - start
+    if (debug):
+        print(f"\nSIMULATION: {profile['insn_counter']} instructions executed in {profile['time']*1000:.1f} ms\n")
+    return dram, profile
+
+# ---------------------------------------------
+
+# CHECK OUTPUTS
+# -------------
+def check_outputs(dram, expected_outputs, debug=True):
+    """
+    Compare the OUT regions with the expected outputs.
+    Inputs:
+        - dram (dict): The DRAM after the execution
+        - expected_outputs (list): The (name, physical address, expected bytes) of each OUT region,
+                                   the expected bytes are None if the region is not checked (e.g., overwritten)
+    Outputs:
+        - results (dict): For each checked name, whether the OUT region is the expected output
+    """
+    results = {}
+    for name, address, expected in expected_outputs:
+        if (expected is None):
+            if (debug):
+                print(f"OUT{name}: not checked")
+            continue
+        offset = address - dram["base_address"]
+        result = dram["data"][offset:offset+len(expected)].tobytes()
+        results[name] = (result == expected)
+        if (debug):
+            nb_diff = np.count_nonzero(np.frombuffer(result, dtype=np.uint8) != np.frombuffer(expected, dtype=np.uint8))
+            status = "OK" if (results[name]) else f"MISMATCH ({nb_diff}/{len(expected)} bytes)"
+            print(f"OUT{name}: {status}")
+    return results
+
+
+###############################################
+
+
+# CHECK LAYER
+# -----------
+def check_layer(layer, hw_config, debug=True):
+    """
+    Execute a compiled layer in-process and compare its OUT region with the golden output.
+    Inputs:
+        - layer (dict): The compiled layer with its INSN region (see main_vta_compiler.compile_layer)
+        - hw_config (dict): The hardware configuration
+    Outputs:
+        - results (dict): Whether the OUT region is the expected output (empty without golden output)
+        - profile (dict): The execution counters
+    """
+    regions = layer["base_addresses_list"]
+    image_base = min(int(obj_addr["physical_base_address"], 16) for obj_addr in regions)
+    image_end = max(int(obj_addr["physical_base_address"], 16) + obj_addr["size"] for obj_addr in regions)
+    image = bytearray(image_end - image_base)
+    for obj_addr in regions:
+        content = region_content(layer, obj_addr["type"])
+        offset = int(obj_addr["physical_base_address"], 16) - image_base
+        image[offset:offset+len(content)] = content
+        if (obj_addr["type"] == "UOP"):
+            dram_offset = dram_offset_definition(obj_addr["physical_base_address"], obj_addr["logical_base_address"])
+
+    dram, profile = simulate(image_base, image, layer["insn_buffer"], dram_offset, hw_config, debug=debug)
+
+    expected_outputs = []
+    if (layer["C_blocks"] is not None):
+        out_addr = next(obj_addr for obj_addr in regions if obj_addr["type"] == "OUT")
+        expected = b''.join(block.tobytes() for block in layer["C_blocks"])
+        expected_outputs.append((layer["name"], int(out_addr["physical_base_address"], 16), expected))
+    return check_outputs(dram, expected_outputs, debug=debug), profile
+
+# ---------------------------------------------
+
+# CHECK NETWORK
+# -------------
+def check_network(network, hw_config, debug=True):
+    """
+    Execute a compiled network in-process and compare the OUT region of each layer with its golden output
+    (the OUT regions reused by a later layer are reported as not checked, see dram_allocation/lifetime_allocation).
+    Inputs:
+        - network (dict): The compiled network (see main_network_compiler.network_compiler)
+        - hw_config (dict): The hardware configuration
+    Outputs:
+        - results (dict): For each layer with a golden output, whether its OUT region is the expected output
+        - profile (dict): The execution counters
+    """
+    image_base, image, regions = dram_image(network)
+    uop_addr = next(obj_addr for _, obj_addr in regions if obj_addr["type"] == "UOP")
+    dram_offset = dram_offset_definition(uop_addr["physical_base_address"], uop_addr["logical_base_address"])
+
+    dram, profile = simulate(image_base, image, network["insn_buffer"], dram_offset, hw_config, debug=debug)
+
+    expected_outputs = []
+    for layer in network["layers"]:
+        if (layer["C_blocks"] is None):
+            continue
+        out_addr = next(obj_addr for obj_addr in layer["base_addresses_list"] if obj_addr["type"] == "OUT")
+        expected = None if (layer.get("isOutOverwritten", False)) else b''.join(block.tobytes() for block in layer["C_blocks"])
+        expected_outputs.append((layer["name"], int(out_addr["physical_base_address"], 16), expected))
+    return check_outputs(dram, expected_outputs, debug=debug), profile
+
+
+###############################################
+
+
+# READ FILE
+# ---------
+def read_file(output_dir, filename):
+    path = filepath_definition(output_dir, filename)
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+# ---------------------------------------------
+
+# LOAD LAYER BINARIES
+# -------------------
+def load_layer_binaries(output_dir, name=''):
+    """
+    Read the binaries written by main_vta_compiler.py.
+    Outputs:
+        - image_base (int), image (bytearray): The DRAM image
+        - insn (bytes): The instructions
+        - dram_offset (int): The physical address of the logical address 0
+        - expected_outputs (list): The (name, physical address, expected bytes) of the OUT region (None without expected output)
+    """
+    with open(filepath_definition(output_dir, 'memory_addresses'+name+'.csv'), newline='') as csvfile:
+        rows = [row for row in csv.reader(csvfile) if row]
+
+    # Content of each region
+    regions = []
+    for obj_type, physical_address, logical_address in rows:
+        content = read_file(output_dir, REGION_FILES[obj_type]+name+'.bin') if (obj_type in REGION_FILES) else b''
+        if (content is None):
+            raise Exception(f"ERROR: The binary of the {obj_type} region is missing in {output_dir}! \n\n")
+        regions.append((obj_type, int(physical_address, 16), content))
+        if (obj_type == "UOP"):
+            dram_offset = dram_offset_definition(physical_address, logical_address)
+
+    # The OUT region is followed by the UOP and INSN regions (see main_vta_compiler.program_definition)
+    expected_outputs = []
+    expected = read_file(output_dir, 'expected_out'+name+'.bin')
+    out_address = next(address for obj_type, address, _ in regions if obj_type == "OUT")
+    expected_outputs.append((name, out_address, expected))
+    if (expected is not None):
+        regions.append(("OUT", out_address, bytes(len(expected))))
+
+    image_base = min(address for _, address, _ in regions)
+    image_end = max(address + len(content) for _, address, content in regions)
+    image = bytearray(image_end - image_base)
+    for _, address, content in regions:
+        image[address-image_base:address-image_base+len(content)] = content
+
+    insn = read_file(output_dir, 'instructions'+name+'.bin')
+    return image_base, image, insn, dram_offset, expected_outputs
+
+# ---------------------------------------------
+
+# LOAD NETWORK BINARIES
+# ---------------------
+def load_network_binaries(output_dir, name=''):
+    """
+    Read the binaries written by main_network_compiler.py (see load_layer_binaries for the outputs).
+    """
+    with open(filepath_definition(output_dir, 'network_memory_addresses'+name+'.csv'), newline='') as csvfile:
+        rows = [row for row in csv.reader(csvfile) if row]
+    image_base = int(rows[0][2], 16)
+    image = bytearray(read_file(output_dir, 'network_dram'+name+'.bin'))
+
+    expected_outputs = []
+    for layer_name, obj_type, physical_address, logical_address in rows[1:]:
+        if (obj_type == "UOP"):
+            dram_offset = dram_offset_definition(physical_address, logical_address)
+        if (obj_type == "OUT"):
+            expected = read_file(output_dir, 'expected_out'+layer_name+'.bin') # None if overwritten (see lifetime_allocation)
+            expected_outputs.append((layer_name, int(physical_address, 16), expected))
+
+    insn = read_file(output_dir, 'network_instructions'+name+'.bin')
+    return image_base, image, insn, dram_offset, expected_outputs
+
+
+# ---------------------------------------------
+
+# LOAD INPUT SLOTS
+# ----------------
+def load_input_slots(output_dir, prefix='', name=''):
+    """
+    Read the input slots and the patch table written by the compiler (see input_slots.write_input_slots).
+    Outputs:
+        - slots (list): For each slot, the INP and OUT address dicts (addresses and size)
+        - table (list): The (instruction index, INP or OUT) of each instruction to patch
+    """
+    slots = []
+    with open(filepath_definition(output_dir, prefix+'input_slots'+name+'.csv'), newline='') as csvfile:
+        for slot, obj_type, physical_address, logical_address, size in (row for row in csv.reader(csvfile) if row):
+            if (int(slot) == len(slots)):
+                slots.append({})
+            slots[int(slot)][obj_type] = {"type": obj_type, "physical_base_address": physical_address,
+                                          "logical_base_address": logical_address, "size": int(size)}
+
+    with open(filepath_definition(output_dir, prefix+'patch_table'+name+'.csv'), newline='') as csvfile:
+        table = [(int(idx), obj_type) for idx, obj_type in (row for row in csv.reader(csvfile) if row)]
+    return slots, table
+
+# ---------------------------------------------
+
+# SLOT BINARIES
+# -------------
+def slot_binaries(image_base, image, insn_buffer, expected_outputs, slots, table, slot):
+    """
+    Get the binaries executing the program on a slot: the instructions of the patch table are re-based on the slot
+    (see input_slots.slot_instructions), the input of the slot 0 is copied in the INP region of the slot,
+    and the expected output of the slot 0 is compared with the OUT region of the slot.
+    Inputs:
+        - image_base (int), image (bytearray): The DRAM image (not modified)
+        - insn_buffer (list): The instructions (raw bytes)
+        - expected_outputs (list): The (name, physical address, expected bytes) of each OUT region
+        - slots, table (list): The slots and the patch table (see load_input_slots)
+        - slot (int): The slot index
+    Outputs:
+        - image (bytearray): The DRAM image holding the regions of the slot
+        - insn_buffer (list): The instructions of the slot
+        - expected_outputs (list): The expected outputs, the OUT region of the slot 0 replaced by the OUT region of the slot
+    """
+    if not (0 <= slot < len(slots)):
+        raise Exception(f"ERROR: The slot {slot} does not exist ({len(slots)} slots)! \n\n")
+
+    # Re-base the instructions of the patch table (decoded as memory instructions)
+    insn_buffer = list(insn_buffer)
+    for i, _ in table:
+        insn_buffer[i] = VTAMemInsn.from_buffer_copy(bytes(insn_buffer[i]))
+    insn_buffer = IS.slot_instructions(insn_buffer, slots, table, slot)
+
+    # Same input on the slot (the image is extended to the regions of the slot)
+    inp_0, inp = (int(slots[k]["INP"]["physical_base_address"], 16) for k in (0, slot))
+    out_0, out = (int(slots[k]["OUT"]["physical_base_address"], 16) for k in (0, slot))
+    inp_size, out_size = slots[0]["INP"]["size"], slots[0]["OUT"]["size"]
+    image_end = max(image_base + len(image), inp + inp_size, out + out_size)
+    image = bytearray(image) + bytearray(image_end - image_base - len(image))
+    image[inp-image_base:inp-image_base+inp_size] = image[inp_0-image_base:inp_0-image_base+inp_size]
+
+    expected_outputs = [(name, out if (address == out_0) else address, expected) for name, address, expected in expected_outputs]
+    return image, insn_buffer, expected_outputs
+
+
+###############################################
+
+
+# MAIN FUNCTION
+# -------------
+def main(vta_config_dict, output_dir=None, name='', isNetwork=False, slot=0, debug=True):
+    # GET CONFIGURATION
+    hw_config = hardware_configuration(vta_config_dict)
+    if (output_dir is None):
+        output_dir = compiler_output_setup()
+
+
+    # ---------------------------------------------
+    # READ THE BINARIES
+    if (isNetwork):
+        image_base, image, insn, dram_offset, expected_outputs = load_network_binaries(output_dir, name)
+    else:
+        image_base, image, insn, dram_offset, expected_outputs = load_layer_binaries(output_dir, name)
+    insn_buffer = [insn[i:i+16] for i in range(0, len(insn), 16)]
+
+    # Execute the program on an input slot (see input_slots)
+    if (slot > 0):
+        slots, table = load_input_slots(output_dir, prefix='network_' if (isNetwork) else '', name=name)
+        image, insn_buffer, expected_outputs = slot_binaries(image_base, image, insn_buffer, expected_outputs, slots, table, slot)
+
+
+    # ---------------------------------------------
+    # SIMULATE AND CHECK
+    dram, profile = simulate(image_base, image, insn_buffer, dram_offset, hw_config, debug=debug)
+    results = check_outputs(dram, expected_outputs, debug=debug)
+    if not (results):
+        raise Exception(f"ERROR: No expected output to compare in {output_dir} (expected_out{name}.bin)! \n\n")
+
+
+    # ---------------------------------------------
+    # RETURN (0 if all the outputs are the expected ones)
+
+    return 0 if all(results.values()) else 1
+
+
+###############################################
+
+
+# COMMAND LINE INTERFACE
+# ----------------------
+def cli():
+    """
+    To execute (after main_vta_compiler.py or main_network_compiler.py):
+        > python main_simulator.py [<vta_config>.json] [False] [--network] [--name=<NAME>] [--dir=<output_dir>] [--slot=K]
+
+    The binaries are read from --dir (default: $VTA_COMPILER_OUTPUT, else standalone-vta/compiler_output/), the NAME suffixes the binaries.
+    --slot=K executes the program on the input slot K (compiled with --inputs=N, see input_slots) with the input of the slot 0.
+    The OUT regions are compared with the expected outputs, the exit code is 1 if one of them differs.
+    """
+    debug = True
+    vta_config_file = os.path.join(default_root(), 'config', 'vta_config.json')
+    output_dir = None
+    name = ''
+    isNetwork = False
+    slot = 0
+
+    for arg in sys.argv[1:]:
+        if (arg == "--network"):
+            isNetwork = True
+        elif arg.startswith("--name="):
+            name = arg.split("=", 1)[1]
+        elif arg.startswith("--dir="):
+            output_dir = arg.split("=", 1)[1]
+        elif arg.startswith("--slot="):
+            slot = int(arg.split("=", 1)[1])
+        elif (arg == "False" or arg == "True"):
+            debug = (arg == "True")
+        elif arg.endswith(".json"):
+            vta_config_file = arg
+        else:
+            print("python main_simulator.py [<vta_config>.json] [False] [--network] [--name=<NAME>] [--dir=<output_dir>] [--slot=K]")
+            sys.exit(1)
+
+    # Parse the configuration
+    vta_config_dict = parse_json_to_dict(vta_config_file)
+
+    # Execute the main function
+    return main(vta_config_dict, output_dir=output_dir, name=name, isNetwork=isNetwork, slot=slot, debug=debug)
+
+# ---------------------------------------------
+
+# EXECUTE MAIN FUNCTION
+# ---------------------
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -2,73 +2,252 @@
 # ---------------
 import os
 import sys
+import json
 
 import numpy as np
 import csv
 
-import config.configuration as conf
-import data_definition.data_definition as DF
-import dram_allocation.dram_allocation as DA
-import matrix_partitioning.matrix_partitioning as MP
-import operations_definition.operations_definition as OP
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.find_project_root import *
-from utils.json_parser import *
+# Executed as a script from a checkout (e.g., python main_vta_compiler.py): make the vta_compiler package importable
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vta_compiler.config.configuration as conf
+import vta_compiler.data_definition.data_definition as DF
+import vta_compiler.data_definition.alu_operations as ALU
+import vta_compiler.data_definition.convolution as CV
+import vta_compiler.data_definition.matrix_split as MS
+import vta_compiler.dram_allocation.dram_allocation as DA
+import vta_compiler.matrix_partitioning.matrix_partitioning as MP
+import vta_compiler.operations_definition.operations_definition as OP
+import vta_compiler.compilation_cache.compilation_cache as CC
+import vta_compiler.profiling.profiling as PF
+import vta_compiler.input_slots.input_slots as IS
+from vta_compiler.utils.find_project_root import *
+from vta_compiler.utils.json_parser import *
 
 
 ###############################################
 
 
-# MAIN FUNCTION
+# HARDWARE CONFIGURATION
+# ----------------------
+def hardware_configuration(vta_config_dict):
+    """
+    Get the data types and the buffer sizes from the VTA configuration.
+    Inputs:
+        - vta_config_dict (dict): The parsed VTA configuration (e.g., config/vta_config.json)
+    Outputs:
+        - hw_config (dict): The data types, the block size, the batch and the buffer sizes (in number of elements)
+    With LOG_BATCH > 0, an INP, ACC or OUT element holds batch rows of a block (block_elements per block).
+    """
+    block_size = 2**vta_config_dict["LOG_BLOCK"]
+    batch = 2**vta_config_dict.get("LOG_BATCH", 0)
+    if (batch > block_size):
+        raise Exception(f"ERROR: The batch ({batch}) cannot be larger than the block size ({block_size})! \n\n")
+
+    hw_config = {
+        "inp_dtype": conf.data_type(vta_config_dict["LOG_INP_WIDTH"]),
+        "wgt_dtype": conf.data_type(vta_config_dict["LOG_WGT_WIDTH"]),
+        "acc_dtype": conf.data_type(vta_config_dict["LOG_ACC_WIDTH"]),
+        "block_size": block_size,
+        "batch": batch,
+        "block_elements": block_size // batch,
+        "inp_buffer_size": conf.buffer_size(vta_config_dict["LOG_INP_BUFF_SIZE"], vta_config_dict["LOG_INP_WIDTH"], batch*block_size),
+        "wgt_buffer_size": conf.buffer_size(vta_config_dict["LOG_WGT_BUFF_SIZE"], vta_config_dict["LOG_WGT_WIDTH"], block_size*block_size),
+        "acc_buffer_size": conf.buffer_size(vta_config_dict["LOG_ACC_BUFF_SIZE"], vta_config_dict["LOG_ACC_WIDTH"], batch*block_size),
+        "uop_buffer_size": conf.buffer_size(vta_config_dict["LOG_UOP_BUFF_SIZE"], 5, 1)
+    }
+    hw_config["out_buffer_size"] = hw_config["acc_buffer_size"]
+
+    return hw_config
+
+# ---------------------------------------------
+
+# COMPILE LAYER
 # -------------
-def main(operations_dict, vta_config_dict, debug=True):
-    # GET CONFIGURATION
-    inp_dtype = conf.data_type(vta_config_dict["LOG_INP_WIDTH"])
-    wgt_dtype = conf.data_type(vta_config_dict["LOG_WGT_WIDTH"])
-    acc_dtype = conf.data_type(vta_config_dict["LOG_ACC_WIDTH"])
+def compile_layer(operations_dict, hw_config, base_address=None, inp_address=None, inp_gather=None,
+                  doInsnAllocation=True, random_bound=4, nb_workers=1,
+                  cache_dir=None, cache_max_size=CC.CACHE_MAX_SIZE, doGolden=True, profile=None, debug=True):
+    """
+    Compile a single operation (layer): data definition, DRAM allocation, matrix partitioning and operations definition.
+    Inputs:
+        - operations_dict (dict): The parsed operations JSON
+        - hw_config (dict): The hardware configuration (see hardware_configuration)
+        - base_address (int): The physical DRAM base address, if None it is read from "BASE_ADDRESS" (default: 0x0000)
+        - inp_address (int): If not None, INP is not allocated but placed at this physical address (e.g., the OUT of a previous layer)
+        - inp_gather (list): If not None, the LOAD segments of each INP block (see chaining.gather_segments),
+                             relative to the INP region if inp_address is None (e.g., a CONV2D, see convolution)
+        - doInsnAllocation (bool): Allocate the INSN region right after the UOP region
+        - nb_workers (int): The number of worker processes for the C tiles and the strategy steps (1: sequential)
+        - cache_dir (str): If not None, the directory of the compilation cache
+        - cache_max_size (int): The size of the compilation cache (bytes), the least recently used entries are evicted
+        - doGolden (bool): Compute the golden outputs, if False and the program is cached, only the operands are defined
+        - profile (dict): If not None, the measures of each stage are accumulated in it (see profiling)
+    Outputs:
+        - layer (dict): The blocks, the addresses, the strategy, the instructions and the UOPs of the layer
+    """
+    # Get the name of the execution
+    if "NAME" in operations_dict:
+        name = operations_dict["NAME"]
+    else:
+        name = ''
 
-    block_size = 2**vta_config_dict["LOG_BLOCK"]
+    # COMPILATION CACHE
+    program = None
+    if (cache_dir is not None):
+        parameters = {"base_address": base_address, "inp_address": inp_address, "inp_gather": inp_gather,
+                      "doInsnAllocation": doInsnAllocation, "random_bound": random_bound}
+        # Same layer (same operands)
+        layer_key = CC.cache_key(operations_dict, hw_config, parameters)
+        layer = CC.cache_load(cache_dir, layer_key)
+        if (layer is not None):
+            layer["name"] = name
+            layer["isIncremental"] = False
+            if (debug):
+                print(f"\n\nCOMPILATION CACHE: {name} loaded from {layer_key}\n")
+            return layer
+        # Same program (only the *_VALUES differ): incremental compilation
+        program_key = CC.cache_key(operations_dict, hw_config, parameters, withValues=False)
+        program = CC.cache_load(cache_dir, program_key)
+        if (program is not None and debug):
+            print(f"\n\nCOMPILATION CACHE: program of {name} loaded from {program_key}\n")
+
+    # The golden outputs define the ALU operations, they are required to define the program
+    doGolden = doGolden or (program is None)
+
+    # Convolution: GeMM of the im2row, the INP region only holds the input tensor
+    inp_blocks = None
+    if ("CONV2D" in operations_dict):
+        if (inp_address is not None):
+            raise Exception(f"ERROR: The INPUT of a CONV2D cannot be chained ({name})! \n\n")
+        if (hw_config["batch"] > 1):
+            raise Exception(f"ERROR: A CONV2D gathers single pixels, it is not supported with LOG_BATCH > 0 ({name})! \n\n")
+        operations_dict, inp_blocks, inp_gather = CV.conv2d_lowering(operations_dict, hw_config, random_bound=random_bound)
+
+    # GET CONFIGURATION
+    inp_dtype = hw_config["inp_dtype"]
+    wgt_dtype = hw_config["wgt_dtype"]
+    acc_dtype = hw_config["acc_dtype"]
+    block_size = hw_config["block_size"]
 
-    inp_buffer_size = conf.buffer_size(vta_config_dict["LOG_INP_BUFF_SIZE"], vta_config_dict["LOG_INP_WIDTH"], block_size)
-    wgt_buffer_size = conf.buffer_size(vta_config_dict["LOG_WGT_BUFF_SIZE"], vta_config_dict["LOG_WGT_WIDTH"], block_size*block_size)
-    acc_buffer_size = conf.buffer_size(vta_config_dict["LOG_ACC_BUFF_SIZE"], vta_config_dict["LOG_ACC_WIDTH"], block_size)
-    out_buffer_size = acc_buffer_size
 
-    uop_buffer_size = conf.buffer_size(vta_config_dict["LOG_UOP_BUFF_SIZE"], 5, 1)
+    # ---------------------------------------------
+    # DATA DEFINITION
+    with PF.stage(profile, "data_definition"):
+        A_blocks, A_blocks_col, B_blocks, B_blocks_col, \
+            X_blocks, Y_blocks, ALU_blocks, C_blocks, C_init, X_blocks_col, \
+            alu_operations, idx_to_store, \
+            flag_dict = \
+                DF.data_definition(operations_dict, inp_dtype=inp_dtype, wgt_dtype=wgt_dtype, acc_dtype=acc_dtype,
+                                   block_size=block_size, random_bound=random_bound, doGolden=doGolden, debug=debug)
+
+    # INP region: the rows padding the last row of blocks are not stored, they are synthesized by the LOADs
+    # (by whole elements of batch rows)
+    if (inp_blocks is None and inp_address is None and flag_dict["doGemm"]):
+        A_row = operations_dict["MATRICES"][0][operations_dict["GEMM"][0]][0]
+        A_row = -(-A_row // hw_config["batch"]) * hw_config["batch"]
+        inp_blocks = MS.compact_blocks(A_blocks, A_blocks_col, A_row, block_size=block_size)
+
+    layer = {
+        "name": name,
+        "A_blocks": A_blocks,
+        "INP_blocks": A_blocks if (inp_blocks is None) else inp_blocks,
+        "B_blocks": B_blocks,
+        "X_blocks": X_blocks,
+        "Y_blocks": Y_blocks,
+        "ALU_blocks": ALU_blocks,
+        "C_blocks": C_blocks,
+        "C_init": C_init,
+        "X_blocks_col": X_blocks_col,
+        "isIncremental": program is not None
+    }
 
-    # Others configuration
-    random_bound = 4
+
+    # ---------------------------------------------
+    # PROGRAM (DRAM allocation, matrix partitioning and operations definition)
+
+    if (program is None):
+        program = program_definition(operations_dict, hw_config, layer, A_blocks_col, B_blocks_col,
+                                     alu_operations, idx_to_store, flag_dict,
+                                     base_address=base_address, inp_address=inp_address, inp_gather=inp_gather,
+                                     doInsnAllocation=doInsnAllocation, nb_workers=nb_workers, profile=profile, debug=debug)
+        if (cache_dir is not None):
+            CC.cache_store(cache_dir, program_key, program, cache_max_size)
+    layer.update(program)
 
 
     # ---------------------------------------------
-    # DATA DEFINITION
-    A_blocks, A_blocks_col, B_blocks, B_blocks_col, \
-        X_blocks, Y_blocks, ALU_blocks, C_blocks, C_init, X_blocks_col, \
-        alu_operations, idx_to_store, \
-        flag_dict = \
-            DF.data_definition(operations_dict, inp_dtype=inp_dtype, wgt_dtype=wgt_dtype, acc_dtype=acc_dtype,
-                               block_size=block_size, random_bound=random_bound, debug=debug)
+    # RETURN
+
+    # Store the compiled layer in the cache (only with its golden outputs)
+    if (cache_dir is not None and doGolden):
+        CC.cache_store(cache_dir, layer_key, layer, cache_max_size)
+
+    return layer
+
+# ---------------------------------------------
+
+# PROGRAM DEFINITION
+# ------------------
+def program_definition(operations_dict, hw_config, layer, A_blocks_col, B_blocks_col,
+                       alu_operations, idx_to_store, flag_dict,
+                       base_address=None, inp_address=None, inp_gather=None,
+                       doInsnAllocation=True, nb_workers=1, profile=None, debug=True):
+    """
+    Define the program of a layer: DRAM allocation, matrix partitioning and operations definition.
+    The program only depends on the shapes and on the operations, not on the values of the operands.
+    Inputs:
+        - operations_dict (dict): The parsed operations JSON
+        - hw_config (dict): The hardware configuration (see hardware_configuration)
+        - layer (dict): The blocks of the layer (see compile_layer)
+        - A_blocks_col, B_blocks_col (int): The number of blocks per row of A and B
+        - alu_operations, idx_to_store, flag_dict: The ALU operations, the vectors to store and the flags (see data_definition)
+        - other inputs: see compile_layer
+    Outputs:
+        - program (dict): The vectors to store, the flags, the strategy, the instructions, the UOPs and the addresses
+    """
+    # GET CONFIGURATION
+    inp_dtype = hw_config["inp_dtype"]
+    wgt_dtype = hw_config["wgt_dtype"]
+    acc_dtype = hw_config["acc_dtype"]
+    block_size = hw_config["block_size"]
+    batch = hw_config["batch"]
+
+    # With LOG_BATCH > 0, the program addresses elements of batch rows (block_elements per block)
+    if (batch > 1 and inp_gather is not None):
+        raise Exception(f"ERROR: The INP blocks cannot be gathered vector by vector with LOG_BATCH > 0! \n\n")
+    alu_operations, idx_to_store = ALU.batch_alu_operations(alu_operations, idx_to_store, batch=batch)
+
+    # Get the blocks
+    B_blocks = layer["B_blocks"]
+    X_blocks = layer["X_blocks"]
+    Y_blocks = layer["Y_blocks"]
+    X_blocks_col = layer["X_blocks_col"]
 
 
     # ---------------------------------------------
     # DRAM ALLOCATION
 
     # Force an allocation size for OUT
-    forced_allocation_size = sum(matrix.nbytes for matrix in ALU_blocks)
+    forced_allocation_size = sum(matrix.nbytes for matrix in layer["ALU_blocks"])
     # Create the object to allocate
-    object_list = [("INP", A_blocks),
-                   ("WGT", B_blocks),
+    if (inp_address is None):
+        object_list = [("INP", layer["INP_blocks"])]
+    else: # INP is placed on an already allocated region
+        object_list = [("INP", layer["INP_blocks"], 0, inp_address)]
+    object_list = object_list + \
+                  [("WGT", B_blocks),
                    ("ACC", X_blocks),
                    ("ACC_BIS", Y_blocks),
-                   ("OUT", C_blocks, forced_allocation_size),
+                   ("OUT", layer["C_blocks"], forced_allocation_size),
                    ("UOP", [], 4)]
 
-    # Get the offsets
-    if "BASE_ADDRESS" in operations_dict:
-        base_address = int(operations_dict["BASE_ADDRESS"], base=16)
-    else:
-        base_address = 0x0000
+    # Get the offsets
+    if (base_address is None):
+        if "BASE_ADDRESS" in operations_dict:
+            base_address = int(operations_dict["BASE_ADDRESS"], base=16)
+        else:
+            base_address = 0x0000
     if "DRAM_OFFSET" in operations_dict:
         dram_offset = int(operations_dict["DRAM_OFFSET"], base=16)
     else:
@@ -76,72 +255,165 @@ def main(operations_dict, vta_config_dict, debug=True):
 
 
     # Allocate the object
-    base_addresses_list, current_dram_addr = \
-        DA.dram_allocation(object_list, base_addr=base_address, block_size=block_size, 
-                           inp_dtype=inp_dtype, wgt_dtype=wgt_dtype, acc_dtype=acc_dtype,
-                           dram_offset=dram_offset, debug=debug)
+    with PF.stage(profile, "dram_allocation"):
+        base_addresses_list, current_dram_addr = \
+            DA.dram_allocation(object_list, base_addr=base_address, block_size=block_size, 
+                               inp_dtype=inp_dtype, wgt_dtype=wgt_dtype, acc_dtype=acc_dtype,
+                               dram_offset=dram_offset, batch=batch, debug=debug)
+
+    # The INP blocks are gathered from the INP region
+    if (inp_gather is not None):
+        # Gathered from the INP region of the layer (convolution): the addresses are relative to the region
+        if (inp_address is None):
+            inp_logical_base = int(base_addresses_list[0]["logical_base_address"], 16)
+            inp_gather = [[(sram_offset, inp_logical_base + dram_base, y_size, x_stride, y_pad_top, y_pad_bottom)
+                           for (sram_offset, dram_base, y_size, x_stride, y_pad_top, y_pad_bottom) in segments]
+                          for segments in inp_gather]
+        base_addresses_list[0]["blocks_gather"] = inp_gather
+    # The last INP blocks are stored without their padding rows
+    elif (any(block.shape[0] < block_size for block in layer["INP_blocks"])):
+        base_addresses_list[0]["blocks_vectors"] = [block.shape[0] // batch for block in layer["INP_blocks"]]
 
 
     # ---------------------------------------------
     # MATRIX PARTITIONING
 
-    # Compute the data for matrix partitioning
-    if (flag_dict["doGemm"] == True):
-        nb_A = len(A_blocks)
-        nb_B = len(B_blocks)
-    else:
-        nb_A = 0
-        nb_B = 0
-    nb_X = len(X_blocks)
-
-    # Select a strategy in case of overfitting
-    strategy_selector = 1
+    # Select a strategy in case of overfitting (default: 1)
+    strategy_selector = operations_dict.get("STRATEGY", 1)
 
     # Apply matrix partitioning (check is overfit then applies selected trategy)
-    strategy, flag_dict = \
-        MP.matrix_partitioning(nb_A=nb_A, A_blocks_col=A_blocks_col, nb_B=nb_B, B_blocks_col=B_blocks_col, 
-                               nb_X=nb_X, X_blocks_col=X_blocks_col,
-                               inp_buffer_size=inp_buffer_size, wgt_buffer_size=wgt_buffer_size, 
-                               acc_buffer_size=acc_buffer_size, out_buffer_size=out_buffer_size,
-                               alu_operations=alu_operations, idx_to_store=idx_to_store,
-                               flag_dict=flag_dict,
-                               strategy_selector=strategy_selector, block_size=block_size,
-                               debug=debug)
+    with PF.stage(profile, "matrix_partitioning"):
+        strategy, flag_dict = \
+            strategy_definition(hw_config, layer, A_blocks_col, B_blocks_col, alu_operations, idx_to_store, flag_dict,
+                                strategy_selector=strategy_selector, nb_workers=nb_workers, debug=debug)
 	
 
     # ---------------------------------------------
     # OPERATIONS DEFINITION
 
-    insn_buffer, uop_buffer = \
-        OP.operations_definition(strategy=strategy, dram_addresses=base_addresses_list,
-                                 operations_dict=operations_dict, flag_dict=flag_dict,
-                                 block_size=block_size, uop_buffer_size=uop_buffer_size,
-                                 A_blocks_col=A_blocks_col, B_blocks_col=B_blocks_col, X_blocks_col=X_blocks_col,
-                                 debug=debug)
+    with PF.stage(profile, "operations_definition"):
+        insn_buffer, uop_buffer = \
+            OP.operations_definition(strategy=strategy, dram_addresses=base_addresses_list,
+                                     operations_dict=operations_dict, flag_dict=flag_dict,
+                                     block_size=hw_config["block_elements"], uop_buffer_size=hw_config["uop_buffer_size"],
+                                     A_blocks_col=A_blocks_col, B_blocks_col=B_blocks_col, X_blocks_col=X_blocks_col,
+                                     nb_workers=nb_workers, debug=debug)
     
     # Update DRAM allocation
-    object_list = [("UOP", uop_buffer),
-                   ("INSN", insn_buffer)]
-    updated_addr, current_dram_addr = \
-        DA.dram_allocation(object_list, base_addr=current_dram_addr-4, block_size=block_size, 
-                           inp_dtype=inp_dtype, wgt_dtype=wgt_dtype, acc_dtype=acc_dtype,
-                           dram_offset=dram_offset, debug=debug)
+    object_list = [("UOP", uop_buffer)]
+    if (doInsnAllocation):
+        object_list.append(("INSN", insn_buffer))
+    with PF.stage(profile, "dram_allocation"):
+        updated_addr, current_dram_addr = \
+            DA.dram_allocation(object_list, base_addr=current_dram_addr-4, block_size=block_size, 
+                               inp_dtype=inp_dtype, wgt_dtype=wgt_dtype, acc_dtype=acc_dtype,
+                               dram_offset=dram_offset, batch=batch, debug=debug)
     base_addresses_list[-1] = updated_addr[0]
-    base_addresses_list.append(updated_addr[1])
+    base_addresses_list = base_addresses_list + updated_addr[1:]
 
 
     # ---------------------------------------------
-    # DATA BINARISATION
-
-    # Get the name of the execution
-    if "NAME" in operations_dict:
-        name = operations_dict["NAME"]
+    # RETURN
+
+    program = {
+        "idx_to_store": idx_to_store,
+        "flag_dict": flag_dict,
+        "strategy": strategy,
+        "insn_buffer": insn_buffer,
+        "uop_buffer": uop_buffer,
+        "base_addresses_list": base_addresses_list,
+        "current_dram_addr": current_dram_addr
+    }
+
+    return program
+
+# ---------------------------------------------
+
+# STRATEGY DEFINITION
+# -------------------
+def strategy_definition(hw_config, layer, A_blocks_col, B_blocks_col, alu_operations, idx_to_store, flag_dict,
+                        strategy_selector=1, nb_workers=1, debug=True):
+    """
+    Apply the matrix partitioning on the blocks of a layer.
+    Inputs:
+        - strategy_selector (int): The strategy in [1..4] applied when the GeMM overfits the SRAM
+        - other inputs: see program_definition
+    Outputs:
+        - strategy (list): The strategy [([Ai], [Bi], [Xi], [Mi], [Ti], [Ci], [Operations])]
+        - flag_dict (dict): The flags updated with 'isOverfitting'
+    """
+    # Compute the data for matrix partitioning
+    if (flag_dict["doGemm"] == True):
+        nb_A = len(layer["A_blocks"])
+        nb_B = len(layer["B_blocks"])
     else:
-        name = ''
-    # Setup the output folder (standalone-vta/compiler_output/)
-    output_dir = compiler_output_setup()
+        nb_A = 0
+        nb_B = 0
+    nb_X = len(layer["X_blocks"])
+
+    return MP.matrix_partitioning(nb_A=nb_A, A_blocks_col=A_blocks_col, nb_B=nb_B, B_blocks_col=B_blocks_col, 
+                                  nb_X=nb_X, X_blocks_col=layer["X_blocks_col"],
+                                  inp_buffer_size=hw_config["inp_buffer_size"], wgt_buffer_size=hw_config["wgt_buffer_size"], 
+                                  acc_buffer_size=hw_config["acc_buffer_size"], out_buffer_size=hw_config["out_buffer_size"],
+                                  alu_operations=alu_operations, idx_to_store=idx_to_store,
+                                  flag_dict=flag_dict,
+                                  strategy_selector=strategy_selector, block_size=hw_config["block_elements"],
+                                  nb_workers=nb_workers, debug=debug)
+
+# ---------------------------------------------
+
+# STRATEGY COMPARISON
+# -------------------
+def strategy_comparison(operations_dict, hw_config, selectors=(1, 2, 3, 4), random_bound=4):
+    """
+    Report the DRAM traffic and the SRAM occupancy of each strategy on the same layer (see strategy_report).
+    Inputs:
+        - operations_dict (dict): The parsed operations JSON
+        - hw_config (dict): The hardware configuration (see hardware_configuration)
+        - selectors (tuple): The strategies to compare
+    Outputs:
+        - reports (dict): The report of each strategy (only the first one if the GeMM does not overfit)
+    """
+    # Loaded on demand (not used by a default compilation)
+    import vta_compiler.matrix_partitioning.strategy_report as SR
+
+    if ("CONV2D" in operations_dict):
+        operations_dict, _, _ = CV.conv2d_lowering(operations_dict, hw_config, random_bound=random_bound)
+    A_blocks, A_blocks_col, B_blocks, B_blocks_col, \
+        X_blocks, _, _, _, _, X_blocks_col, \
+        alu_operations, idx_to_store, \
+        flag_dict = \
+            DF.data_definition(operations_dict, inp_dtype=hw_config["inp_dtype"], wgt_dtype=hw_config["wgt_dtype"],
+                               acc_dtype=hw_config["acc_dtype"], block_size=hw_config["block_size"],
+                               random_bound=random_bound, debug=False)
+    layer = {"A_blocks": A_blocks, "B_blocks": B_blocks, "X_blocks": X_blocks, "X_blocks_col": X_blocks_col}
+
+    reports = {}
+    for strategy_selector in selectors:
+        strategy, flags = strategy_definition(hw_config, layer, A_blocks_col, B_blocks_col, alu_operations,
+                                              idx_to_store, dict(flag_dict), strategy_selector=strategy_selector,
+                                              debug=False)
+        reports[strategy_selector] = SR.strategy_report(strategy, hw_config, flags)
+        # The strategy selector is only used when the GeMM overfits
+        if not (flags["doGemm"] and len(strategy) > 1):
+            break
+    return reports
+
+# ---------------------------------------------
+
+# WRITE LAYER BINARIES
+# --------------------
+def write_layer_binaries(layer, output_dir, doGolden=True):
+    """
+    Write the binaries of a compiled layer (matrices, DRAM addresses, instructions and UOPs).
+    Inputs:
+        - layer (dict): The compiled layer (see compile_layer)
+        - output_dir (str): The directory where the files are written
+        - doGolden (bool): Write the golden outputs (expected_out and expected_out_sram)
+    """
+    name = layer["name"]
 
-    # MATRICES
+    # MATRICES
     # Define the complete path of the files
     A_blocks_file_path = filepath_definition(output_dir, 'input'+name+'.bin')
     B_blocks_file_path = filepath_definition(output_dir, 'weight'+name+'.bin')
@@ -151,40 +423,42 @@ def main(operations_dict, vta_config_dict, debug=True):
     C_init_file_path = filepath_definition(output_dir, 'out_init'+name+'.bin')
     ALU_blocks_file_path = filepath_definition(output_dir, 'expected_out_sram'+name+'.bin')
 
-    # Write A_blocks matrix
+    # Write A_blocks matrix (content of the INP region)
     with open(A_blocks_file_path, 'wb') as f:
-        for block in A_blocks:
+        for block in layer["INP_blocks"]:
             block.tofile(f)
     
     # Write B_blocks matrix (TO TRANSPOSE!)
     with open(B_blocks_file_path, 'wb') as f:
-        for block in B_blocks:
+        for block in layer["B_blocks"]:
             transposed = block.transpose()
             transposed.tofile(f)
 
     # Write X_blocks matrix
     with open(X_blocks_file_path, 'wb') as f:
-        for block in X_blocks:
+        for block in layer["X_blocks"]:
             block.tofile(f)
 
     # Write Y_blocks matrix
     with open(Y_blocks_file_path, 'wb') as f:
-        for block in Y_blocks:
+        for block in layer["Y_blocks"]:
             block.tofile(f)
     
     # Write C_blocks (expected result)
-    with open(C_blocks_file_path, 'wb') as f:
-        for block in C_blocks:
-            block.tofile(f)
+    if (doGolden):
+        with open(C_blocks_file_path, 'wb') as f:
+            for block in layer["C_blocks"]:
+                block.tofile(f)
     
     # Write the C_init (init the SRAM buffer for cycle-accurate simulator)
     with open(C_init_file_path, 'wb') as f:
-        C_init.tofile(f)
+        layer["C_init"].tofile(f)
     
     # Write ALU_blocks (expected result before store)
-    with open(ALU_blocks_file_path, 'wb') as f:
-        for block in ALU_blocks:
-            block.tofile(f)
+    if (doGolden):
+        with open(ALU_blocks_file_path, 'wb') as f:
+            for block in layer["ALU_blocks"]:
+                block.tofile(f)
 
 
     # DRAM ALLOCATION
@@ -192,7 +466,7 @@ def main(operations_dict, vta_config_dict, debug=True):
 
     with open(base_addresses_file_path, 'w', newline='') as csvfile:
         writer = csv.writer(csvfile)
-        for obj_addr in base_addresses_list:
+        for obj_addr in layer["base_addresses_list"]:
             writer.writerow([obj_addr['type'], obj_addr['physical_base_address'], obj_addr['logical_base_address']])
 
     
@@ -200,13 +474,249 @@ def main(operations_dict, vta_config_dict, debug=True):
     insn_file_path = filepath_definition(output_dir, 'instructions'+name+'.bin')
     uop_file_path = filepath_definition(output_dir, 'uop'+name+'.bin')
     with open(insn_file_path, "wb") as f:
-        for insn in insn_buffer:
+        for insn in layer["insn_buffer"]:
             f.write(insn)
     with open(uop_file_path, "wb") as f:
-        for uop in uop_buffer:
+        for uop in layer["uop_buffer"]:
             f.write(uop)
+
+
+# ---------------------------------------------
+
+# FLATTEN BLOCKS
+# --------------
+def flatten_blocks(blocks, dtype):
+    """
+    Concatenate the flattened blocks in a single 1D array (the blocks can have different shapes).
+    """
+    if (blocks is None):
+        return None
+    if (len(blocks) == 0):
+        return np.empty((0,), dtype=dtype)
+    return np.concatenate([np.ravel(block) for block in blocks])
+
+# ---------------------------------------------
+
+# PROGRAM BUFFERS
+# ---------------
+def program_buffers(layer, hw_config, doGolden=True):
+    """
+    Get the binaries of a compiled layer as NumPy arrays, their bytes are the ones written by write_layer_binaries.
+    Inputs:
+        - layer (dict): The compiled layer (see compile_layer)
+        - hw_config (dict): The hardware configuration (see hardware_configuration)
+        - doGolden (bool): Get the golden outputs (OUT and OUT_SRAM), None otherwise
+    Outputs:
+        - buffers (dict): The flattened data blocks (INP, WGT transposed, ACC, ACC_BIS, OUT, OUT_INIT, OUT_SRAM),
+                          the instructions (INSN: 16 bytes each), the UOPs (UOP: 32-bit words)
+                          and the DRAM map (DRAM_MAP: type, physical address, logical address and size of each region)
+    """
+    inp_dtype = hw_config["inp_dtype"]
+    acc_dtype = hw_config["acc_dtype"]
+
+    buffers = {
+        "INP": flatten_blocks(layer["INP_blocks"], inp_dtype),
+        "WGT": flatten_blocks([block.transpose() for block in layer["B_blocks"]], hw_config["wgt_dtype"]),
+        "ACC": flatten_blocks(layer["X_blocks"], acc_dtype),
+        "ACC_BIS": flatten_blocks(layer["Y_blocks"], acc_dtype),
+        "OUT": flatten_blocks(layer["C_blocks"], inp_dtype) if (doGolden) else None,
+        "OUT_INIT": layer["C_init"],
+        "OUT_SRAM": flatten_blocks(layer["ALU_blocks"], acc_dtype) if (doGolden) else None,
+        "INSN": np.frombuffer(b''.join(bytes(insn) for insn in layer["insn_buffer"]), dtype=np.uint8).reshape(-1, 16),
+        "UOP": np.frombuffer(b''.join(bytes(uop) for uop in layer["uop_buffer"]), dtype='<u4')
+    }
+
+    dram_map = np.zeros(len(layer["base_addresses_list"]),
+                        dtype=[("type", "U8"), ("physical_address", np.uint64), ("logical_address", np.uint64), ("size", np.uint64)])
+    for i, obj_addr in enumerate(layer["base_addresses_list"]):
+        dram_map[i] = (obj_addr["type"], int(obj_addr["physical_base_address"], 16),
+                       int(obj_addr["logical_base_address"], 16), obj_addr["size"])
+    buffers["DRAM_MAP"] = dram_map
+
+    return buffers
+
+
+###############################################
+
+
+# COMPILE PROGRAM
+# ---------------
+def compile_program(operations_dict, vta_config_dict, output_dir=None, random_bound=4, nb_workers=1,
+                    cache_dir=None, doGolden=True, profile=None, debug=False):
+    """
+    Compile operations in-process and get the binaries as NumPy arrays (no file is written without output_dir).
+    It is the vta_compiler.compile of the package API.
+    Inputs:
+        - operations_dict (dict): The parsed operations JSON
+        - vta_config_dict (dict): The parsed VTA configuration
+        - output_dir (str): If not None, the binaries are also written in this directory (see write_layer_binaries)
+        - other inputs: see compile_layer
+    Outputs:
+        - compiled (dict): The name, the hardware configuration, the compiled layer (see compile_layer)
+                           and its binaries (see program_buffers)
+    """
+    hw_config = hardware_configuration(vta_config_dict)
+    layer = compile_layer(operations_dict, hw_config, random_bound=random_bound, nb_workers=nb_workers,
+                          cache_dir=cache_dir, doGolden=doGolden, profile=profile, debug=debug)
+
+    compiled = {"name": layer["name"], "hw_config": hw_config, "layer": layer}
+    compiled.update(program_buffers(layer, hw_config, doGolden=doGolden))
+
+    # Optional file emission
+    if (output_dir is not None):
+        with PF.stage(profile, "binarization"):
+            write_layer_binaries(layer, output_dir, doGolden=doGolden)
+
+    return compiled
+
+
+###############################################
+
+
+# COMPILER OPTIONS
+# ----------------
+def compiler_options(args):
+    """
+    Extract the options from the command line arguments:
+        --jobs=N: compile with N worker processes (--jobs=0: one per core)
+        --cache[=<dir>]: use the compilation cache (default: standalone-vta/compiler_cache/)
+        --no-golden: do not write the golden outputs (not computed if the program is cached)
+        --estimate: estimate the cycles of the program (see performance_model)
+        --strategy-report: report the DRAM traffic and the SRAM occupancy of each strategy (see strategy_report)
+        --profile[=<file>.json]: measure the time and the memory of each stage (see profiling), and write them in the JSON file
+        --output-dir=<dir>: write the binaries in <dir> (default: $VTA_COMPILER_OUTPUT, else standalone-vta/compiler_output/)
+        --seed=N: draw the random matrices with the seeded generators (see data_definition/matrix_generator), overrides "SEED"
+        --inputs=N: allocate N input slots and write the patch table executing the program on each slot (see input_slots)
+        --dram-reuse: share the DRAM between the regions of disjoint lifetimes across the layers (network compiler only,
+                      see dram_allocation/lifetime_allocation)
+        --memory-map: also write the DRAM map in a binary file (see dram_allocation.write_memory_map)
+    Inputs:
+        - args (list): The command line arguments
+    Outputs:
+        - args (list): The arguments without the options
+        - options (dict): The options (nb_workers, cache_dir, doGolden, doEstimate, doStrategyReport, doProfile, profile_file, output_dir, seed, nb_inputs, doDramReuse,
+                             doMemoryMap)
+    """
+    options = {"nb_workers": 1, "cache_dir": None, "doGolden": True, "doEstimate": False, "doStrategyReport": False,
+               "doProfile": False, "profile_file": None, "output_dir": None, "seed": None, "nb_inputs": 1,
+               "doDramReuse": False, "doMemoryMap": False}
+    other_args = []
+    for arg in args:
+        if arg.startswith("--jobs="):
+            options["nb_workers"] = int(arg.split("=")[1]) or os.cpu_count()
+        elif (arg == "--cache"):
+            options["cache_dir"] = os.path.join(default_root(), 'compiler_cache')
+        elif arg.startswith("--cache="):
+            options["cache_dir"] = arg.split("=", 1)[1]
+        elif (arg == "--no-golden"):
+            options["doGolden"] = False
+        elif (arg == "--estimate"):
+            options["doEstimate"] = True
+        elif (arg == "--strategy-report"):
+            options["doStrategyReport"] = True
+        elif (arg == "--profile"):
+            options["doProfile"] = True
+        elif arg.startswith("--profile="):
+            options["doProfile"] = True
+            options["profile_file"] = arg.split("=", 1)[1]
+        elif arg.startswith("--output-dir="):
+            options["output_dir"] = arg.split("=", 1)[1]
+        elif arg.startswith("--seed="):
+            options["seed"] = int(arg.split("=", 1)[1])
+        elif arg.startswith("--inputs="):
+            options["nb_inputs"] = int(arg.split("=", 1)[1])
+        elif (arg == "--dram-reuse"):
+            options["doDramReuse"] = True
+        elif (arg == "--memory-map"):
+            options["doMemoryMap"] = True
+        else:
+            other_args.append(arg)
+    return other_args, options
+
+
+###############################################
+
+
+# MAIN FUNCTION
+# -------------
+def main(operations_dict, vta_config_dict, nb_workers=1, cache_dir=None, doGolden=True, doEstimate=False,
+         doStrategyReport=False, doProfile=False, profile_file=None, output_dir=None, seed=None, nb_inputs=1,
+         doMemoryMap=False, debug=True):
+    # GET CONFIGURATION
+    hw_config = hardware_configuration(vta_config_dict)
+
+    # Seed of the random matrices (overrides the "SEED" of the operations)
+    if (seed is not None):
+        operations_dict["SEED"] = seed
+
+    # Others configuration
+    random_bound = 4
+    profile = PF.profile_definition() if (doProfile) else None
+
+
+    # Setup the output folder (default: standalone-vta/compiler_output/)
+    output_dir = compiler_output_setup(output_dir=output_dir)
+
+
+    # ---------------------------------------------
+    # COMPILE THE OPERATIONS AND WRITE THE BINARIES
+    compiled = compile_program(operations_dict, vta_config_dict, output_dir=output_dir, random_bound=random_bound,
+                               nb_workers=nb_workers, cache_dir=cache_dir, doGolden=doGolden, profile=profile, debug=debug)
+    layer = compiled["layer"]
+
+    # Binary DRAM map (the CSV map is written with the binaries)
+    if (doMemoryMap):
+        DA.write_memory_map(layer["base_addresses_list"], filepath_definition(output_dir, 'memory_map'+layer["name"]+'.bin'))
+
+
+    # ---------------------------------------------
+    # INPUT SLOTS (the program is executed on each slot, see input_slots)
+
+    if (nb_inputs > 1):
+        dram_offset = int(operations_dict.get("DRAM_OFFSET", "0x0000"), base=16)
+        input_slots, _ = IS.slots_allocation(layer, layer, nb_inputs, hw_config, layer["current_dram_addr"],
+                                             dram_offset=dram_offset, debug=debug)
+        IS.write_input_slots(input_slots, IS.patch_table(layer["insn_buffer"], input_slots, hw_config),
+                             output_dir, name=layer["name"])
+
+
+    # ---------------------------------------------
+    # PERFORMANCE ESTIMATION
+
+    if (doEstimate):
+        import vta_compiler.performance_model.performance_model as PM
+        report = PM.performance_estimation(layer["insn_buffer"], layer["uop_buffer"], vta_config_dict)
+        with open(filepath_definition(output_dir, 'performance'+layer["name"]+'.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+        if (debug):
+            PM.print_report(report, layer["name"])
+
+
+    # ---------------------------------------------
+    # STRATEGY REPORT
+
+    if (doStrategyReport):
+        import vta_compiler.matrix_partitioning.strategy_report as SR
+        reports = strategy_comparison(operations_dict, hw_config, random_bound=random_bound)
+        with open(filepath_definition(output_dir, 'strategy_report'+layer["name"]+'.json'), 'w') as f:
+            json.dump(reports, f, indent=2)
+        if (debug):
+            SR.print_strategy_comparison(reports, selected=operations_dict.get("STRATEGY", 1), name=layer["name"])
             
 
+    # ---------------------------------------------
+    # PROFILE
+
+    if (doProfile):
+        PF.count(profile, "nb_insn", len(layer["insn_buffer"]))
+        PF.count(profile, "nb_uop", len(layer["uop_buffer"]))
+        PF.count(profile, "nb_steps", len(layer["strategy"]))
+        PF.print_profile(profile, layer["name"])
+        if (profile_file is not None):
+            with open(profile_file, 'w') as f:
+                json.dump(profile, f, indent=2)
+
+
     # ---------------------------------------------
     # DEBUG
 
@@ -223,18 +733,29 @@ def main(operations_dict, vta_config_dict, debug=True):
 ###############################################
 
 
-# EXECUTE MAIN FUNCTION
-# ---------------------
-if __name__ == "__main__": 
+# COMMAND LINE INTERFACE
+# ----------------------
+def cli():
     """
     To execute: 
         > python main_vta_compiler.py <path_operations>.json <vta_config>.json
     
     1st argument define the operation to perform.
     2nd argument define the hardware configuration.
+    The options --jobs=N, --cache[=<dir>], --no-golden, --estimate, --strategy-report, --profile[=<file>.json],
+    --output-dir=<dir>, --seed=N, --inputs=N and --memory-map are described in compiler_options
+    (--dram-reuse only applies to a network, see main_network_compiler.py).
     """
     debug = True
 
+    # Get the options (default: sequential compilation without cache)
+    sys.argv, options = compiler_options(sys.argv)
+
+    # The regions of a single layer are all live at the same time
+    if (options.pop("doDramReuse")):
+        print("ERROR: --dram-reuse only applies to a network (see main_network_compiler.py)!")
+        sys.exit(1)
+
     # If there is no argument, take "config/template.json" and "config/vta_config.json"
     if len(sys.argv) == 1:
         print("WARNING: No argument given, the execution takes default values!\n\n")
@@ -255,7 +776,7 @@ if __name__ == "__main__":
         vta_config_file = sys.argv[2]
         debug = False if (sys.argv[3] == "False") else True
     else: # Through an error
-        print("python main_vta_compiler.py <path_operations>.json <vta_config>.json")
+        print("python main_vta_compiler.py <path_operations>.json <vta_config>.json [False] [--jobs=N] [--cache[=<dir>]] [--no-golden] [--estimate] [--strategy-report] [--profile[=<file>.json]] [--output-dir=<dir>] [--seed=N] [--inputs=N] [--memory-map]")
         sys.exit(1)
 
     # Parse the JSON files
@@ -263,4 +784,11 @@ if __name__ == "__main__":
     vta_config_dict = parse_json_to_dict(vta_config_file)
 
     # Execute the main function
-    main(operations_dict, vta_config_dict, debug=debug)
+    return main(operations_dict, vta_config_dict, debug=debug, **options)
+
+# ---------------------------------------------
+
+# EXECUTE MAIN FUNCTION
+# ---------------------
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -2,7 +2,7 @@
 # ---------------
 import numpy as np
 
-from matrix_partitioning.utils_strategies import *
+from vta_compiler.matrix_partitioning.utils_strategies import *
 
 
 ###############################################
@@ -418,3 +418,65 @@ def strategy_4(nb_A=1, A_blocks_col=1, nb_B=1, B_blocks_col=1, nb_X=1, X_blocks_
     # Return the strategy
     return strategy
 
+
+# ---------------------------------------------
+
+def fused_alu_strategy(nb_A=1, A_blocks_col=1, nb_B=1, B_blocks_col=1, nb_X=1, X_blocks_col=1,
+                       inp_block_buffer_size=4, wgt_block_buffer_size=32, acc_block_buffer_size=4, out_block_buffer_size=4,
+                       alu_operations=[], idx_to_store=[]):
+    """
+    Fused strategy computes C column-by-column on tiles of consecutive rows of blocks that contain whole groups of
+    vector-vector ALU operations (e.g., the windows of a pooling), thus the ALU operations are performed while the
+    tile is still in the ACC buffer. Two tiles may share a row of blocks, each vector is stored by the tile of its group.
+    At each step, it loads a tile_k-wide A tile and a column of tile_k B blocks.
+    """
+    # Define the buffer sizes
+    buffer_size = min(acc_block_buffer_size, out_block_buffer_size, inp_block_buffer_size)
+
+    # Pack the groups of rows in tiles [(first row of blocks, last row of blocks, rows)]
+    tiles = []
+    for first_row, last_row, rows in alu_vector_groups(alu_operations, X_blocks_col):
+        if (last_row - first_row + 1 > buffer_size):
+            raise Exception(f"ERROR: The ALU operations use {last_row - first_row + 1} rows of blocks while the buffers can hold {buffer_size}! \n\n")
+        if (tiles and max(tiles[-1][1], last_row) - tiles[-1][0] + 1 <= buffer_size):
+            tiles[-1] = (tiles[-1][0], max(tiles[-1][1], last_row), tiles[-1][2] | rows)
+        else:
+            tiles.append((first_row, last_row, rows))
+
+    # Init strategy
+    strategy = [] # [([Ai], [Bi], [Xi], [Mi], [Ti], [Ci], [Operations])]
+
+    # Iterate over the tiles and the columns of C
+    for first_row, last_row, rows in tiles:
+        tile_rows = range(first_row, last_row + 1)
+        tile_k = max(1, min(A_blocks_col, inp_block_buffer_size // len(tile_rows), wgt_block_buffer_size))
+
+        for j in range(0, X_blocks_col):
+            memory_status = [i * X_blocks_col + j for i in tile_rows]
+            vectors = {(i * X_blocks_col + j, row) for i, row in rows}
+
+            for k in range(0, A_blocks_col, tile_k):
+                # Load tile_k columns of A and the related B blocks
+                load_A = [i * A_blocks_col + kk for i in tile_rows for kk in range(k, min(k + tile_k, A_blocks_col))]
+                load_B = [kk * B_blocks_col + j for kk in range(k, min(k + tile_k, A_blocks_col))]
+
+                # Load X only the first time, then accumulate
+                load_X = memory_status if (k == 0) else []
+
+                # Get the operations
+                ops = get_gemm_operations(load_A, load_B, A_blocks_col, B_blocks_col, X_blocks_col)
+
+                # On the last iteration, perform the ALU operations of the tile's groups and store their vectors
+                if (k + tile_k >= A_blocks_col):
+                    ops = ops + alu_on_blocks(alu_operations, memory_status, vectors)
+                    store_C = [vector for vector in idx_to_store if (vector in vectors)]
+                    dram_state = idx_to_store
+                else:
+                    store_C = []
+                    dram_state = []
+
+                # Append the strategy [([Ai], [Bi], [Xi], [Mi], [Ti], [Ci], [Operations])]
+                strategy.append( (load_A, load_B, load_X, memory_status, dram_state, store_C, ops) )
+
+    # Return the strategy
+    return strategy
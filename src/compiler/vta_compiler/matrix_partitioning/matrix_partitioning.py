@@ -2,11 +2,12 @@
 # ---------------
 import numpy as np
 
-import matrix_partitioning.gemm_strategies as GS
-import matrix_partitioning.alu_strategies as AS
-import matrix_partitioning.two_matrices_strategies as TS
+import vta_compiler.matrix_partitioning.gemm_strategies as GS
+import vta_compiler.matrix_partitioning.alu_strategies as AS
+import vta_compiler.matrix_partitioning.two_matrices_strategies as TS
+import vta_compiler.parallel_compilation.parallel_compilation as PC
 
-from matrix_partitioning.utils_strategies import *
+from vta_compiler.matrix_partitioning.utils_strategies import *
 
 
 ###############################################
@@ -19,7 +20,7 @@ def matrix_partitioning(nb_A=1, A_blocks_col=1, nb_B=1, B_blocks_col=1, nb_X=1,
                         alu_operations=[], idx_to_store=[],
                         flag_dict={},
                         strategy_selector=1, block_size=16,
-                        debug=True):
+                        nb_workers=1, debug=True):
     """
     The function checks if any matrix (A, B, X, C) is overfitting.
     If yes, it applies the selected strategy. Else, the computation is perform without partitioning.
@@ -34,6 +35,7 @@ def matrix_partitioning(nb_A=1, A_blocks_col=1, nb_B=1, B_blocks_col=1, nb_X=1,
         - flag_dict (dict): a dictionary of flags
         - strategy_selector (int): an integer in [1..4] to select a strategy on GeMM
         - block_size (int): an integer coming from the VTA configuration
+        - nb_workers (int): the number of worker processes applying the ALU operations on the C tiles (1: sequential)
         - debug (boolean): a boolean to print the execution information
     Outputs:
         - strategy (list of tuple): each tuple represents a computation step. 
@@ -50,7 +52,8 @@ def matrix_partitioning(nb_A=1, A_blocks_col=1, nb_B=1, B_blocks_col=1, nb_X=1,
     
      Remarks: the supported cases are:
         - CASE 1: Matrix multiplication (GeMM) without overfitting followed by ALU operations (either vector-scalar or vector-vector)
-        - CASE 2: Matrix multiplication (GeMM) with overfitting followed by vector-scalar operations
+        - CASE 2: Matrix multiplication (GeMM) with overfitting followed by vector-scalar operations,
+                  or by vector-vector operations fused on tiles of C (see gemm_strategies.fused_alu_strategy)
         - CASE 3: TWO MATRICES OPERATIONS
         - CASE 4: ALU operations
     """
@@ -125,14 +128,18 @@ def matrix_partitioning(nb_A=1, A_blocks_col=1, nb_B=1, B_blocks_col=1, nb_X=1,
             isOverfitting = False
 
             # Check if the operations in alu_operations are only vector-scalar
-            for alu_ops in alu_operations:
-                if (alu_ops[0] != "RELU" and not alu_ops[0].endswith("_IMM")):
-                    raise Exception(f"ERROR: {alu_ops[0]} is not supported when there is an overfitting GeMM operations!\n\n")
+            doVectorAlu = any(alu_ops[0] != "RELU" and not alu_ops[0].endswith("_IMM") for alu_ops in alu_operations)
+            if (doVectorAlu and doMulConstant):
+                raise Exception(f"ERROR: Vector-vector ALU operations are not supported when there is an overfitting multiplication with a constant!\n\n")
+
+            # In parallel, the ALU operations are applied on the C tiles once the strategy is defined
+            doParallelAlu = (nb_workers > 1 and len(alu_operations) > 0 and not doVectorAlu)
+            tile_alu_operations = [] if (doParallelAlu) else alu_operations
 
             # Check if it is a Multiplication with a constant
             if (doMulConstant == True):
                 # Apply the strategy
-                strategy = GS.mul_constant_strategy(nb_A, inp_block_buffer_size, acc_block_buffer_size, out_block_buffer_size, alu_operations)
+                strategy = GS.mul_constant_strategy(nb_A, inp_block_buffer_size, acc_block_buffer_size, out_block_buffer_size, tile_alu_operations)
 
             # Else perform the gemm strategy
             else:
@@ -146,11 +153,13 @@ def matrix_partitioning(nb_A=1, A_blocks_col=1, nb_B=1, B_blocks_col=1, nb_X=1,
                     'wgt_block_buffer_size': wgt_block_buffer_size,
                     'acc_block_buffer_size': acc_block_buffer_size,
                     'out_block_buffer_size': out_block_buffer_size,
-                    'alu_operations': alu_operations
+                    'alu_operations': tile_alu_operations
                 }
                 
                 # Apply the strategy:
-                if (strategy_selector == 1):
+                if (doVectorAlu): # The vector-vector operations (e.g., pooling) are fused on tiles containing their vectors
+                    strategy = GS.fused_alu_strategy(**params, idx_to_store=idx_to_store)
+                elif (strategy_selector == 1):
                     strategy = GS.strategy_1(**params)
                 elif (strategy_selector == 2):
                     strategy = GS.strategy_2(**params)
@@ -160,6 +169,10 @@ def matrix_partitioning(nb_A=1, A_blocks_col=1, nb_B=1, B_blocks_col=1, nb_X=1,
                     strategy = GS.strategy_4(**params)
                 else:
                     raise Exception(f"ERROR: Matrix partitioning strategy {strategy_selector} does not exist!\n\n")
+
+            # Apply the ALU operations on the stored C tiles (in worker processes)
+            if (doParallelAlu):
+                strategy = PC.parallel_alu_on_blocks(strategy, alu_operations, nb_workers)
     
     # CASE 3: TWO MATRICES OPERATIONS
     elif (doAddMatrix == True):
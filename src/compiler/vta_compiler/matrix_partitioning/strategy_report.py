@@ -0,0 +1,167 @@
+# IMPORT PACKAGES
+# ---------------
+import numpy as np
+
+
+###############################################
+
+
+# Buffers read and written by the steps
+READ_BUFFERS = ("INP", "WGT", "ACC", "UOP")
+WRITE_BUFFERS = ("OUT",)
+
+
+# NUMBER OF VECTORS
+# -----------------
+def nb_vectors(elements, block_size):
+    """
+    Count the vectors of a list of elements (int: a block of block_size vectors, tuple: a single vector).
+    """
+    return sum(1 if isinstance(element, tuple) else block_size for element in elements)
+
+# ---------------------------------------------
+
+# NUMBER OF UOPS
+# --------------
+def nb_uops(ops):
+    """
+    Count the UOPs of the operations of a step (as generated by operations_definition.step_instructions).
+    Outputs:
+        - nb_uop (int): The number of UOPs
+        - nb_gemm (int): The number of block products
+        - nb_alu (int): The number of ALU operations on a vector (without ADD_ACC)
+    """
+    nb_uop = 0
+    nb_gemm = 0
+    nb_alu = 0
+    for op in ops:
+        if (op[0] == "GeMM"):
+            nb_uop += 1
+            nb_gemm += 1
+        elif (op[0] == "ADD_ACC"):
+            nb_uop += 1
+        elif (op[0].endswith("_IMM") or op[0] == "RELU"):
+            nb_uop += len(op[2])
+            nb_alu += len(op[2])
+        else: # Vector-vector: (dst_vector, [src_vectors])
+            nb_op = sum(max(1, len(src_vectors)) for _, src_vectors in op[2])
+            nb_uop += nb_op
+            nb_alu += nb_op
+    return nb_uop, nb_gemm, nb_alu
+
+# ---------------------------------------------
+
+# STRATEGY REPORT
+# ---------------
+def strategy_report(strategy, hw_config, flag_dict):
+    """
+    Quantify a strategy: for each step, the DRAM bytes read (INP, WGT, ACC, UOP) and written (OUT),
+    the occupancy of the SRAM buffers and the arithmetic intensity (MACs per DRAM byte).
+    Inputs:
+        - strategy (list): The strategy [([Ai], [Bi], [Xi], [Mi], [Ti], [Ci], [Operations])] (see matrix_partitioning)
+        - hw_config (dict): The hardware configuration (data types, block size and buffer sizes)
+        - flag_dict (dict): The flags of the operations (see data_definition)
+    Outputs:
+        - report (dict): The steps, the totals, the peak occupancy and the capacity of each buffer
+    """
+    block_size = hw_config["block_size"]
+    # An INP or ACC element holds batch vectors
+    batch = hw_config["batch"]
+    block_elements = hw_config["block_elements"]
+    inp_bytes = np.dtype(hw_config["inp_dtype"]).itemsize
+    wgt_bytes = np.dtype(hw_config["wgt_dtype"]).itemsize
+    acc_bytes = np.dtype(hw_config["acc_dtype"]).itemsize
+    # The ACC_BIS blocks are loaded with the ACC blocks (two matrices operations)
+    nb_acc_matrices = 2 if (flag_dict.get("doAddMatrix", False)) else 1
+
+    # Capacity (vectors for INP and ACC, blocks for WGT)
+    capacity = {
+        "INP": hw_config["inp_buffer_size"],
+        "WGT": hw_config["wgt_buffer_size"],
+        "ACC": hw_config["acc_buffer_size"],
+        "UOP": hw_config["uop_buffer_size"]
+    }
+
+    steps = []
+    resident_A = []
+    resident_B = []
+    for i, (load_A, load_B, load_X, memory_status, _, store_C, ops) in enumerate(strategy):
+        # The INP and WGT buffers keep their blocks until the next load
+        resident_A = load_A if (len(load_A) > 0) else resident_A
+        resident_B = load_B if (len(load_B) > 0) else resident_B
+        nb_uop, nb_gemm, nb_alu = nb_uops(ops)
+
+        read_bytes = {
+            "INP": nb_vectors(load_A, block_elements) * batch * block_size * inp_bytes,
+            "WGT": len(load_B) * block_size * block_size * wgt_bytes,
+            "ACC": nb_acc_matrices * nb_vectors(load_X, block_elements) * batch * block_size * acc_bytes,
+            "UOP": 4 * nb_uop
+        }
+        write_bytes = {"OUT": nb_vectors(store_C, block_elements) * batch * block_size * inp_bytes}
+        occupancy = {
+            "INP": nb_vectors(resident_A, block_elements),
+            "WGT": len(resident_B),
+            "ACC": nb_acc_matrices * nb_vectors(memory_status, block_elements),
+            "UOP": nb_uop
+        }
+        macs = nb_gemm * block_size**3
+        total_bytes = sum(read_bytes.values()) + sum(write_bytes.values())
+
+        steps.append({
+            "step": i,
+            "read_bytes": read_bytes,
+            "write_bytes": write_bytes,
+            "occupancy": occupancy,
+            "macs": macs,
+            "alu_ops": nb_alu,
+            "intensity": macs / total_bytes if (total_bytes > 0) else 0.0
+        })
+
+    # Totals
+    total = {
+        "read_bytes": {buffer: sum(step["read_bytes"][buffer] for step in steps) for buffer in READ_BUFFERS},
+        "write_bytes": {buffer: sum(step["write_bytes"][buffer] for step in steps) for buffer in WRITE_BUFFERS},
+        "macs": sum(step["macs"] for step in steps),
+        "alu_ops": sum(step["alu_ops"] for step in steps)
+    }
+    total["bytes"] = sum(total["read_bytes"].values()) + sum(total["write_bytes"].values())
+    total["intensity"] = total["macs"] / total["bytes"] if (total["bytes"] > 0) else 0.0
+    peak = {buffer: max([step["occupancy"][buffer] for step in steps], default=0) for buffer in capacity}
+
+    report = {
+        "nb_steps": len(steps),
+        "total": total,
+        "peak_occupancy": peak,
+        "capacity": capacity,
+        "steps": steps
+    }
+    return report
+
+# ---------------------------------------------
+
+# PRINT STRATEGY COMPARISON
+# -------------------------
+def print_strategy_comparison(reports, selected=None, name=''):
+    """
+    Print the totals of several strategies side by side.
+    Inputs:
+        - reports (dict): The report of each strategy (see strategy_report)
+        - selected: The strategy used by the compiler (marked with *)
+    """
+    names = list(reports.keys())
+    rows = [("Steps", lambda r: f"{r['nb_steps']}")]
+    rows += [(f"{buffer} read (B)", lambda r, b=buffer: f"{r['total']['read_bytes'][b]}") for buffer in READ_BUFFERS]
+    rows += [(f"{buffer} written (B)", lambda r, b=buffer: f"{r['total']['write_bytes'][b]}") for buffer in WRITE_BUFFERS]
+    rows += [("DRAM total (B)", lambda r: f"{r['total']['bytes']}"),
+             ("MACs", lambda r: f"{r['total']['macs']}"),
+             ("ALU vector ops", lambda r: f"{r['total']['alu_ops']}"),
+             ("MACs / byte", lambda r: f"{r['total']['intensity']:.2f}")]
+    rows += [(f"Peak {buffer}", lambda r, b=buffer: f"{r['peak_occupancy'][b]}/{r['capacity'][b]}") for buffer in READ_BUFFERS]
+
+    header = [f"Strategy {name}" + ("*" if (name == selected) else "") for name in names]
+    width = max([len(label) for label, _ in rows] + [0])
+    col_width = max([len(h) for h in header] + [len(fmt(reports[name])) for _, fmt in rows for name in names]) + 2
+    print(f"\nSTRATEGY COMPARISON{name}:")
+    print(" " * width + "".join(h.rjust(col_width) for h in header))
+    for label, fmt in rows:
+        print(label.ljust(width) + "".join(fmt(reports[name]).rjust(col_width) for name in names))
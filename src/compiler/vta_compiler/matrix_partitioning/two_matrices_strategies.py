@@ -2,7 +2,7 @@
 # ---------------
 import numpy as np
 
-from matrix_partitioning.utils_strategies import *
+from vta_compiler.matrix_partitioning.utils_strategies import *
 
 
 ###############################################
@@ -182,3 +182,68 @@ def sort_alu_by_dst(alu_operations=[]):
         key=lambda op: op[2][0][0] if isinstance(op[2][0][0], tuple) else op[2][0]
     )
     return sorted_list
+
+# ---------------------------------------------
+
+def alu_on_blocks(alu_operations, blocks, vectors=None):
+    """
+    Get the ALU operations to execute on the given blocks:
+        - the vector-scalar operations on all the vectors of the blocks,
+        - the vector-vector operations whose DST vector is in vectors (or in the blocks if vectors is None).
+    The SRC vectors of the vector-vector operations must be in the blocks.
+    """
+    # Init
+    to_execute = []
+    blocks_set = set(blocks)
+
+    # Iterate on the operations
+    for alu_ops in alu_operations:
+        if (alu_ops[0].endswith("_IMM") or alu_ops[0] == "RELU"):
+            tuple_list = [vector for vector in alu_ops[2] if (vector[0] in blocks_set)]
+        else:
+            tuple_list = [(dst_vector, src_vectors) for dst_vector, src_vectors in alu_ops[2]
+                          if ((dst_vector in vectors) if (vectors is not None) else (dst_vector[0] in blocks_set))]
+            for dst_vector, src_vectors in tuple_list:
+                if any(not (vector[0] in blocks_set) for vector in src_vectors):
+                    raise Exception(f"ERROR: The SRC vectors of {alu_ops[0]} on {dst_vector} are not in the computed blocks! \n\n")
+
+        # Append the list with the current operation
+        if (len(tuple_list) > 0):
+            to_execute.append([alu_ops[0], alu_ops[1], tuple_list])
+
+    return to_execute
+
+# ---------------------------------------------
+
+def alu_vector_groups(alu_operations, X_blocks_col):
+    """
+    Group the rows of C linked by the vector-vector ALU operations (e.g., the rows of a pooling window).
+    A row is identified by (row of blocks, row within the block), it is the same on each column of blocks.
+    Output:
+        - groups (list): The (first row of blocks, last row of blocks, rows) of each group, sorted by first row of blocks
+    """
+    # Union-find over the rows
+    parent = {}
+    def find(row):
+        parent.setdefault(row, row)
+        while (parent[row] != row):
+            parent[row] = parent[parent[row]]
+            row = parent[row]
+        return row
+
+    for alu_ops in alu_operations:
+        if (alu_ops[0].endswith("_IMM") or alu_ops[0] == "RELU"):
+            continue
+        for dst_vector, src_vectors in alu_ops[2]:
+            dst_root = find((dst_vector[0] // X_blocks_col, dst_vector[1]))
+            for vector in src_vectors:
+                src_root = find((vector[0] // X_blocks_col, vector[1]))
+                if (src_root != dst_root):
+                    parent[src_root] = dst_root
+
+    # Gather the rows of each group
+    groups = {}
+    for row in parent:
+        groups.setdefault(find(row), []).append(row)
+    groups = [(min(rows)[0], max(rows)[0], set(rows)) for rows in groups.values()]
+    return sorted(groups, key=lambda group: (group[0], group[1]))
@@ -3,9 +3,9 @@
 import os
 import sys
 
-# Parent folder
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from structures_insn_uop import *
+# vta_compiler package (src/compiler/)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from vta_compiler.operations_definition.structures_insn_uop import *
 
 # -----------------------------------------------------------
 
@@ -3,12 +3,12 @@
 import os
 import sys
 
-# Parent folder
+# vta_compiler package (src/compiler/)
 current_dir = os.path.dirname(os.path.abspath(__file__))
-source_dir = os.path.join(current_dir, '../../')
+source_dir = os.path.join(current_dir, '../../../../')
 sys.path.insert(0, source_dir)
 
-from structures_insn_uop import *
+from vta_compiler.operations_definition.structures_insn_uop import *
 
 # -----------------------------------------------------------
 
@@ -1,15 +1,9 @@
 # IMPORT PACKAGES
 # ---------------
-try:
-    from structures import *
-    from utils_operations import *
-    from step_instructions import *
-    from instructions_template import *
-except:
-    from operations_definition.structures import *
-    from operations_definition.utils_operations import *
-    from operations_definition.step_instructions import *
-    from operations_definition.instructions_template import *
+from vta_compiler.operations_definition.structures import *
+from vta_compiler.operations_definition.utils_operations import *
+from vta_compiler.operations_definition.step_instructions import *
+from vta_compiler.operations_definition.instructions_template import *
 
 ###############################################
 
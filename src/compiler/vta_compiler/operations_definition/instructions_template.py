@@ -1,9 +1,6 @@
 # IMPORT PACKAGES
 # ---------------
-try:
-    from structures import *
-except:
-    from operations_definition.structures import *
+from vta_compiler.operations_definition.structures import *
 
 ###############################################
 
@@ -80,6 +77,7 @@ def nop_stage_instruction(module="COMPUTE", pop_prev_dep=0, pop_next_dep=0, push
 def load_store_instruction(buffer_type="UOP", pop_prev_dep=0, pop_next_dep=0, push_prev_dep=0, push_next_dep=0,
                            sram_base=0, dram_base=0,
                            y_size=0, x_size=0, x_stride=0,
+                           y_pad_top=0, y_pad_bottom=0, x_pad_left=0, x_pad_right=0,
                            semaphore={}):
     if (len(semaphore) == 0):
         raise Exception(f"ERROR: no semaphore given! \n\n")
@@ -137,10 +135,10 @@ def load_store_instruction(buffer_type="UOP", pop_prev_dep=0, pop_next_dep=0, pu
         y_size=y_size,
         x_size=x_size,
         x_stride=x_stride,
-        y_pad_top=0,
-        y_pad_bottom=0,
-        x_pad_left=0,
-        x_pad_right=0
+        y_pad_top=y_pad_top,
+        y_pad_bottom=y_pad_bottom,
+        x_pad_left=x_pad_left,
+        x_pad_right=x_pad_right
     )
 
     return load_store_insn, semaphore 
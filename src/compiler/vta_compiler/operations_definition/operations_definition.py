@@ -1,11 +1,8 @@
 # IMPORT PACKAGES
 # ---------------
-if __name__ == "__main__": 
-    from structures import *
-    from instructions_generator import *
-else:
-    from operations_definition.structures import *
-    from operations_definition.instructions_generator import *
+from vta_compiler.operations_definition.structures import *
+from vta_compiler.operations_definition.instructions_generator import *
+import vta_compiler.parallel_compilation.parallel_compilation as PC
 
 
 ###############################################
@@ -17,7 +14,7 @@ def operations_definition(strategy=[], dram_addresses=[],
                           operations_dict={}, flag_dict={},
                           block_size=16, uop_buffer_size=8192,
                           A_blocks_col=1, B_blocks_col=1, X_blocks_col=1,
-                          debug=True):
+                          nb_workers=1, debug=True):
     # Init the lists of instructions, UOPs and semaphore
     insn_buffer = []
     uop_buffer = []
@@ -43,6 +40,14 @@ def operations_definition(strategy=[], dram_addresses=[],
     uop_buffer = uop_buffer + new_buffer
 
     # 1 - strategy step 
+    if (nb_workers > 1 and len(strategy) > 1):
+        # The steps are generated in worker processes, then stitched (UOP addresses and semaphore)
+        new_insn, new_buffer, semaphore, uop_counter = \
+            PC.parallel_step_instructions(strategy, semaphore, dram_addresses, uop_counter, block_size, uop_buffer_size, nb_workers)
+        insn_buffer = insn_buffer + new_insn
+        uop_buffer = uop_buffer + new_buffer
+        strategy = []
+
     for i, step in enumerate(strategy):
         memory_status = step[3]
 
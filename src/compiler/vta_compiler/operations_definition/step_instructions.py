@@ -1,13 +1,8 @@
 # IMPORT PACKAGES
 # ---------------
-try:
-    from structures import *
-    from utils_operations import *
-    from instructions_template import *
-except:
-    from operations_definition.structures import *
-    from operations_definition.utils_operations import *
-    from operations_definition.instructions_template import *
+from vta_compiler.operations_definition.structures import *
+from vta_compiler.operations_definition.utils_operations import *
+from vta_compiler.operations_definition.instructions_template import *
 
 
 ###############################################
@@ -48,8 +43,48 @@ def step_load(load_A, load_B, inp_addr, wgt_addr, block_size, semaphore):
     # ---
     # Get the gap between each idx
     idx_gap = check_constant_gap(load_A)
+    # If the blocks are gathered from another region (chained layer) -> segment wise load
+    if (nb_inp > 0 and inp_addr[0].get("blocks_gather") is not None):
+        segments = [(i, segment) for i, block_idx in enumerate(load_A) for segment in inp_addr[0]["blocks_gather"][block_idx]]
+        for j, (i, segment) in enumerate(segments):
+            sram_offset, dram_base, y_size, x_stride, y_pad_top, y_pad_bottom = segment
+            current_sram_base = 0x0000 + i*block_size + sram_offset
+
+            # Acknowledge COMPUTE ready signal (first load)
+            pop_next_dep = ack_signal if (j == 0) else 0 
+            # Ready signal to COMPUTE if no WGT load (last load)
+            push_next_dep = ready_signal if (j == len(segments)-1 and nb_wgt == 0) else 0 
+
+            # INSN LOAD INP - load y_size vectors (x_stride apart) and the zero vectors around them
+            new_insn, semaphore = load_store_instruction(buffer_type="INP", pop_prev_dep=0, pop_next_dep=pop_next_dep, push_prev_dep=0, push_next_dep=push_next_dep, sram_base=current_sram_base, dram_base=dram_base, y_size=y_size, x_size=1, x_stride=x_stride, y_pad_top=y_pad_top, y_pad_bottom=y_pad_bottom, semaphore=semaphore)
+            insn_buffer.append( new_insn )
+    # If blocks are stored without their padding rows -> the padding rows are synthesized by the LOAD (x_pad_right)
+    elif (nb_inp > 0 and inp_addr[0].get("blocks_vectors") is not None and \
+          min(inp_addr[0]["blocks_vectors"][block_idx] for block_idx in load_A) < block_size):
+        blocks_vectors = inp_addr[0]["blocks_vectors"]
+        # The full blocks at the beginning are loaded with a single load instruction if their gap is constant
+        nb_full = 0
+        while (nb_full < nb_inp and blocks_vectors[load_A[nb_full]] == block_size):
+            nb_full += 1
+        full_gap = check_constant_gap(load_A[:nb_full])
+        # LOAD patterns (sram_base, dram_base, y_size, x_stride, nb_vector)
+        loads = []
+        if (full_gap != -1):
+            loads.append((0x0000, find_logical_block_addr_by_idx(load_A[0], inp_addr), nb_full, full_gap * block_size, block_size))
+        for i in range(0 if (full_gap == -1) else nb_full, nb_inp):
+            loads.append((0x0000 + i*block_size, find_logical_block_addr_by_idx(load_A[i], inp_addr), 1, block_size, blocks_vectors[load_A[i]]))
+
+        for j, (current_sram_base, current_block_addr, y_size, x_stride, nb_vector) in enumerate(loads):
+            # Acknowledge COMPUTE ready signal (first load)
+            pop_next_dep = ack_signal if (j == 0) else 0
+            # Ready signal to COMPUTE if no WGT load (last load)
+            push_next_dep = ready_signal if (j == len(loads)-1 and nb_wgt == 0) else 0
+
+            # INSN LOAD INP - load y_size blocks of nb_vector vectors, completed by zero vectors
+            new_insn, semaphore = load_store_instruction(buffer_type="INP", pop_prev_dep=0, pop_next_dep=pop_next_dep, push_prev_dep=0, push_next_dep=push_next_dep, sram_base=current_sram_base, dram_base=current_block_addr, y_size=y_size, x_size=nb_vector, x_stride=x_stride, x_pad_right=block_size-nb_vector, semaphore=semaphore)
+            insn_buffer.append( new_insn )
     # If the gap is not constant -> block wise load
-    if (idx_gap == -1):
+    elif (idx_gap == -1):
         for i, block_idx in enumerate(load_A):
             # Get the idx of the block in DRAM and the location in SRAM
             current_block_addr = find_logical_block_addr_by_idx(block_idx, inp_addr)
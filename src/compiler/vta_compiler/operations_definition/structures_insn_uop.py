@@ -4,20 +4,16 @@ import ctypes
 from ctypes import Structure, c_uint64, LittleEndianStructure
 
 import os
-import sys
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from utils.find_project_root import *
+from vta_compiler.utils.find_project_root import *
 
 # -----------------------------------------------------------
 
 # DEFINE PATH FOR BINARIES
 # ------------------------
-output_dir = compiler_output_setup()
-
-# Define the files to write 
+# Define the files to write (the output directory is only searched when a file is written)
 def compiler_output_filepath(filename = "default.bin"):
-    return os.path.join(output_dir, filename)
+    return os.path.join(compiler_output_setup(), filename)
 
 # -----------------------------------------------------------
 
@@ -1,5 +1,6 @@
 # IMPORT PACKAGES
 # ---------------
+import vta_compiler.dram_allocation.dram_allocation as DA
 
 
 ###############################################
@@ -7,9 +8,7 @@
 # FIND_BLOCK_ADDR_BY_IDX
 # ----------------------
 def find_logical_block_addr_by_idx(block_idx, addr_dict):
-    block_addr_list = addr_dict[0]['blocks_addresses']
-    tuple_addr = next(t for t in block_addr_list if t[0] == block_idx)
-    return int( tuple_addr[2], 16)
+    return DA.block_logical_address(addr_dict[0], block_idx)
 
 # ---------------------------------------------
 
@@ -0,0 +1,181 @@
+# IMPORT PACKAGES
+# ---------------
+from vta_compiler.matrix_partitioning.utils_strategies import imm_alu_on_blocks
+from vta_compiler.operations_definition.structures import VTAMemInsn
+from vta_compiler.operations_definition.instructions_generator import step_instructions
+
+
+###############################################
+
+
+# SPLIT CHUNKS
+# ------------
+def split_chunks(nb_items, nb_chunks):
+    """
+    Split a range of items in contiguous chunks of (almost) the same size.
+    Inputs:
+        - nb_items (int): The number of items
+        - nb_chunks (int): The maximum number of chunks
+    Outputs:
+        - chunks (list): The (begin, end) of each chunk
+    """
+    nb_chunks = max(1, min(nb_chunks, nb_items))
+    quotient, remainder = divmod(nb_items, nb_chunks)
+    chunks = []
+    begin = 0
+    for i in range(0, nb_chunks):
+        end = begin + quotient + (1 if (i < remainder) else 0)
+        chunks.append((begin, end))
+        begin = end
+    return chunks
+
+
+###############################################
+
+
+# WORKER STATE
+# ------------
+# The ALU operations are sent once to each worker (they are shared by all the chunks)
+_worker_alu_operations = []
+
+def init_alu_worker(alu_operations):
+    global _worker_alu_operations
+    _worker_alu_operations = alu_operations
+
+# ---------------------------------------------
+
+def alu_chunk(store_list):
+    return [imm_alu_on_blocks(_worker_alu_operations, store_C) for store_C in store_list]
+
+# ---------------------------------------------
+
+# PARALLEL ALU ON BLOCKS
+# ----------------------
+def parallel_alu_on_blocks(strategy, alu_operations, nb_workers=2, chunks_per_worker=4):
+    """
+    Append the vector-scalar ALU operations to each step storing C blocks (the C tiles are independent).
+    The strategy must have been built without ALU operations, the result is the strategy built with them.
+    Inputs:
+        - strategy (list): The strategy [([Ai], [Bi], [Xi], [Mi], [Ti], [Ci], [Operations])] without ALU operations
+        - alu_operations (list): The vector-scalar ALU operations
+        - nb_workers (int): The number of worker processes
+    Outputs:
+        - strategy (list): The strategy with the ALU operations applied on the stored blocks
+    """
+    if not (alu_operations):
+        return strategy
+
+    # Only the steps storing C blocks receive ALU operations
+    store_steps = [i for i, step in enumerate(strategy) if (len(step[5]) > 0)]
+    chunks = split_chunks(len(store_steps), nb_workers * chunks_per_worker)
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=nb_workers, initializer=init_alu_worker, initargs=(alu_operations,)) as executor:
+        futures = [executor.submit(alu_chunk, [strategy[i][5] for i in store_steps[begin:end]]) for begin, end in chunks]
+        alu_ops = [ops for future in futures for ops in future.result()]
+
+    # Stitch the operations back in the strategy
+    strategy = list(strategy)
+    for i, ops in zip(store_steps, alu_ops):
+        step = strategy[i]
+        strategy[i] = (step[0], step[1], step[2], step[3], step[4], step[5], step[6] + ops)
+
+    return strategy
+
+
+###############################################
+
+
+# STEPS CHUNK
+# -----------
+def steps_chunk(steps, semaphore, dram_addresses, block_size, uop_buffer_size):
+    """
+    Generate the instructions of consecutive steps, starting from the given semaphore and from the UOP 0.
+    Outputs:
+        - chunk (list): For each step, the (instructions, UOPs, semaphore at the end of the step)
+    """
+    chunk = []
+    semaphore = dict(semaphore)
+    uop_counter = 0
+    for step in steps:
+        new_insn, new_uop, semaphore, uop_counter = step_instructions(step, semaphore, dram_addresses, uop_counter, block_size, uop_buffer_size)
+        chunk.append((new_insn, new_uop, dict(semaphore)))
+    return chunk
+
+# ---------------------------------------------
+
+# UOP OFFSET
+# ----------
+def uop_offset(insn_buffer, offset):
+    """
+    Shift the DRAM address of the UOP LOADs (the chunks are generated as if their first UOP was the UOP 0).
+    """
+    if (offset == 0):
+        return
+    for insn in insn_buffer:
+        if (isinstance(insn, VTAMemInsn) and insn.opcode == 0 and insn.buffer_id == 0):
+            insn.dram_base = insn.dram_base + offset
+
+# ---------------------------------------------
+
+# PARALLEL STEP INSTRUCTIONS
+# --------------------------
+def parallel_step_instructions(strategy, semaphore, dram_addresses, uop_counter=0, block_size=16, uop_buffer_size=8192,
+                               nb_workers=2, chunks_per_worker=4):
+    """
+    Generate the instructions and UOPs of the strategy steps in worker processes.
+    A step only depends on the semaphore at its beginning and on the number of UOPs generated before it.
+    The first step is generated here and its final semaphore (the steady state) is assumed at the beginning of each chunk.
+    Then, the chunks are stitched back in order: the UOP LOADs are shifted by the number of previous UOPs,
+    and a chunk whose assumed semaphore differs from the actual one is generated again.
+    Inputs:
+        - strategy (list): The strategy [([Ai], [Bi], [Xi], [Mi], [Ti], [Ci], [Operations])]
+        - semaphore (dict): The semaphore at the beginning of the first step
+        - uop_counter (int): The number of UOPs generated before the first step
+        - nb_workers (int): The number of worker processes
+    Outputs:
+        - insn_buffer (list): The instructions of all the steps
+        - uop_buffer (list): The UOPs of all the steps
+        - semaphore (dict): The semaphore at the end of the last step
+        - uop_counter (int): The number of UOPs generated at the end of the last step
+    """
+    insn_buffer = []
+    uop_buffer = []
+    if not (strategy):
+        return insn_buffer, uop_buffer, semaphore, uop_counter
+
+    # First step (gives the steady state of the semaphore)
+    new_insn, new_uop, semaphore, uop_counter = step_instructions(strategy[0], semaphore, dram_addresses, uop_counter, block_size, uop_buffer_size)
+    insn_buffer.extend(new_insn)
+    uop_buffer.extend(new_uop)
+
+    # Other steps
+    steps = strategy[1:]
+    if not (steps):
+        return insn_buffer, uop_buffer, semaphore, uop_counter
+    assumed_semaphore = dict(semaphore)
+    chunks = split_chunks(len(steps), nb_workers * chunks_per_worker)
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=nb_workers) as executor:
+        futures = [executor.submit(steps_chunk, steps[begin:end], assumed_semaphore, dram_addresses, block_size, uop_buffer_size)
+                   for begin, end in chunks]
+
+        for (begin, end), future in zip(chunks, futures):
+            chunk = future.result()
+
+            # The chunk did not start from the actual semaphore: generate it again
+            if (semaphore != assumed_semaphore):
+                chunk = steps_chunk(steps[begin:end], semaphore, dram_addresses, block_size, uop_buffer_size)
+
+            # Stitch the chunk (its UOPs follow the UOPs already generated)
+            chunk_uop = 0
+            for new_insn, new_uop, _ in chunk:
+                uop_offset(new_insn, uop_counter)
+                insn_buffer.extend(new_insn)
+                uop_buffer.extend(new_uop)
+                chunk_uop += len(new_uop)
+            semaphore = dict(chunk[-1][2])
+            uop_counter += chunk_uop
+
+    return insn_buffer, uop_buffer, semaphore, uop_counter
@@ -0,0 +1,242 @@
+# IMPORT PACKAGES
+# ---------------
+import math
+
+from vta_compiler.simulator.simulator import insn_decode, insn_module, MODULES, DEPENDENCY_QUEUES, BUFFER_NAME, \
+                                OPCODE_LOAD, OPCODE_STORE, OPCODE_GEMM, OPCODE_ALU
+
+
+###############################################
+
+
+# Default costs (cycles), the DRAM bus width is in bits
+DEFAULT_COSTS = {
+    "LOG_BUS_WIDTH": 6,     # 64-bit AXI bus
+    "DRAM_LATENCY": 32,     # Latency of each DRAM burst (one burst per row of a LOAD or a STORE)
+    "INSN_OVERHEAD": 2,     # Fetch and decode of an instruction
+    "GEMM_DEPTH": 4,        # GEMM pipeline depth
+    "GEMM_II": 1,           # GEMM initiation interval (one BATCH x BLOCK_IN x BLOCK_OUT product per UOP)
+    "ALU_DEPTH": 4,         # ALU pipeline depth
+    "ALU_II": 2,            # ALU initiation interval (two ACC reads)
+    "ALU_IMM_II": 1         # ALU initiation interval with an immediate (one ACC read)
+}
+
+
+# COST DEFINITION
+# ---------------
+def cost_definition(vta_config_dict, costs=None):
+    """
+    Define the cost of the instructions from the VTA configuration (block size, batch and memory widths).
+    Inputs:
+        - vta_config_dict (dict): The parsed VTA configuration, it can override the DEFAULT_COSTS
+        - costs (dict): The costs overriding the DEFAULT_COSTS and the configuration
+    Outputs:
+        - cost_dict (dict): The costs (cycles) and the size (bytes) of an element of each buffer
+    """
+    cost_dict = dict(DEFAULT_COSTS)
+    cost_dict.update({key: value for key, value in vta_config_dict.items() if key in DEFAULT_COSTS})
+    if (costs is not None):
+        cost_dict.update(costs)
+
+    batch = 2**vta_config_dict.get("LOG_BATCH", 0)
+    block_size = 2**vta_config_dict["LOG_BLOCK"]
+    inp_bytes = 2**vta_config_dict["LOG_INP_WIDTH"] // 8
+    wgt_bytes = 2**vta_config_dict["LOG_WGT_WIDTH"] // 8
+    acc_bytes = 2**vta_config_dict["LOG_ACC_WIDTH"] // 8
+    cost_dict["bus_bytes"] = 2**cost_dict["LOG_BUS_WIDTH"] // 8
+    cost_dict["element_bytes"] = {
+        "UOP": 4,
+        "WGT": block_size * block_size * wgt_bytes,
+        "INP": batch * block_size * inp_bytes,
+        "ACC": batch * block_size * acc_bytes,
+        "OUT": batch * block_size * inp_bytes
+    }
+    return cost_dict
+
+# ---------------------------------------------
+
+# INSTRUCTION COST
+# ----------------
+def insn_cost(insn, cost_dict):
+    """
+    Estimate the cycles of an instruction and the DRAM bytes it transfers.
+        - LOAD/STORE: one burst per row, the bytes at the bus width, and one SRAM write per padding element
+        - GEMM/ALU: the pipeline depth, then one iteration (loop_out x loop_in x UOPs) every initiation interval
+    Outputs:
+        - cycles (int): The cycles of the instruction
+        - dram_bytes (int): The bytes read or written in DRAM
+    """
+    cycles = cost_dict["INSN_OVERHEAD"]
+    dram_bytes = 0
+    if (insn.opcode == OPCODE_LOAD or insn.opcode == OPCODE_STORE):
+        if (insn.x_size > 0):
+            dram_bytes = insn.y_size * insn.x_size * cost_dict["element_bytes"][BUFFER_NAME[insn.buffer_id]]
+            x_total = insn.x_pad_left + insn.x_size + insn.x_pad_right
+            y_total = insn.y_pad_top + insn.y_size + insn.y_pad_bottom
+            nb_pad = x_total * y_total - insn.x_size * insn.y_size
+            cycles += insn.y_size * cost_dict["DRAM_LATENCY"] + math.ceil(dram_bytes / cost_dict["bus_bytes"]) + nb_pad
+    elif (insn.opcode == OPCODE_GEMM or insn.opcode == OPCODE_ALU):
+        nb_iter = insn.loop_out * insn.loop_in * (insn.uop_end - insn.uop_bgn)
+        if (nb_iter > 0):
+            if (insn.opcode == OPCODE_GEMM):
+                cycles += cost_dict["GEMM_DEPTH"] + nb_iter * cost_dict["GEMM_II"]
+            else:
+                ii = cost_dict["ALU_IMM_II"] if (insn.use_imm) else cost_dict["ALU_II"]
+                cycles += cost_dict["ALU_DEPTH"] + nb_iter * ii
+    return cycles, dram_bytes
+
+
+###############################################
+
+
+# PERFORMANCE ESTIMATION
+# ----------------------
+def performance_estimation(insn_buffer, uop_buffer, vta_config_dict, costs=None):
+    """
+    Estimate the execution of a program: the LOAD, COMPUTE and STORE modules execute their queue in order,
+    an instruction starts when its module is free and when the tokens it pops have been pushed.
+    Inputs:
+        - insn_buffer (list): The instructions (structures or raw bytes)
+        - uop_buffer (list): The UOPs of the program
+        - vta_config_dict (dict): The parsed VTA configuration
+        - costs (dict): The costs overriding the DEFAULT_COSTS (see cost_definition)
+    Outputs:
+        - report (dict): The total cycles, the busy cycles and the utilization of each module,
+                         the DRAM bytes of each buffer, and the critical path
+    """
+    cost_dict = cost_definition(vta_config_dict, costs)
+
+    # Dispatch the instructions (index in the program, instruction)
+    queues = {module: [] for module in MODULES}
+    for idx, insn in enumerate(insn_buffer):
+        if isinstance(insn, (bytes, bytearray)):
+            insn = insn_decode(insn)
+        queues[insn_module(insn)].append((idx, insn))
+
+    # Tokens: the (time, instruction) of each push, popped in order
+    tokens = {name: [] for name in ("LD->CMP", "CMP->LD", "CMP->ST", "ST->CMP")}
+    token_heads = {name: 0 for name in tokens}
+    heads = {module: 0 for module in MODULES}
+    module_time = {module: 0 for module in MODULES}
+    busy = {module: 0 for module in MODULES}
+    dram_bytes = {name: 0 for name in BUFFER_NAME.values()}
+    # For each instruction: its module, start, end and the instruction which defined its start (critical path)
+    timeline = {}
+    last = {module: None for module in MODULES}
+
+    nb_done = 0
+    while (nb_done < len(insn_buffer)):
+        isProgress = False
+        for module in MODULES:
+            pop_prev_q, pop_next_q, push_prev_q, push_next_q = DEPENDENCY_QUEUES[module]
+            queue = queues[module]
+            while (heads[module] < len(queue)):
+                idx, insn = queue[heads[module]]
+                popped = [q for q, flag in ((pop_prev_q, insn.pop_prev_dep), (pop_next_q, insn.pop_next_dep)) if (flag and q is not None)]
+                if any(token_heads[q] >= len(tokens[q]) for q in popped):
+                    break
+
+                # Start when the module is free and the tokens are available
+                start = module_time[module]
+                predecessor = last[module]
+                for q in popped:
+                    push_time, push_idx = tokens[q][token_heads[q]]
+                    token_heads[q] += 1
+                    if (push_time > start):
+                        start = push_time
+                        predecessor = push_idx
+                cycles, nb_bytes = insn_cost(insn, cost_dict)
+                end = start + cycles
+
+                # Push the tokens
+                for q, flag in ((push_prev_q, insn.push_prev_dep), (push_next_q, insn.push_next_dep)):
+                    if (flag and q is not None):
+                        tokens[q].append((end, idx))
+
+                if (insn.opcode == OPCODE_LOAD or insn.opcode == OPCODE_STORE):
+                    dram_bytes[BUFFER_NAME[insn.buffer_id]] += nb_bytes
+                timeline[idx] = (module, start, end, predecessor)
+                module_time[module] = end
+                busy[module] += cycles
+                last[module] = idx
+                heads[module] += 1
+                nb_done += 1
+                isProgress = True
+        if not (isProgress):
+            blocked = {module: queues[module][heads[module]][0] for module in MODULES if heads[module] < len(queues[module])}
+            raise Exception(f"ERROR: Deadlock, the modules are blocked at the instructions {blocked}! \n\n")
+
+    total_cycles = max(module_time.values())
+    dram_bytes["INSN"] = 16 * len(insn_buffer)
+    dram_bytes["TOTAL"] = sum(dram_bytes.values())
+
+    report = {
+        "total_cycles": total_cycles,
+        "modules": {module: {"nb_insn": len(queues[module]),
+                             "busy_cycles": busy[module],
+                             "utilization": busy[module] / total_cycles if (total_cycles > 0) else 0.0}
+                    for module in MODULES},
+        "dram_bytes": dram_bytes,
+        "nb_uop": len(uop_buffer),
+        "critical_path": critical_path(timeline),
+        "costs": {key: value for key, value in cost_dict.items() if key in DEFAULT_COSTS}
+    }
+    return report
+
+# ---------------------------------------------
+
+# CRITICAL PATH
+# -------------
+def critical_path(timeline):
+    """
+    Follow the instructions which defined the start of the last instruction, back to the first one.
+    The consecutive instructions of the same module are grouped in segments.
+    Inputs:
+        - timeline (dict): For each instruction, its (module, start, end, predecessor)
+    Outputs:
+        - path (dict): The cycles spent in each module, the number of instructions,
+                       and the segments [module, first instruction, last instruction, cycles] in order
+    """
+    path = {"cycles": {module: 0 for module in MODULES}, "nb_insn": 0, "segments": []}
+    if not (timeline):
+        return path
+
+    # Last instruction to finish
+    idx = max(timeline, key=lambda i: (timeline[i][2], i))
+    instructions = []
+    while (idx is not None):
+        instructions.append(idx)
+        idx = timeline[idx][3]
+    instructions.reverse()
+
+    # Group the instructions in segments
+    segments = []
+    for idx in instructions:
+        module, start, end, _ = timeline[idx]
+        cycles = end - start
+        path["cycles"][module] += cycles
+        if (segments and segments[-1][0] == module):
+            segments[-1][2] = idx
+            segments[-1][3] += cycles
+        else:
+            segments.append([module, idx, idx, cycles])
+    path["nb_insn"] = len(instructions)
+    path["segments"] = segments
+    return path
+
+# ---------------------------------------------
+
+# PRINT REPORT
+# ------------
+def print_report(report, name='', nb_segments=10):
+    """
+    Print the estimation (the nb_segments longest segments of the critical path).
+    """
+    print(f"\nPERFORMANCE ESTIMATION{name}: {report['total_cycles']} cycles, {report['dram_bytes']['TOTAL']} DRAM bytes")
+    for module, stats in report["modules"].items():
+        print(f"\t{module}: {stats['nb_insn']} instructions, {stats['busy_cycles']} busy cycles ({100 * stats['utilization']:.1f}%)")
+    path = report["critical_path"]
+    cycles = ", ".join(f"{module} {value}" for module, value in path["cycles"].items())
+    print(f"\tCritical path: {path['nb_insn']} instructions ({cycles})")
+    for module, first, last, cycles in sorted(path["segments"], key=lambda segment: -segment[3])[:nb_segments]:
+        print(f"\t\t{module} [{first}, {last}]: {cycles} cycles")
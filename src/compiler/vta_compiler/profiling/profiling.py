@@ -0,0 +1,114 @@
+# IMPORT PACKAGES
+# ---------------
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# The peak RSS is not available on Windows
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+###############################################
+
+
+# Stages of the compilation (in order)
+STAGES = ("data_definition", "dram_allocation", "matrix_partitioning", "operations_definition", "binarization")
+
+
+# PROFILE DEFINITION
+# ------------------
+def profile_definition(doMemory=True):
+    """
+    Create an empty profile.
+    Inputs:
+        - doMemory (bool): Trace the Python allocations (tracemalloc slows down the compilation)
+    Outputs:
+        - profile (dict): The measures of each stage and the number of objects
+    """
+    if (doMemory and not tracemalloc.is_tracing()):
+        tracemalloc.start()
+    return {"doMemory": doMemory, "stages": {}, "counts": {}}
+
+# ---------------------------------------------
+
+# PEAK RSS
+# --------
+def peak_rss():
+    """
+    Get the peak resident set size of the process (bytes), None if it is not available.
+    """
+    if (resource is None):
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+# ---------------------------------------------
+
+# STAGE
+# -----
+@contextmanager
+def stage(profile, name):
+    """
+    Measure a stage of the compilation (nothing if profile is None), the measures of a repeated stage are accumulated:
+        - wall_time, cpu_time (s): The elapsed and the CPU time of the process (the workers are not included)
+        - peak_memory (bytes): The peak of the Python allocations during the stage (tracemalloc, None without doMemory)
+        - peak_rss (bytes): The peak resident set size of the process at the end of the stage
+    Inputs:
+        - profile (dict): The profile (see profile_definition)
+        - name (str): The name of the stage
+    """
+    if (profile is None):
+        yield
+        return
+
+    if (profile["doMemory"]):
+        tracemalloc.reset_peak()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield
+    finally:
+        measures = profile["stages"].setdefault(name, {"calls": 0, "wall_time": 0.0, "cpu_time": 0.0,
+                                                       "peak_memory": None, "peak_rss": None})
+        measures["calls"] += 1
+        measures["wall_time"] += time.perf_counter() - wall_start
+        measures["cpu_time"] += time.process_time() - cpu_start
+        if (profile["doMemory"]):
+            measures["peak_memory"] = max(measures["peak_memory"] or 0, tracemalloc.get_traced_memory()[1])
+        measures["peak_rss"] = peak_rss()
+
+# ---------------------------------------------
+
+# COUNT
+# -----
+def count(profile, name, value):
+    """
+    Accumulate a number of objects (e.g., instructions, UOPs, strategy steps) in the profile.
+    """
+    if (profile is not None):
+        profile["counts"][name] = profile["counts"].get(name, 0) + value
+
+# ---------------------------------------------
+
+# PRINT PROFILE
+# -------------
+def print_profile(profile, name=''):
+    """
+    Print the measures of each stage and the number of objects.
+    """
+    stages = sorted(profile["stages"].items(), key=lambda item: STAGES.index(item[0]) if (item[0] in STAGES) else len(STAGES))
+    total_wall = sum(measures["wall_time"] for _, measures in stages)
+    total_cpu = sum(measures["cpu_time"] for _, measures in stages)
+
+    print(f"\nCOMPILER PROFILE{name}: {total_wall*1000:.1f} ms (CPU: {total_cpu*1000:.1f} ms)")
+    for stage_name, measures in stages:
+        share = 100 * measures["wall_time"] / total_wall if (total_wall > 0) else 0.0
+        memory = f"{measures['peak_memory'] / 2**20:.1f} MiB" if (measures["peak_memory"] is not None) else "n/a"
+        rss = f"{measures['peak_rss'] / 2**20:.1f} MiB" if (measures["peak_rss"] is not None) else "n/a"
+        print(f"\t{stage_name}: {measures['wall_time']*1000:.1f} ms ({share:.1f}%), CPU {measures['cpu_time']*1000:.1f} ms, "
+              f"peak memory {memory}, peak RSS {rss}")
+    if (profile["counts"]):
+        print("\t" + ", ".join(f"{key}: {value}" for key, value in profile["counts"].items()))
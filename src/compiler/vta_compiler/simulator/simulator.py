@@ -0,0 +1,443 @@
+# IMPORT PACKAGES
+# ---------------
+import numpy as np
+
+from vta_compiler.operations_definition.structures import VTAUop, VTAMemInsn, VTAGemInsn, VTAAluInsn
+
+
+###############################################
+
+
+# Opcodes and buffers (see operations_definition/instructions_template.py)
+OPCODE_LOAD = 0
+OPCODE_STORE = 1
+OPCODE_GEMM = 2
+OPCODE_FINISH = 3
+OPCODE_ALU = 4
+
+BUFFER_NAME = {0: "UOP", 1: "WGT", 2: "INP", 3: "ACC", 4: "OUT"}
+
+# The three modules (each has its instruction queue)
+MODULES = ("LOAD", "COMPUTE", "STORE")
+
+
+# INSTRUCTION DECODER
+# -------------------
+def insn_decode(raw):
+    """
+    Decode a 128-bit instruction with the structures of the compiler.
+    Inputs:
+        - raw (bytes): The 16 bytes of the instruction (little endian)
+    Outputs:
+        - insn (VTAMemInsn, VTAGemInsn or VTAAluInsn): The decoded instruction
+    """
+    opcode = raw[0] & 0x7
+    if (opcode == OPCODE_GEMM):
+        return VTAGemInsn.from_buffer_copy(raw)
+    elif (opcode == OPCODE_ALU):
+        return VTAAluInsn.from_buffer_copy(raw)
+    elif (opcode in (OPCODE_LOAD, OPCODE_STORE, OPCODE_FINISH)):
+        return VTAMemInsn.from_buffer_copy(raw)
+    else:
+        raise Exception(f"ERROR: Unknown opcode ({opcode}) in {raw.hex()}! \n\n")
+
+# ---------------------------------------------
+
+# INSTRUCTION MODULE
+# ------------------
+def insn_module(insn):
+    """
+    Get the module executing an instruction: the LOAD module only loads INP and WGT,
+    the UOP and ACC loads, the GEMM, the ALU and the FINISH are executed by the COMPUTE module.
+    """
+    if (insn.opcode == OPCODE_LOAD and insn.buffer_id in (1, 2)):
+        return "LOAD"
+    elif (insn.opcode == OPCODE_STORE):
+        return "STORE"
+    else:
+        return "COMPUTE"
+
+# ---------------------------------------------
+
+# UOP DECODER
+# -----------
+def uop_decode(words):
+    """
+    Decode the UOPs (the field widths are given by the VTAUop structure).
+    Inputs:
+        - words (np.array): The UOPs as uint32
+    Outputs:
+        - fields (np.array): The (dst_idx, src_idx, wgt_idx) of each UOP
+    """
+    fields = np.zeros((len(words), len(VTAUop._fields_)), dtype=np.int64)
+    words = words.astype(np.int64)
+    shift = 0
+    for i, (_, _, width) in enumerate(VTAUop._fields_):
+        fields[:, i] = (words >> shift) & ((1 << width) - 1)
+        shift += width
+    return fields
+
+
+###############################################
+
+
+# SRAM DEFINITION
+# ---------------
+def sram_definition(hw_config):
+    """
+    Define the on-chip buffers, each element is batch vectors (INP, ACC, OUT), a block (WGT) or a UOP.
+    Inputs:
+        - hw_config (dict): The hardware configuration (see main_vta_compiler.hardware_configuration)
+    Outputs:
+        - sram (dict): The buffers (np.array)
+    """
+    block_size = hw_config["block_size"]
+    batch = hw_config["batch"]
+    sram = {
+        "INP": np.zeros((hw_config["inp_buffer_size"], batch, block_size), dtype=hw_config["inp_dtype"]),
+        "WGT": np.zeros((hw_config["wgt_buffer_size"], block_size, block_size), dtype=hw_config["wgt_dtype"]),
+        "ACC": np.zeros((hw_config["acc_buffer_size"], batch, block_size), dtype=hw_config["acc_dtype"]),
+        "OUT": np.zeros((hw_config["out_buffer_size"], batch, block_size), dtype=hw_config["inp_dtype"]),
+        "UOP": np.zeros((hw_config["uop_buffer_size"], len(VTAUop._fields_)), dtype=np.int64)
+    }
+    return sram
+
+# ---------------------------------------------
+
+# DRAM DEFINITION
+# ---------------
+def dram_definition(base_address, content, size=None, dram_offset=0x0000):
+    """
+    Define the DRAM accessed by the program.
+    Inputs:
+        - base_address (int): The physical address of the first byte of the DRAM
+        - content (bytes): The initial content of the DRAM
+        - size (int): The size of the DRAM (bytes), at least the size of the content
+        - dram_offset (int): The physical address of the logical address 0
+    Outputs:
+        - dram (dict): The base address, the DRAM offset and the content (np.array of uint8)
+    """
+    size = len(content) if (size is None) else max(size, len(content))
+    data = np.zeros(size, dtype=np.uint8)
+    data[:len(content)] = np.frombuffer(bytes(content), dtype=np.uint8)
+    return {"base_address": base_address, "dram_offset": dram_offset, "data": data}
+
+# ---------------------------------------------
+
+# DRAM VIEW
+# ---------
+def dram_view(dram, dram_base, y_size, x_size, x_stride, element_bytes):
+    """
+    Get the 2D pattern accessed by a LOAD or a STORE as a view of the DRAM content (no copy).
+    Inputs:
+        - dram_base (int): The logical address of the first element (the logical addresses count elements of element_bytes)
+        - y_size, x_size, x_stride (int): y_size rows of x_size elements, x_stride elements apart
+    Outputs:
+        - view (np.array): The (y_size, x_size * element_bytes) bytes of the pattern
+    """
+    start = dram["dram_offset"] + dram_base * element_bytes - dram["base_address"]
+    end = start + ((y_size - 1) * x_stride + x_size) * element_bytes
+    if (start < 0 or end > len(dram["data"])):
+        raise Exception(f"ERROR: DRAM access out of range ([{hex(dram['base_address'] + start)}, {hex(dram['base_address'] + end)}[)! \n\n")
+    data = dram["data"][start:end]
+    if (y_size == 1 or x_stride == x_size): # Contiguous
+        return data.reshape(y_size, x_size * element_bytes)
+    return np.lib.stride_tricks.as_strided(data, shape=(y_size, x_size * element_bytes), strides=(x_stride * element_bytes, 1))
+
+
+###############################################
+
+
+# LOAD
+# ----
+def run_load(insn, sram, dram, profile):
+    """
+    Load a 2D pattern (y_size rows of x_size elements, x_stride elements apart) with its padding.
+    """
+    if (insn.x_size == 0): # NOP
+        return
+    if not (insn.buffer_id in BUFFER_NAME) or (insn.buffer_id == 4):
+        raise Exception(f"ERROR: LOAD non-supported for the buffer {insn.buffer_id}! \n\n")
+    buffer = BUFFER_NAME[insn.buffer_id]
+    memory = sram[buffer]
+    y_size = insn.y_size
+    x_size = insn.x_size
+    sram_base = insn.sram_base
+
+    # UOPs (decoded when loaded)
+    if (buffer == "UOP"):
+        words = dram_view(dram, insn.dram_base, y_size, x_size, insn.x_stride, 4).reshape(-1).view(np.uint32)
+        memory[sram_base:sram_base+len(words)] = uop_decode(words)
+        profile["uop_load_nbytes"] += words.nbytes
+        return
+
+    # DRAM elements
+    element_shape = memory.shape[1:]
+    element_bytes = memory[0].nbytes
+    elements = dram_view(dram, insn.dram_base, y_size, x_size, insn.x_stride, element_bytes)
+    elements = np.ascontiguousarray(elements).view(memory.dtype).reshape((y_size, x_size) + element_shape)
+    profile[buffer.lower()+"_load_nbytes"] += elements.nbytes
+
+    # Padded 2D pattern
+    x_total = insn.x_pad_left + x_size + insn.x_pad_right
+    y_total = insn.y_pad_top + y_size + insn.y_pad_bottom
+    sram_end = sram_base + x_total * y_total
+    if (sram_end > len(memory)):
+        raise Exception(f"ERROR: LOAD out of the {buffer} buffer ({sram_end} > {len(memory)})! \n\n")
+    pattern = memory[sram_base:sram_end].reshape((y_total, x_total) + element_shape)
+    if (x_total != x_size or y_total != y_size):
+        pattern[...] = 0
+    pattern[insn.y_pad_top:insn.y_pad_top+y_size, insn.x_pad_left:insn.x_pad_left+x_size] = elements
+
+    # The OUT buffer holds the truncated ACC
+    if (buffer == "ACC"):
+        sram["OUT"][sram_base:sram_end] = memory[sram_base:sram_end].astype(sram["OUT"].dtype)
+
+# ---------------------------------------------
+
+# STORE
+# -----
+def run_store(insn, sram, dram, profile):
+    """
+    Store a 2D pattern of the OUT buffer (y_size rows of x_size vectors, x_stride vectors apart in DRAM).
+    """
+    if (insn.x_size == 0): # NOP
+        return
+    if (insn.buffer_id != 4):
+        raise Exception(f"ERROR: STORE non-supported for the buffer {insn.buffer_id}! \n\n")
+    memory = sram["OUT"]
+    y_size = insn.y_size
+    x_size = insn.x_size
+    if (insn.x_stride < x_size and y_size > 1):
+        raise Exception(f"ERROR: STORE with overlapping rows (x_stride={insn.x_stride} < x_size={x_size})! \n\n")
+
+    vectors = memory[insn.sram_base:insn.sram_base + y_size * x_size]
+    view = dram_view(dram, insn.dram_base, y_size, x_size, insn.x_stride, memory[0].nbytes)
+    view[...] = vectors.view(np.uint8).reshape(view.shape)
+    profile["out_store_nbytes"] += vectors.nbytes
+
+# ---------------------------------------------
+
+# LOOP INDEX
+# ----------
+def loop_index(insn, sram, factors):
+    """
+    Unroll the loop nest (loop_out, loop_in, uop) of a GEMM or ALU instruction.
+    Inputs:
+        - factors (list): For each UOP field, the name of its (out, in) factors (None if the field is not used)
+    Outputs:
+        - indices (list): For each UOP field, the index of each iteration (in the sequential order)
+    """
+    uop = sram["UOP"][insn.uop_bgn:insn.uop_end]
+    y = np.arange(insn.loop_out)[:, None, None]
+    x = np.arange(insn.loop_in)[None, :, None]
+    indices = []
+    for field, factor in enumerate(factors):
+        if (factor is None):
+            indices.append(None)
+            continue
+        factor_out = getattr(insn, factor+"_factor_out")
+        factor_in = getattr(insn, factor+"_factor_in")
+        indices.append((uop[None, None, :, field] + y * factor_out + x * factor_in).reshape(-1))
+    return indices
+
+# ---------------------------------------------
+
+# GEMM
+# ----
+def run_gemm(insn, sram, profile):
+    """
+    Execute all the iterations of a GEMM at once: acc[dst] += wgt[wgt] @ inp[src] (or acc[dst] = 0 with reset).
+    """
+    dst, src, wgt = loop_index(insn, sram, ["dst", "src", "wgt"])
+    acc = sram["ACC"]
+    if (len(dst) == 0):
+        return
+    if (dst.max() >= len(acc) or src.max() >= len(sram["INP"]) or wgt.max() >= len(sram["WGT"])):
+        raise Exception(f"ERROR: GEMM out of the buffers (dst: {dst.max()}, src: {src.max()}, wgt: {wgt.max()})! \n\n")
+
+    if (insn.reset):
+        acc[dst] = 0
+    else:
+        profile["gemm_counter"] += len(dst)
+        products = np.einsum('nok,nbk->nbo', sram["WGT"][wgt].astype(acc.dtype), sram["INP"][src].astype(acc.dtype))
+        # The same ACC vector can be accumulated several times
+        if (len(np.unique(dst)) == len(dst)):
+            acc[dst] += products
+        else:
+            np.add.at(acc, dst, products)
+    sram["OUT"][dst] = acc[dst].astype(sram["OUT"].dtype)
+
+# ---------------------------------------------
+
+# ALU FUNCTION
+# ------------
+def alu_function(alu_opcode, a, b):
+    """
+    Apply an ALU operation on int64 operands (the result is truncated by the caller).
+    """
+    if (alu_opcode == 0): # MIN
+        return np.minimum(a, b)
+    elif (alu_opcode == 1): # MAX
+        return np.maximum(a, b)
+    elif (alu_opcode == 2): # ADD
+        return a + b
+    elif (alu_opcode == 3): # SHR (SHL if the shift is negative)
+        b = np.broadcast_to(b, a.shape)
+        return np.where(b >= 0, a >> np.clip(b, 0, 63), a << np.clip(-b, 0, 63))
+    elif (alu_opcode == 4): # MUL
+        return a * b
+    else:
+        raise Exception(f"ERROR: Unknown ALU opcode ({alu_opcode})! \n\n")
+
+# ---------------------------------------------
+
+# ALU WAVES
+# ---------
+def alu_waves(dst, src, use_imm):
+    """
+    Group the iterations of an ALU instruction in waves executed at once.
+    The iteration i is in the wave k when it is the k-th iteration writing dst[i] (e.g., a MAX reduction),
+    which is exact unless an iteration reads a vector written before it by another iteration of the instruction.
+    Outputs:
+        - waves (np.array): The wave of each iteration, None if the iterations must be executed sequentially
+    """
+    nb_iter = len(dst)
+    order = np.argsort(dst, kind='stable')
+    sorted_dst = dst[order]
+    first = np.concatenate(([0], np.flatnonzero(sorted_dst[1:] != sorted_dst[:-1]) + 1))
+    counts = np.diff(np.concatenate((first, [nb_iter])))
+    waves = np.empty(nb_iter, dtype=np.int64)
+    waves[order] = np.arange(nb_iter) - np.repeat(first, counts)
+    if (use_imm):
+        return waves
+
+    # The vector read by each iteration must hold the same writes as in the sequential order:
+    # the writes of src[i] before i must be the writes of src[i] in the waves before waves[i]
+    keys = sorted_dst * nb_iter + order
+    iteration = np.arange(nb_iter)
+    first_write = np.searchsorted(keys, src * nb_iter)
+    writes_before = np.searchsorted(keys, src * nb_iter + iteration) - first_write
+    nb_writes = np.searchsorted(keys, (src + 1) * nb_iter) - first_write
+    if np.array_equal(writes_before, np.minimum(waves, nb_writes)):
+        return waves
+    return None
+
+# ---------------------------------------------
+
+# ALU
+# ---
+def run_alu(insn, sram, profile):
+    """
+    Execute an ALU instruction with fancy indexing: acc[dst] = f(acc[dst], acc[src] or imm).
+    """
+    dst, src, _ = loop_index(insn, sram, ["dst", "src", None])
+    acc = sram["ACC"]
+    if (len(dst) == 0):
+        return
+    if (dst.max() >= len(acc) or src.max() >= len(acc)):
+        raise Exception(f"ERROR: ALU out of the ACC buffer (dst: {dst.max()}, src: {src.max()})! \n\n")
+    profile["alu_counter"] += len(dst)
+
+    # Immediate (signed)
+    imm = insn.imm - (1 << 16) if (insn.imm >= (1 << 15)) else insn.imm
+
+    waves = alu_waves(dst, src, insn.use_imm)
+    if (waves is None): # Sequential order
+        for d, s in zip(dst, src):
+            b = np.int64(imm) if (insn.use_imm) else acc[s].astype(np.int64)
+            acc[d] = alu_function(insn.alu_opcode, acc[d].astype(np.int64), b).astype(acc.dtype)
+    else:
+        for wave in range(0, waves.max() + 1):
+            wave_dst = dst[waves == wave]
+            b = np.int64(imm) if (insn.use_imm) else acc[src[waves == wave]].astype(np.int64)
+            acc[wave_dst] = alu_function(insn.alu_opcode, acc[wave_dst].astype(np.int64), b).astype(acc.dtype)
+    sram["OUT"][dst] = acc[dst].astype(sram["OUT"].dtype)
+
+
+###############################################
+
+
+# RUN INSTRUCTION
+# ---------------
+def run_insn(insn, sram, dram, profile):
+    if (insn.opcode == OPCODE_LOAD):
+        run_load(insn, sram, dram, profile)
+    elif (insn.opcode == OPCODE_STORE):
+        run_store(insn, sram, dram, profile)
+    elif (insn.opcode == OPCODE_GEMM):
+        run_gemm(insn, sram, profile)
+    elif (insn.opcode == OPCODE_ALU):
+        run_alu(insn, sram, profile)
+
+# ---------------------------------------------
+
+# DEPENDENCY QUEUES
+# -----------------
+# The (pop_prev, pop_next, push_prev, push_next) queues of each module
+DEPENDENCY_QUEUES = {
+    "LOAD": (None, "CMP->LD", None, "LD->CMP"),
+    "COMPUTE": ("LD->CMP", "ST->CMP", "CMP->LD", "CMP->ST"),
+    "STORE": ("CMP->ST", None, "ST->CMP", None)
+}
+
+# ---------------------------------------------
+
+# RUN PROGRAM
+# -----------
+def run_program(insn_buffer, sram, dram):
+    """
+    Execute a program: the instructions are dispatched to the LOAD, COMPUTE and STORE queues,
+    then each module executes its instructions as long as the tokens it pops are available.
+    Inputs:
+        - insn_buffer (list): The instructions (structures or raw bytes)
+        - sram (dict): The on-chip buffers (see sram_definition)
+        - dram (dict): The DRAM (see dram_definition), updated by the STOREs
+    Outputs:
+        - profile (dict): The number of bytes loaded and stored, of GEMM and ALU iterations and of instructions
+    """
+    profile = {"inp_load_nbytes": 0, "wgt_load_nbytes": 0, "acc_load_nbytes": 0, "uop_load_nbytes": 0,
+               "out_store_nbytes": 0, "gemm_counter": 0, "alu_counter": 0, "insn_counter": 0}
+
+    # Dispatch the instructions
+    queues = {module: [] for module in MODULES}
+    for insn in insn_buffer:
+        if isinstance(insn, (bytes, bytearray)):
+            insn = insn_decode(insn)
+        queues[insn_module(insn)].append(insn)
+
+    # Execute the modules until the FINISH
+    tokens = {"LD->CMP": 0, "CMP->LD": 0, "CMP->ST": 0, "ST->CMP": 0}
+    heads = {module: 0 for module in MODULES}
+    isDone = False
+    while not (isDone):
+        isProgress = False
+        for module in MODULES:
+            pop_prev_q, pop_next_q, push_prev_q, push_next_q = DEPENDENCY_QUEUES[module]
+            queue = queues[module]
+            while (heads[module] < len(queue) and not isDone):
+                insn = queue[heads[module]]
+                # Wait for the tokens
+                if (insn.pop_prev_dep and (pop_prev_q is None or tokens[pop_prev_q] == 0)) or \
+                   (insn.pop_next_dep and (pop_next_q is None or tokens[pop_next_q] == 0)):
+                    break
+                if (insn.pop_prev_dep):
+                    tokens[pop_prev_q] -= 1
+                if (insn.pop_next_dep):
+                    tokens[pop_next_q] -= 1
+                # Execute
+                run_insn(insn, sram, dram, profile)
+                if (insn.push_prev_dep and push_prev_q is not None):
+                    tokens[push_prev_q] += 1
+                if (insn.push_next_dep and push_next_q is not None):
+                    tokens[push_next_q] += 1
+                isDone = (insn.opcode == OPCODE_FINISH)
+                heads[module] += 1
+                profile["insn_counter"] += 1
+                isProgress = True
+        if not (isProgress) and not (isDone):
+            blocked = {module: heads[module] for module in MODULES if heads[module] < len(queues[module])}
+            raise Exception(f"ERROR: Deadlock (or no FINISH), the modules are blocked at the instructions {blocked} with the tokens {tokens}! \n\n")
+
+    profile["tokens"] = tokens
+    return profile
@@ -0,0 +1,75 @@
+# PACKAGE IMPORT
+# --------------
+import os
+import functools
+
+
+# ENVIRONMENT VARIABLES
+# ---------------------
+# The project root (no search for the anchor)
+PROJECT_ROOT_ENV = "VTA_PROJECT_ROOT"
+# The directory of the binaries (default: <project root>/compiler_output)
+OUTPUT_DIR_ENV = "VTA_COMPILER_OUTPUT"
+
+
+# FIND PROJECT ROOT
+# -----------------
+def find_project_root(anchor='.git'):
+    """
+    Find the project root (i.e., where the '.git/' belongs), or take it from the VTA_PROJECT_ROOT environment variable.
+    This function is used to write within a folder with absolute path, therefore avoiding issues when a script is moved.
+    The search is only done once per anchor.
+    """
+    if os.environ.get(PROJECT_ROOT_ENV):
+        return os.environ[PROJECT_ROOT_ENV]
+    return search_anchor(anchor)
+
+
+@functools.lru_cache(maxsize=None)
+def search_anchor(anchor='.git'):
+    path = os.path.abspath(__file__)
+    current_dir = os.path.dirname(path)
+    while True:
+        if os.path.exists(os.path.join(current_dir, anchor)):
+            return current_dir
+        parent_dir = os.path.dirname(current_dir)
+        if parent_dir == current_dir:
+            raise FileNotFoundError(f"Error: '{anchor}' not found.")
+        current_dir = parent_dir
+
+
+# DEFAULT ROOT
+# ------------
+def default_root():
+    """
+    The project root, or the current directory outside of a repository (e.g., an installed compiler).
+    """
+    try:
+        return find_project_root()
+    except FileNotFoundError:
+        return os.getcwd()
+
+
+# CREATE A DIRECTORY (if it does not exist)
+# ------------------
+def create_directory(path):
+    os.makedirs(path, exist_ok=True)
+
+
+# COMPILER OUTPUT FILE
+# --------------------
+def compiler_output_setup(filename = "default.bin", output_dir=None):
+    """
+    Get (and create) the directory of the binaries: output_dir if given, else the VTA_COMPILER_OUTPUT
+    environment variable, else <project root>/compiler_output.
+    """
+    if (output_dir is None):
+        output_dir = os.environ.get(OUTPUT_DIR_ENV) or os.path.join(default_root(), 'compiler_output')
+    create_directory(output_dir)
+    return output_dir
+
+
+# DEFINE FILENAME
+# ---------------
+def filepath_definition(path, filename = "default.bin"):
+    return os.path.join(path, filename)